@@ -1,18 +1,162 @@
+"""
+Async engine, session factory and connection pool telemetry.
+
+On PostgreSQL the pool is sized by ``DB_POOL_SIZE`` + ``DB_MAX_OVERFLOW`` per
+process, so the cluster needs ``max_connections`` of at least that times the
+number of workers at the HPA's ``maxReplicas``. ``DB_POOLER=pgbouncer`` targets
+PgBouncer in transaction mode: asyncpg's prepared statement caches are turned
+off, and the statement timeout is applied client side because PgBouncer
+rejects the ``statement_timeout`` startup parameter. Set it on the database
+role as well in that mode.
+
+``DATABASE_READ_URL`` adds a second, read-only engine for a streaming
+replica. ``get_read_db`` / ``get_read_session_factory`` hand out replica
+sessions, or primary ones when no replica is configured. Writes always go
+through ``get_db`` / ``get_session_factory``.
+"""
+
+import time
+from uuid import uuid4
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import settings
 
 Base = declarative_base()
 
-engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG)
+
+class PoolStats:
+    """Checkout counters for the engine's pool; wait time includes opening new connections."""
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+pool_stats = PoolStats()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` that records how long each checkout waited."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        pool_stats.record_wait(time.perf_counter() - started)
+        if self.overflow() > 0:
+            pool_stats.overflow_checkouts += 1
+        return connection
+
+
+def _engine_options(url: str, read_only: bool = False) -> dict:
+    options = {"echo": settings.DEBUG}
+    if make_url(url).get_backend_name() != "postgresql":
+        return options
+    options.update(
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    connect_args = {}
+    timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+    if settings.DB_POOLER == "pgbouncer":
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            # Transaction mode may hand each statement a different server connection.
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+        if timeout_ms:
+            connect_args["command_timeout"] = timeout_ms / 1000
+    else:
+        server_settings = {}
+        if timeout_ms:
+            server_settings["statement_timeout"] = str(timeout_ms)
+        if read_only:
+            server_settings["default_transaction_read_only"] = "on"
+        if server_settings:
+            connect_args["server_settings"] = server_settings
+    options["connect_args"] = connect_args
+    return options
+
+
+engine = create_async_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
+if settings.DATABASE_READ_URL:
+    read_engine = create_async_engine(
+        settings.DATABASE_READ_URL, **_engine_options(settings.DATABASE_READ_URL, read_only=True)
+    )
+    read_session_maker = async_sessionmaker(read_engine, expire_on_commit=False)
+else:
+    read_engine, read_session_maker = engine, async_session_maker
+
+
+def _pool_sizes(pool) -> dict:
+    sizes = {"pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        sizes.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    return sizes
+
+
+def pool_metrics() -> dict:
+    """Pool sizes per engine; the checkout counters cover both engines."""
+    metrics = {
+        **_pool_sizes(engine.sync_engine.pool),
+        "checkouts": pool_stats.checkouts,
+        "overflow_checkouts": pool_stats.overflow_checkouts,
+        "timeouts": pool_stats.timeouts,
+        "wait_seconds_total": round(pool_stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(pool_stats.wait_seconds_max, 6),
+    }
+    if read_engine is not engine:
+        metrics["replica"] = _pool_sizes(read_engine.sync_engine.pool)
+    return metrics
+
 
 async def get_db():
     async with async_session_maker() as session:
         yield session
 
 
+def get_session_factory() -> async_sessionmaker:
+    # For work that outlives the request scope (streamed bodies, background jobs);
+    # get_db sessions are closed before a StreamingResponse body runs.
+    return async_session_maker
+
+
+async def get_read_db():
+    async with read_session_maker() as session:
+        yield session
+
+
+def get_read_session_factory() -> async_sessionmaker:
+    return read_session_maker
+
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -1,10 +1,14 @@
 import os
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from app.config import settings
-from app.database import init_db
+from app.database import async_session_maker, init_db, pool_metrics
 from app.routers import assets, prices, async_prices
+from app.services import asset_service, latest_prices, metrics, query_cache, row_counts
+from app.services.parse_pool import start_parse_pool, shutdown_parse_pool
+from app.services.partitions import ensure_ahead
+from app.tasks.export_executor import export_executor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,10 +18,17 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     os.makedirs(settings.ASYNC_EXPORT_DIR, exist_ok=True)
     await init_db()
+    async with async_session_maker() as db:
+        await ensure_ahead(db, settings.PARTITION_MONTHS_AHEAD)
+    start_parse_pool(settings.CSV_PARSE_WORKERS)
+    export_executor.start()
     yield
+    await export_executor.stop()
+    shutdown_parse_pool()
 
 
 app = FastAPI(title=settings.APP_NAME, version=settings.APP_VERSION, lifespan=lifespan)
+app.add_middleware(metrics.MetricsMiddleware)
 
 app.include_router(assets.router, prefix="/assets", tags=["assets"])
 app.include_router(prices.router, prefix="/prices", tags=["prices"])
@@ -27,3 +38,26 @@ app.include_router(async_prices.router, prefix="/prices", tags=["async-prices"])
 @app.get("/health")
 async def health():
     return {"status": "ok", "version": settings.APP_VERSION}
+
+
+@app.get("/health/caches")
+async def cache_stats():
+    stats = {
+        "instruments": asset_service.instrument_cache.stats(),
+        "row_counts": row_counts.count_cache.stats(),
+        "latest_prices": latest_prices.snapshot.stats(),
+    }
+    cache = query_cache.get_query_cache()
+    if cache is not None:
+        stats["price_queries"] = cache.stats()
+    return stats
+
+
+@app.get("/health/db")
+async def db_pool_stats():
+    return pool_metrics()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
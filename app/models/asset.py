@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, String, Enum, DateTime, Text
+from sqlalchemy import BigInteger, Column, Integer, String, Enum, DateTime, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -19,7 +19,11 @@ class Instrument(Base):
     name = Column(String(100), nullable=False)
     asset_type = Column(Enum(AssetType), nullable=False)
     description = Column(Text, nullable=True)
+    price_scale = Column(Integer, nullable=False, default=8, server_default="8")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped by every ingest that stores rows; the price endpoints' ETags derive from it.
+    data_version = Column(BigInteger, nullable=False, default=0, server_default="0")
+    data_updated_at = Column(DateTime(timezone=True), nullable=True)
     tick_data = relationship("TickData", back_populates="instrument")
     ohlc_data = relationship("OHLCData", back_populates="instrument")
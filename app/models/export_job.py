@@ -0,0 +1,28 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, String, Text, text
+from sqlalchemy.sql import func
+from app.database import Base
+
+# At most one pending/processing job per dedup key; see app.tasks.job_store.
+_ACTIVE = text("status IN ('pending', 'processing')")
+
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+    id = Column(String(36), primary_key=True)
+    status = Column(String(20), nullable=False)
+    dedup_key = Column(String(64), nullable=True)
+    file_path = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    rows_written = Column(BigInteger, nullable=False, default=0)
+    bytes_written = Column(BigInteger, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    __table_args__ = (
+        Index(
+            "uq_export_jobs_active_dedup_key",
+            "dedup_key",
+            unique=True,
+            postgresql_where=_ACTIVE,
+            sqlite_where=_ACTIVE,
+        ),
+    )
@@ -1,5 +1,18 @@
 import enum
-from sqlalchemy import Column, Integer, Enum, DateTime, Numeric, ForeignKey, Index
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    false,
+    func,
+)
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -23,21 +36,28 @@ class PriceType(str, enum.Enum):
     OHLC_NON_REGULAR = "OHLC_NON_REGULAR"
 
 
+# BIGINT ids on PostgreSQL, where both price tables are partitioned by month (see
+# app.services.partitions); SQLite keeps INTEGER so the id stays a rowid alias.
+_PriceId = BigInteger().with_variant(Integer, "sqlite")
+
+
 class TickData(Base):
     __tablename__ = "tick_data"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(_PriceId, primary_key=True, index=True)
     instrument_id = Column(Integer, ForeignKey("instruments.id"), nullable=False)
     timestamp = Column(DateTime(timezone=True), nullable=False)
     bid = Column(Numeric(20, 8), nullable=False)
     ask = Column(Numeric(20, 8), nullable=False)
     volume = Column(Numeric(20, 8), nullable=True)
     instrument = relationship("Instrument", back_populates="tick_data")
-    __table_args__ = (Index("ix_tick_instrument_timestamp", "instrument_id", "timestamp"),)
+    __table_args__ = (
+        Index("uq_tick_instrument_timestamp", "instrument_id", "timestamp", unique=True),
+    )
 
 
 class OHLCData(Base):
     __tablename__ = "ohlc_data"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(_PriceId, primary_key=True, index=True)
     instrument_id = Column(Integer, ForeignKey("instruments.id"), nullable=False)
     timestamp = Column(DateTime(timezone=True), nullable=False)
     open = Column(Numeric(20, 8), nullable=False)
@@ -47,7 +67,84 @@ class OHLCData(Base):
     volume = Column(Numeric(20, 8), nullable=True)
     timeframe = Column(Enum(TimeFrame), nullable=False)
     price_type = Column(Enum(PriceType), nullable=False, default=PriceType.OHLC)
+    # Rollup bars computed from M1 (app.services.rollups); uploaded bars are never derived.
+    derived = Column(Boolean, nullable=False, default=False, server_default=false())
     instrument = relationship("Instrument", back_populates="ohlc_data")
     __table_args__ = (
-        Index("ix_ohlc_instrument_timestamp_tf", "instrument_id", "timestamp", "timeframe"),
+        Index(
+            "uq_ohlc_instrument_timestamp_tf",
+            "instrument_id",
+            "timestamp",
+            "timeframe",
+            "price_type",
+            unique=True,
+        ),
     )
+
+
+# Fixed-point storage (PRICE_STORAGE=fixed): prices are BIGINT scaled by 10**price_scale
+# of the instrument, volume by 10**VOLUME_SCALE, timestamps are epoch microseconds (UTC).
+VOLUME_SCALE = 8
+
+
+class TickDataFixed(Base):
+    __tablename__ = "tick_data_fixed"
+    id = Column(_PriceId, primary_key=True)
+    instrument_id = Column(Integer, ForeignKey("instruments.id"), nullable=False)
+    timestamp = Column(BigInteger, nullable=False)
+    bid = Column(BigInteger, nullable=False)
+    ask = Column(BigInteger, nullable=False)
+    volume = Column(BigInteger, nullable=True)
+    __table_args__ = (
+        Index("uq_tick_fixed_instrument_timestamp", "instrument_id", "timestamp", unique=True),
+    )
+
+
+class OHLCDataFixed(Base):
+    __tablename__ = "ohlc_data_fixed"
+    id = Column(_PriceId, primary_key=True)
+    instrument_id = Column(Integer, ForeignKey("instruments.id"), nullable=False)
+    timestamp = Column(BigInteger, nullable=False)
+    open = Column(BigInteger, nullable=False)
+    high = Column(BigInteger, nullable=False)
+    low = Column(BigInteger, nullable=False)
+    close = Column(BigInteger, nullable=False)
+    volume = Column(BigInteger, nullable=True)
+    timeframe = Column(Enum(TimeFrame), nullable=False)
+    price_type = Column(Enum(PriceType), nullable=False, default=PriceType.OHLC)
+    __table_args__ = (
+        Index(
+            "uq_ohlc_fixed_instrument_timestamp_tf",
+            "instrument_id",
+            "timestamp",
+            "timeframe",
+            "price_type",
+            unique=True,
+        ),
+    )
+
+
+class PriceRowCount(Base):
+    __tablename__ = "price_row_counts"
+    instrument_id = Column(Integer, ForeignKey("instruments.id"), primary_key=True)
+    table_name = Column(String(32), primary_key=True)
+    row_count = Column(BigInteger, nullable=False, default=0)
+
+
+class LatestPrice(Base):
+    """Newest tick, and newest bar per (price_type, timeframe), of each instrument."""
+
+    __tablename__ = "latest_prices"
+    instrument_id = Column(Integer, ForeignKey("instruments.id"), primary_key=True)
+    price_type = Column(Enum(PriceType), primary_key=True)
+    # Empty for ticks: primary key columns cannot be NULL.
+    timeframe = Column(String(8), primary_key=True, default="")
+    timestamp = Column(DateTime(timezone=True), nullable=False)
+    bid = Column(Numeric(20, 8), nullable=True)
+    ask = Column(Numeric(20, 8), nullable=True)
+    open = Column(Numeric(20, 8), nullable=True)
+    high = Column(Numeric(20, 8), nullable=True)
+    low = Column(Numeric(20, 8), nullable=True)
+    close = Column(Numeric(20, 8), nullable=True)
+    volume = Column(Numeric(20, 8), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
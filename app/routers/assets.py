@@ -1,23 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.schemas.asset import (
     InstrumentCreate,
     InstrumentUpdate,
     InstrumentResponse,
     InstrumentListResponse,
 )
-from app.services import asset_service
+from app.services import asset_service, conditional
 
 router = APIRouter()
 
 
 @router.get("", response_model=InstrumentListResponse)
-async def list_assets(page: int = 1, size: int = 50, db: AsyncSession = Depends(get_db)):
+async def list_assets(
+    request: Request,
+    response: Response,
+    page: int = 1,
+    size: int = 50,
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
+):
+    db = asset_service.read_session(db, read_db)
     skip = (page - 1) * size
     items = await asset_service.get_instruments(db, skip=skip, limit=size)
     total = await asset_service.get_instrument_count(db)
-    return InstrumentListResponse(items=items, total=total, page=page, size=size)
+    body = InstrumentListResponse(items=items, total=total, page=page, size=size)
+    # Metadata pages are small: the ETag hashes the body and saves the transfer.
+    etag = conditional.make_etag(body.model_dump_json())
+    unchanged = conditional.not_modified(request, etag)
+    if unchanged:
+        return unchanged
+    response.headers.update(conditional.validators(etag))
+    return body
 
 
 @router.post("", response_model=InstrumentResponse, status_code=status.HTTP_201_CREATED)
@@ -27,11 +42,25 @@ async def create_asset(data: InstrumentCreate, db: AsyncSession = Depends(get_db
 
 
 @router.get("/{instrument_id}", response_model=InstrumentResponse)
-async def get_asset(instrument_id: int, db: AsyncSession = Depends(get_db)):
+async def get_asset(
+    instrument_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
+):
+    db = asset_service.read_session(db, read_db)
     instrument = await asset_service.get_instrument_by_id(db, instrument_id)
     if not instrument:
         raise HTTPException(status_code=404, detail="Instrument not found")
-    return instrument
+    body = InstrumentResponse.model_validate(instrument)
+    etag = conditional.make_etag(body.model_dump_json())
+    last_modified = instrument.updated_at or instrument.created_at
+    unchanged = conditional.not_modified(request, etag, last_modified)
+    if unchanged:
+        return unchanged
+    response.headers.update(conditional.validators(etag, last_modified))
+    return body
 
 
 @router.put("/{instrument_id}", response_model=InstrumentResponse)
@@ -2,68 +2,134 @@ import uuid
 import os
 from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_db, async_session_maker
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.database import get_db, get_read_session_factory, get_session_factory
 from app.config import settings
-from app.schemas.price import ExportJobResponse, TimeFrame, PriceType
-from app.tasks.export_task import jobs, export_tick_data, export_ohlc_data
+from app.schemas.price import ExportFormat, ExportJobResponse, TimeFrame, PriceType
+from app.services import export_cache, price_service
+from app.services.export_formats import EXTENSIONS, MEDIA_TYPES, format_for_path
+from app.services.http_range import RangeNotSatisfiableError, iter_file_range, parse_range
+from app.tasks.export_executor import ExportQueueFullError, export_executor
+from app.tasks.export_task import export_tick_data, export_ohlc_data
+from app.tasks.job_store import JobStore, get_job_store, new_job
 
 router = APIRouter()
 
 
+async def _submit(
+    store: JobStore, key: str, instrument_id: int, fmt: ExportFormat, fn, *args
+) -> ExportJobResponse:
+    """Serve a cached export, attach to an identical running one, or queue a new job."""
+    job_id = str(uuid.uuid4())
+    ext = EXTENSIONS[fmt]
+    cached = export_cache.lookup(instrument_id, key, ext)
+    if cached is not None:
+        file_path = export_cache.job_file(cached, settings.ASYNC_EXPORT_DIR, job_id, ext)
+        job = new_job("completed")
+        job.update(file_path=file_path, bytes_written=os.path.getsize(file_path))
+        await store.create(job_id, job)
+        return ExportJobResponse(
+            job_id=job_id,
+            status="completed",
+            message="Export served from cache",
+            download_url=f"/prices/export/{job_id}/download",
+            bytes_written=job["bytes_written"],
+        )
+
+    active_id = await store.claim(key, job_id, new_job("pending"))
+    if active_id != job_id:
+        job = await store.get(active_id)
+        return ExportJobResponse(
+            job_id=active_id, status=job["status"], message="Attached to running export"
+        )
+
+    try:
+        export_executor.submit(fn, job_id, instrument_id, *args, key)
+    except ExportQueueFullError:
+        await store.update(job_id, status="failed", error="Export queue is full")
+        raise HTTPException(status_code=503, detail="Export queue is full, retry later")
+    return ExportJobResponse(job_id=job_id, status="pending", message="Export queued")
+
+
 @router.post("/tick/{instrument_id}/export", response_model=ExportJobResponse, status_code=202)
 async def export_tick(
     instrument_id: int,
-    background_tasks: BackgroundTasks,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
+    format: ExportFormat = ExportFormat.CSV,
     db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    read_factory: async_sessionmaker = Depends(get_read_session_factory),
+    store: JobStore = Depends(get_job_store),
 ):
-    job_id = str(uuid.uuid4())
-    jobs[job_id] = {"status": "pending", "file_path": None, "error": None}
-    background_tasks.add_task(
-        export_tick_data,
-        job_id,
+    session_factory = await price_service.read_session_factory(
+        db, instrument_id, session_factory, read_factory
+    )
+    key = export_cache.export_key(
+        "tick", instrument_id, from_date=from_date, to_date=to_date, format=format
+    )
+    return await _submit(
+        store,
+        key,
         instrument_id,
+        format,
+        export_tick_data,
         from_date,
         to_date,
-        async_session_maker,
+        format,
+        session_factory,
         settings.ASYNC_EXPORT_DIR,
+        store,
     )
-    return ExportJobResponse(job_id=job_id, status="pending", message="Export started")
 
 
 @router.post("/ohlc/{instrument_id}/export", response_model=ExportJobResponse, status_code=202)
 async def export_ohlc(
     instrument_id: int,
-    background_tasks: BackgroundTasks,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
     timeframe: Optional[TimeFrame] = None,
     price_type: Optional[PriceType] = None,
+    format: ExportFormat = ExportFormat.CSV,
     db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    read_factory: async_sessionmaker = Depends(get_read_session_factory),
+    store: JobStore = Depends(get_job_store),
 ):
-    job_id = str(uuid.uuid4())
-    jobs[job_id] = {"status": "pending", "file_path": None, "error": None}
-    background_tasks.add_task(
-        export_ohlc_data,
-        job_id,
+    session_factory = await price_service.read_session_factory(
+        db, instrument_id, session_factory, read_factory
+    )
+    key = export_cache.export_key(
+        "ohlc",
+        instrument_id,
+        from_date=from_date,
+        to_date=to_date,
+        timeframe=timeframe,
+        price_type=price_type,
+        format=format,
+    )
+    return await _submit(
+        store,
+        key,
         instrument_id,
+        format,
+        export_ohlc_data,
         from_date,
         to_date,
         timeframe,
         price_type,
-        async_session_maker,
+        format,
+        session_factory,
         settings.ASYNC_EXPORT_DIR,
+        store,
     )
-    return ExportJobResponse(job_id=job_id, status="pending", message="Export started")
 
 
 @router.get("/export/{job_id}/status", response_model=ExportJobResponse)
-async def get_export_status(job_id: str):
-    job = jobs.get(job_id)
+async def get_export_status(job_id: str, store: JobStore = Depends(get_job_store)):
+    job = await store.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     download_url = f"/prices/export/{job_id}/download" if job["status"] == "completed" else None
@@ -72,12 +138,16 @@ async def get_export_status(job_id: str):
         status=job["status"],
         message=job.get("error") or job["status"],
         download_url=download_url,
+        rows_written=job.get("rows_written", 0),
+        bytes_written=job.get("bytes_written", 0),
     )
 
 
 @router.get("/export/{job_id}/download")
-async def download_export(job_id: str):
-    job = jobs.get(job_id)
+async def download_export(
+    job_id: str, request: Request, store: JobStore = Depends(get_job_store)
+):
+    job = await store.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     if job["status"] != "completed":
@@ -87,4 +157,29 @@ async def download_export(job_id: str):
     file_path = job["file_path"]
     if not file_path or not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="Export file not found")
-    return FileResponse(file_path, filename=f"{job_id}.csv", media_type="text/csv")
+    fmt = format_for_path(file_path)
+    filename = f"{job_id}.{EXTENSIONS[fmt]}"
+    size = os.path.getsize(file_path)
+    try:
+        span = parse_range(request.headers.get("range"), size)
+    except RangeNotSatisfiableError:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    if span is None:
+        return FileResponse(
+            file_path,
+            filename=filename,
+            media_type=MEDIA_TYPES[fmt],
+            headers={"Accept-Ranges": "bytes"},
+        )
+    start, end = span
+    return StreamingResponse(
+        iter_file_range(file_path, start, end),
+        status_code=206,
+        media_type=MEDIA_TYPES[fmt],
+        headers={
+            "Accept-Ranges": "bytes",
+            "Content-Range": f"bytes {start}-{end}/{size}",
+            "Content-Length": str(end - start + 1),
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        },
+    )
@@ -1,100 +1,547 @@
-import io
+import logging
 from datetime import datetime
-from typing import Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 import pandas as pd
-from fastapi import APIRouter, Depends, Form, UploadFile, File, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_db
-from app.schemas.price import PaginatedTickResponse, PaginatedOHLCResponse, TimeFrame, PriceType
-from app.services import price_service
+from fastapi import APIRouter, Depends, Form, Request, Response, UploadFile, File, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.config import settings
+from app.database import get_db, get_read_db, get_read_session_factory, get_session_factory
+from app.schemas.price import (
+    ConflictMode,
+    LatestPriceResponse,
+    OHLCBatchQuery,
+    OHLCBatchResponse,
+    OHLCBatchResult,
+    PaginatedTickResponse,
+    PaginatedOHLCResponse,
+    TickBatchQuery,
+    TickBatchResponse,
+    TickBatchResult,
+    TickBarsResponse,
+    TimeFrame,
+    PriceType,
+    QuoteSide,
+    StreamFormat,
+    TotalMode,
+)
+from app.services import (
+    columnar,
+    conditional,
+    csv_parser,
+    metrics,
+    price_service,
+    row_encoders,
+)
+from app.services.pagination import Cursor, decode_cursor, encode_cursor
+from app.services.parse_pool import run_parse
+from app.services.bulk_ingest import DuplicateKeyError
+from app.services.upload_stream import CsvUploadStream, UploadTooLargeError
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_COLUMNAR_RESPONSES = {
+    200: {
+        "content": {
+            columnar.ARROW_STREAM_MEDIA_TYPE: {},
+            columnar.PARQUET_MEDIA_TYPE: {},
+        },
+        "description": "JSON by default; Arrow IPC stream or Parquet via the Accept header.",
+    }
+}
+
+
+def _max_upload_bytes() -> int:
+    return settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+
+
+def _check_upload_size(file: UploadFile) -> None:
+    if file.size is not None and file.size > _max_upload_bytes():
+        raise HTTPException(
+            status_code=413, detail=f"Upload exceeds the {settings.MAX_UPLOAD_SIZE_MB} MB limit"
+        )
+
+
+def _stream_field(upload: CsvUploadStream, name: str, default: Optional[str] = None) -> str:
+    value = upload.fields.get(name) or upload.request.query_params.get(name) or default
+    if value is None:
+        raise ValueError(f"Missing field '{name}'")
+    return value
+
+
+def _stream_instrument_id(upload: CsvUploadStream) -> int:
+    try:
+        return int(_stream_field(upload, "instrument_id"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid instrument_id: {e}")
+
+
+def _stream_conflict_mode(upload: CsvUploadStream) -> ConflictMode:
+    try:
+        return ConflictMode(_stream_field(upload, "on_conflict", settings.INGEST_ON_CONFLICT))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid on_conflict: {e}")
+
+
+async def _insert_frame(
+    insert: Callable,
+    db: AsyncSession,
+    frame: pd.DataFrame,
+    on_conflict: Optional[ConflictMode],
+    committed: int = 0,
+):
+    try:
+        return await insert(db, frame, on_conflict=on_conflict)
+    except DuplicateKeyError as e:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Rows with an existing ({', '.join(e.key_columns)}) key were rejected "
+            f"({committed + e.committed} rows committed before the error); "
+            "upload with on_conflict=skip or on_conflict=update",
+        )
+    except IntegrityError as e:
+        raise HTTPException(status_code=400, detail=f"Rows rejected by the database: {e.orig}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Failed to store prices: {e}")
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _next_cursor(items: list, limit: int) -> Optional[str]:
+    if not items or len(items) < limit:
+        return None
+    return encode_cursor(items[-1].timestamp, items[-1].id)
+
+
+async def _conditional_read(
+    request: Request, db: AsyncSession, read_db: AsyncSession, instrument_id: int
+) -> Tuple[Optional[Response], Dict[str, str], AsyncSession]:
+    """
+    A ``304`` response if the client's copy is current, the validator headers,
+    and the session to read prices from.
+
+    The ETag covers the instrument's data version, so only the instruments row
+    is read to answer a conditional request. That row is read on the primary;
+    prices come from the replica unless the instrument was just ingested.
+    """
+    version = await price_service.data_version(db, instrument_id)
+    if version is None:
+        return None, {}, read_db
+    data_version, updated_at = version
+    etag = conditional.request_etag(request, instrument_id, data_version, settings.PRICE_STORAGE)
+    source = db if price_service.recently_ingested(updated_at) else read_db
+    return (
+        conditional.not_modified(request, etag, updated_at),
+        conditional.validators(etag, updated_at),
+        source,
+    )
+
+
+def _columnar_response(
+    rows, schema, media_type: str, limit: int, headers: Dict[str, str]
+) -> Response:
+    content = columnar.encode(columnar.rows_to_table(rows, schema), media_type)
+    headers = {**headers, "Vary": "Accept"}
+    next_cursor = _next_cursor(rows, limit)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+async def _ingest_csv_stream(
+    upload: CsvUploadStream,
+    db: AsyncSession,
+    parse: Callable[[bytes], Awaitable[pd.DataFrame]],
+    insert: Callable,
+) -> dict:
+    chunks = []
+    inserted = 0
+    skipped = 0
+    updated = 0
+    try:
+        async for chunk in upload.chunks():
+            try:
+                frame = await parse(chunk)
+            except (ValueError, TypeError) as e:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid CSV in chunk {len(chunks) + 1}: {e} "
+                    f"({inserted} rows committed before the error)",
+                )
+            # Form fields are parsed along with the first chunk, so read the mode here.
+            stats = await _insert_frame(
+                insert, db, frame, _stream_conflict_mode(upload), committed=inserted
+            )
+            inserted += stats.inserted
+            skipped += stats.skipped
+            updated += stats.updated
+            chunks.append(
+                {
+                    "chunk": len(chunks) + 1,
+                    "rows": stats.rows,
+                    "inserted": stats.inserted,
+                    "skipped": stats.skipped,
+                    "updated": stats.updated,
+                    "bytes_received": upload.bytes_received,
+                    "rows_per_sec": round(stats.rows_per_sec, 1),
+                }
+            )
+            logger.info(
+                "Streaming upload chunk %d: %d rows (%d rows, %d bytes so far)",
+                len(chunks),
+                stats.rows,
+                inserted,
+                upload.bytes_received,
+            )
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=413, detail=f"{e} ({inserted} rows committed before the limit was hit)"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid upload body: {e}")
+    return {
+        "inserted": inserted,
+        "skipped": skipped,
+        "updated": updated,
+        "bytes_received": upload.bytes_received,
+        "chunks": chunks,
+    }
+
 
 @router.post("/tick/upload")
 async def upload_tick_data(
     file: UploadFile = File(...),
     instrument_id: int = Form(...),
+    on_conflict: Optional[ConflictMode] = Form(None),
     db: AsyncSession = Depends(get_db),
 ):
+    _check_upload_size(file)
     content = await file.read()
     try:
-        df = pd.read_csv(io.BytesIO(content))
-    except Exception as e:
+        frame = await run_parse(csv_parser.read_tick_csv, content, instrument_id)
+    except (ValueError, TypeError) as e:
         raise HTTPException(status_code=400, detail=f"Failed to parse CSV: {e}")
-    rows = []
-    for _, row in df.iterrows():
-        rows.append(
-            {
-                "instrument_id": instrument_id,
-                "timestamp": pd.to_datetime(row["timestamp"]),
-                "bid": row["bid"],
-                "ask": row["ask"],
-                "volume": (
-                    row.get("volume")
-                    if "volume" in row and not pd.isna(row.get("volume"))
-                    else None
-                ),
-            }
-        )
-    inserted = await price_service.bulk_insert_tick_data(db, rows)
-    return {"inserted": inserted, "instrument_id": instrument_id}
+    stats = await _insert_frame(price_service.bulk_insert_tick_data, db, frame, on_conflict)
+    return {
+        "inserted": stats.inserted,
+        "skipped": stats.skipped,
+        "updated": stats.updated,
+        "instrument_id": instrument_id,
+        "rows_per_sec": round(stats.rows_per_sec, 1),
+    }
 
 
 @router.post("/ohlc/upload")
 async def upload_ohlc_data(
     file: UploadFile = File(...),
     instrument_id: int = Form(...),
-    timeframe: str = Form(...),
-    price_type: str = Form("OHLC"),
+    timeframe: TimeFrame = Form(...),
+    price_type: PriceType = Form(PriceType.OHLC),
+    on_conflict: Optional[ConflictMode] = Form(None),
     db: AsyncSession = Depends(get_db),
 ):
+    _check_upload_size(file)
     content = await file.read()
     try:
-        df = pd.read_csv(io.BytesIO(content))
-    except Exception as e:
+        frame = await run_parse(
+            csv_parser.read_ohlc_csv, content, instrument_id, timeframe, price_type
+        )
+    except (ValueError, TypeError) as e:
         raise HTTPException(status_code=400, detail=f"Failed to parse CSV: {e}")
-    rows = []
-    for _, row in df.iterrows():
-        rows.append(
-            {
-                "instrument_id": instrument_id,
-                "timestamp": pd.to_datetime(row["timestamp"]),
-                "open": row["open"],
-                "high": row["high"],
-                "low": row["low"],
-                "close": row["close"],
-                "volume": (
-                    row.get("volume")
-                    if "volume" in row and not pd.isna(row.get("volume"))
-                    else None
-                ),
-                "timeframe": timeframe,
-                "price_type": price_type,
-            }
+    stats = await _insert_frame(price_service.bulk_insert_ohlc_data, db, frame, on_conflict)
+    return {
+        "inserted": stats.inserted,
+        "skipped": stats.skipped,
+        "updated": stats.updated,
+        "instrument_id": instrument_id,
+        "rows_per_sec": round(stats.rows_per_sec, 1),
+    }
+
+
+@router.post("/tick/upload/stream")
+async def upload_tick_data_stream(request: Request, db: AsyncSession = Depends(get_db)):
+    upload = CsvUploadStream(request, settings.UPLOAD_STREAM_CHUNK_BYTES, _max_upload_bytes())
+
+    async def parse(chunk: bytes) -> pd.DataFrame:
+        return await run_parse(csv_parser.read_tick_csv, chunk, _stream_instrument_id(upload))
+
+    result = await _ingest_csv_stream(upload, db, parse, price_service.bulk_insert_tick_data)
+    return {"instrument_id": _stream_instrument_id(upload), **result}
+
+
+@router.post("/ohlc/upload/stream")
+async def upload_ohlc_data_stream(request: Request, db: AsyncSession = Depends(get_db)):
+    upload = CsvUploadStream(request, settings.UPLOAD_STREAM_CHUNK_BYTES, _max_upload_bytes())
+
+    async def parse(chunk: bytes) -> pd.DataFrame:
+        return await run_parse(
+            csv_parser.read_ohlc_csv,
+            chunk,
+            _stream_instrument_id(upload),
+            TimeFrame(_stream_field(upload, "timeframe")),
+            PriceType(_stream_field(upload, "price_type", PriceType.OHLC.value)),
+        )
+
+    result = await _ingest_csv_stream(upload, db, parse, price_service.bulk_insert_ohlc_data)
+    return {"instrument_id": _stream_instrument_id(upload), **result}
+
+
+async def _batch_session(
+    query: TickBatchQuery, db: AsyncSession, read_db: AsyncSession
+) -> Tuple[List[int], AsyncSession]:
+    """Validate the batch size; read from the primary if any instrument was just ingested."""
+    instrument_ids = list(dict.fromkeys(query.instrument_ids))
+    if len(instrument_ids) > settings.BATCH_QUERY_MAX_INSTRUMENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BATCH_QUERY_MAX_INSTRUMENTS} instruments per batch",
+        )
+    if len(instrument_ids) * query.limit > settings.BATCH_QUERY_MAX_ROWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"instruments x limit exceeds {settings.BATCH_QUERY_MAX_ROWS} rows",
+        )
+    if await price_service.any_recently_ingested(db, instrument_ids):
+        return instrument_ids, db
+    return instrument_ids, read_db
+
+
+@router.post("/tick/batch", response_model=TickBatchResponse)
+async def get_tick_batch(
+    query: TickBatchQuery,
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
+):
+    """The first ``limit`` ticks in a shared range for each instrument, in one query."""
+    instrument_ids, source = await _batch_session(query, db, read_db)
+    grouped = await price_service.get_tick_batch(
+        source, instrument_ids, query.from_date, query.to_date, query.limit
+    )
+    results = []
+    for instrument_id, rows in grouped.items():
+        metrics.ROWS.inc(len(rows), "tick", "returned")
+        results.append(
+            TickBatchResult(
+                instrument_id=instrument_id,
+                items=rows,
+                next_cursor=_next_cursor(rows, query.limit),
+            )
+        )
+    return TickBatchResponse(results=results)
+
+
+@router.post("/ohlc/batch", response_model=OHLCBatchResponse)
+async def get_ohlc_batch(
+    query: OHLCBatchQuery,
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
+):
+    """The first ``limit`` bars in a shared range and timeframe for each instrument."""
+    instrument_ids, source = await _batch_session(query, db, read_db)
+    grouped = await price_service.get_ohlc_batch(
+        source,
+        instrument_ids,
+        query.from_date,
+        query.to_date,
+        query.timeframe,
+        query.price_type,
+        query.limit,
+    )
+    results = []
+    for instrument_id, rows in grouped.items():
+        metrics.ROWS.inc(len(rows), "ohlc", "returned")
+        results.append(
+            OHLCBatchResult(
+                instrument_id=instrument_id,
+                items=rows,
+                next_cursor=_next_cursor(rows, query.limit),
+            )
+        )
+    return OHLCBatchResponse(results=results)
+
+
+@router.get("/latest", response_model=List[LatestPriceResponse])
+async def get_latest_prices(
+    price_type: Optional[PriceType] = None,
+    timeframe: Optional[TimeFrame] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Newest tick and newest bar per (price_type, timeframe) of every instrument."""
+    return await price_service.get_latest_prices(
+        db, price_type=price_type, timeframe=timeframe
+    )
+
+
+@router.get("/latest/{instrument_id}", response_model=List[LatestPriceResponse])
+async def get_instrument_latest_prices(
+    instrument_id: int,
+    price_type: Optional[PriceType] = None,
+    timeframe: Optional[TimeFrame] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Newest tick and newest bar per (price_type, timeframe) of one instrument."""
+    return await price_service.get_latest_prices(db, instrument_id, price_type, timeframe)
+
+
+@router.get("/tick/{instrument_id}/stream")
+async def stream_tick_data(
+    instrument_id: int,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    format: StreamFormat = StreamFormat.NDJSON,
+    db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    read_factory: async_sessionmaker = Depends(get_read_session_factory),
+):
+    factory = await price_service.read_session_factory(
+        db, instrument_id, session_factory, read_factory
+    )
+
+    async def body():
+        async with factory() as db:
+            batches = price_service.stream_tick_rows(
+                db, instrument_id, from_date, to_date, settings.STREAM_BATCH_SIZE
+            )
+            async for chunk in row_encoders.encode_batches(batches, format):
+                yield chunk
+
+    return StreamingResponse(body(), media_type=row_encoders.MEDIA_TYPES[format])
+
+
+@router.get("/ohlc/{instrument_id}/stream")
+async def stream_ohlc_data(
+    instrument_id: int,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    timeframe: Optional[TimeFrame] = None,
+    price_type: Optional[PriceType] = None,
+    format: StreamFormat = StreamFormat.NDJSON,
+    db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    read_factory: async_sessionmaker = Depends(get_read_session_factory),
+):
+    factory = await price_service.read_session_factory(
+        db, instrument_id, session_factory, read_factory
+    )
+
+    async def body():
+        async with factory() as db:
+            batches = price_service.stream_ohlc_rows(
+                db,
+                instrument_id,
+                from_date,
+                to_date,
+                timeframe,
+                price_type,
+                settings.STREAM_BATCH_SIZE,
+            )
+            async for chunk in row_encoders.encode_batches(batches, format):
+                yield chunk
+
+    return StreamingResponse(body(), media_type=row_encoders.MEDIA_TYPES[format])
+
+
+@router.get("/tick/{instrument_id}/bars", response_model=TickBarsResponse)
+async def get_tick_bars(
+    request: Request,
+    response: Response,
+    instrument_id: int,
+    timeframe: TimeFrame,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    side: QuoteSide = QuoteSide.MID,
+    interval_seconds: Optional[int] = None,
+    limit: int = 1000,
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
+):
+    """OHLC bars resampled from ticks in the database; only the bars are returned."""
+    unchanged, headers, source = await _conditional_read(request, db, read_db, instrument_id)
+    if unchanged:
+        return unchanged
+    response.headers.update(headers)
+    try:
+        bars = await price_service.get_tick_bars(
+            source, instrument_id, timeframe, from_date, to_date, side, interval_seconds, limit
         )
-    inserted = await price_service.bulk_insert_ohlc_data(db, rows)
-    return {"inserted": inserted, "instrument_id": instrument_id}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TickBarsResponse(
+        instrument_id=instrument_id, timeframe=timeframe, side=side, items=bars
+    )
 
 
-@router.get("/tick/{instrument_id}", response_model=PaginatedTickResponse)
+@router.get(
+    "/tick/{instrument_id}",
+    response_model=PaginatedTickResponse,
+    responses=_COLUMNAR_RESPONSES,
+)
 async def get_tick_data(
+    request: Request,
+    response: Response,
     instrument_id: int,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
     limit: int = 1000,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    total_mode: TotalMode = TotalMode.EXACT,
     db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
 ):
-    items, total = await price_service.get_tick_data(
-        db, instrument_id, from_date, to_date, limit, offset
+    unchanged, headers, source = await _conditional_read(request, db, read_db, instrument_id)
+    if unchanged:
+        return unchanged
+    media_type = columnar.negotiate(request.headers.get("accept"))
+    if media_type:
+        rows = await price_service.get_tick_rows(
+            source, instrument_id, from_date, to_date, limit, offset, _decode_cursor(cursor)
+        )
+        metrics.ROWS.inc(len(rows), "tick", "returned")
+        return _columnar_response(rows, columnar.TICK_SCHEMA, media_type, limit, headers)
+    response.headers.update(headers)
+    items, total, mode = await price_service.get_tick_data(
+        source,
+        instrument_id,
+        from_date,
+        to_date,
+        limit,
+        offset,
+        _decode_cursor(cursor),
+        include_total,
+        total_mode,
+    )
+    metrics.ROWS.inc(len(items), "tick", "returned")
+    page = (offset // limit) + 1 if limit > 0 and cursor is None else 1
+    return PaginatedTickResponse(
+        items=items,
+        total=total,
+        total_mode=mode,
+        page=page,
+        size=limit,
+        next_cursor=_next_cursor(items, limit),
     )
-    page = (offset // limit) + 1 if limit > 0 else 1
-    return PaginatedTickResponse(items=items, total=total, page=page, size=limit)
 
 
-@router.get("/ohlc/{instrument_id}", response_model=PaginatedOHLCResponse)
+@router.get(
+    "/ohlc/{instrument_id}",
+    response_model=PaginatedOHLCResponse,
+    responses=_COLUMNAR_RESPONSES,
+)
 async def get_ohlc_data(
+    request: Request,
+    response: Response,
     instrument_id: int,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
@@ -102,10 +549,51 @@ async def get_ohlc_data(
     price_type: Optional[PriceType] = None,
     limit: int = 1000,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    total_mode: TotalMode = TotalMode.EXACT,
     db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
 ):
-    items, total = await price_service.get_ohlc_data(
-        db, instrument_id, from_date, to_date, timeframe, price_type, limit, offset
+    unchanged, headers, source = await _conditional_read(request, db, read_db, instrument_id)
+    if unchanged:
+        return unchanged
+    media_type = columnar.negotiate(request.headers.get("accept"))
+    if media_type:
+        rows = await price_service.get_ohlc_rows(
+            source,
+            instrument_id,
+            from_date,
+            to_date,
+            timeframe,
+            price_type,
+            limit,
+            offset,
+            _decode_cursor(cursor),
+        )
+        metrics.ROWS.inc(len(rows), "ohlc", "returned")
+        return _columnar_response(rows, columnar.OHLC_SCHEMA, media_type, limit, headers)
+    response.headers.update(headers)
+    items, total, mode = await price_service.get_ohlc_data(
+        source,
+        instrument_id,
+        from_date,
+        to_date,
+        timeframe,
+        price_type,
+        limit,
+        offset,
+        _decode_cursor(cursor),
+        include_total,
+        total_mode,
+    )
+    metrics.ROWS.inc(len(items), "ohlc", "returned")
+    page = (offset // limit) + 1 if limit > 0 and cursor is None else 1
+    return PaginatedOHLCResponse(
+        items=items,
+        total=total,
+        total_mode=mode,
+        page=page,
+        size=limit,
+        next_cursor=_next_cursor(items, limit),
     )
-    page = (offset // limit) + 1 if limit > 0 else 1
-    return PaginatedOHLCResponse(items=items, total=total, page=page, size=limit)
@@ -2,7 +2,7 @@ from __future__ import annotations
 import enum
 from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class AssetType(str, enum.Enum):
@@ -17,6 +17,8 @@ class InstrumentCreate(BaseModel):
     name: str
     asset_type: AssetType
     description: Optional[str] = None
+    # Decimal places kept for prices in fixed-point storage; fixed at creation.
+    price_scale: int = Field(default=8, ge=0, le=12)
 
 
 class InstrumentUpdate(BaseModel):
@@ -32,6 +34,7 @@ class InstrumentResponse(BaseModel):
     name: str
     asset_type: AssetType
     description: Optional[str] = None
+    price_scale: int = 8
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -2,8 +2,8 @@ from __future__ import annotations
 import enum
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
 
 
 class TimeFrame(str, enum.Enum):
@@ -25,6 +25,36 @@ class PriceType(str, enum.Enum):
     OHLC_NON_REGULAR = "OHLC_NON_REGULAR"
 
 
+class TotalMode(str, enum.Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+
+
+class StreamFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class QuoteSide(str, enum.Enum):
+    BID = "bid"
+    ASK = "ask"
+    MID = "mid"
+
+
+class ConflictMode(str, enum.Enum):
+    ERROR = "error"
+    SKIP = "skip"
+    UPDATE = "update"
+
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    CSV_GZIP = "csv.gz"
+    CSV_ZSTD = "csv.zst"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+
 class TickDataCreate(BaseModel):
     instrument_id: int
     timestamp: datetime
@@ -71,18 +101,101 @@ class OHLCDataResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class LatestPriceResponse(BaseModel):
+    instrument_id: int
+    price_type: PriceType
+    timeframe: Optional[TimeFrame] = None
+    timestamp: datetime
+    bid: Optional[Decimal] = None
+    ask: Optional[Decimal] = None
+    open: Optional[Decimal] = None
+    high: Optional[Decimal] = None
+    low: Optional[Decimal] = None
+    close: Optional[Decimal] = None
+    volume: Optional[Decimal] = None
+
+
+class BarResponse(BaseModel):
+    timestamp: datetime
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    volume: Optional[Decimal] = None
+    tick_count: int
+
+    model_config = {"from_attributes": True}
+
+
+class TickBarsResponse(BaseModel):
+    instrument_id: int
+    timeframe: TimeFrame
+    side: QuoteSide
+    items: List[BarResponse]
+
+
 class PaginatedTickResponse(BaseModel):
     items: List[TickDataResponse]
-    total: int
+    total: Optional[int] = None
+    total_mode: Optional[TotalMode] = None
     page: int
     size: int
+    next_cursor: Optional[str] = None
 
 
 class PaginatedOHLCResponse(BaseModel):
     items: List[OHLCDataResponse]
-    total: int
+    total: Optional[int] = None
+    total_mode: Optional[TotalMode] = None
     page: int
     size: int
+    next_cursor: Optional[str] = None
+
+
+class TickBatchQuery(BaseModel):
+    instrument_ids: List[int] = Field(min_length=1)
+    from_date: Optional[datetime] = None
+    to_date: Optional[datetime] = None
+    # Rows per instrument.
+    limit: int = Field(default=1000, ge=1)
+
+
+class OHLCBatchQuery(TickBatchQuery):
+    timeframe: Optional[TimeFrame] = None
+    price_type: Optional[PriceType] = None
+
+
+class TickBatchResult(BaseModel):
+    instrument_id: int
+    items: List[TickDataResponse]
+    next_cursor: Optional[str] = None
+
+
+class OHLCBatchResult(BaseModel):
+    instrument_id: int
+    items: List[OHLCDataResponse]
+    next_cursor: Optional[str] = None
+
+
+class TickBatchResponse(BaseModel):
+    results: List[TickBatchResult]
+
+
+class OHLCBatchResponse(BaseModel):
+    results: List[OHLCBatchResult]
+
+
+class IngestStats(BaseModel):
+    rows: int = 0
+    chunks: int = 0
+    elapsed: float = 0.0
+    rows_per_sec: float = 0.0
+    method: str = ""
+    inserted: int = 0
+    skipped: int = 0
+    updated: int = 0
+    # New rows per instrument, for the summary counts; not part of API responses.
+    inserted_by_instrument: Dict[int, int] = Field(default_factory=dict, exclude=True)
 
 
 class ExportJobResponse(BaseModel):
@@ -90,3 +203,5 @@ class ExportJobResponse(BaseModel):
     status: str
     message: str
     download_url: Optional[str] = None
+    rows_written: int = 0
+    bytes_written: int = 0
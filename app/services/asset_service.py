@@ -1,61 +1,150 @@
+"""
+Instrument CRUD.
+
+Lookups by id and by symbol, and the instrument count, are served from a
+bounded in-process TTL cache. Lookups return detached snapshots shared by
+all callers, so treat them as read-only; ``update_instrument`` and
+``delete_instrument`` load their own attached copy. Writes invalidate the
+entries they touch in this process only, so other workers may serve stale
+metadata for up to ``INSTRUMENT_CACHE_TTL_SECONDS``.
+
+Cache misses may be read from a replica. For ``READ_YOUR_WRITES_SECONDS``
+after a write in this process, ``read_session`` keeps them on the primary,
+so a lagging replica cannot put pre-write metadata back into the cache.
+"""
+
+import time
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
+from sqlalchemy.orm import make_transient_to_detached
+from app.config import settings
 from app.models.asset import Instrument
 from app.schemas.asset import InstrumentCreate, InstrumentUpdate
+from app.services import metrics
+from app.services.cache import TTLCache
+
+instrument_cache = TTLCache(
+    max_size=settings.INSTRUMENT_CACHE_MAX_ENTRIES, ttl=settings.INSTRUMENT_CACHE_TTL_SECONDS
+)
+_COUNT_KEY = ("count",)
+_MISSING = object()
+_last_write = float("-inf")
+
 
+def _written() -> None:
+    global _last_write
+    _last_write = time.monotonic()
 
+
+def read_session(primary: AsyncSession, replica: AsyncSession) -> AsyncSession:
+    """The session instrument reads should use: the primary right after a write."""
+    if time.monotonic() - _last_write < settings.READ_YOUR_WRITES_SECONDS:
+        return primary
+    return replica
+
+
+@metrics.timed
 async def get_instruments(db: AsyncSession, skip: int = 0, limit: int = 50) -> List[Instrument]:
     result = await db.execute(select(Instrument).offset(skip).limit(limit))
     return result.scalars().all()
 
 
+@metrics.timed
 async def get_instrument_count(db: AsyncSession) -> int:
-    result = await db.execute(select(func.count()).select_from(Instrument))
-    return result.scalar_one()
+    total = instrument_cache.get(_COUNT_KEY)
+    if total is None:
+        result = await db.execute(select(func.count()).select_from(Instrument))
+        total = result.scalar_one()
+        instrument_cache.set(_COUNT_KEY, total)
+    return total
 
 
-async def get_instrument_by_id(db: AsyncSession, instrument_id: int) -> Optional[Instrument]:
+async def _load(db: AsyncSession, instrument_id: int) -> Optional[Instrument]:
     result = await db.execute(select(Instrument).where(Instrument.id == instrument_id))
     return result.scalar_one_or_none()
 
 
+def _cache(instrument: Instrument) -> Instrument:
+    snapshot = Instrument(
+        **{column.key: getattr(instrument, column.key) for column in Instrument.__table__.columns}
+    )
+    make_transient_to_detached(snapshot)
+    instrument_cache.set(("id", snapshot.id), snapshot)
+    instrument_cache.set(("symbol", snapshot.symbol), snapshot)
+    return snapshot
+
+
+def _invalidate(instrument_id: int, *symbols: str) -> None:
+    instrument_cache.invalidate(("id", instrument_id))
+    for symbol in symbols:
+        instrument_cache.invalidate(("symbol", symbol))
+
+
+@metrics.timed
+async def get_instrument_by_id(db: AsyncSession, instrument_id: int) -> Optional[Instrument]:
+    instrument = instrument_cache.get(("id", instrument_id), _MISSING)
+    if instrument is _MISSING:
+        instrument = await _load(db, instrument_id)
+        if instrument is not None:
+            instrument = _cache(instrument)
+    return instrument
+
+
+@metrics.timed
 async def get_instrument_by_symbol(db: AsyncSession, symbol: str) -> Optional[Instrument]:
-    result = await db.execute(select(Instrument).where(Instrument.symbol == symbol))
-    return result.scalar_one_or_none()
+    instrument = instrument_cache.get(("symbol", symbol), _MISSING)
+    if instrument is _MISSING:
+        result = await db.execute(select(Instrument).where(Instrument.symbol == symbol))
+        instrument = result.scalar_one_or_none()
+        if instrument is not None:
+            instrument = _cache(instrument)
+    return instrument
 
 
+@metrics.timed
 async def create_instrument(db: AsyncSession, data: InstrumentCreate) -> Instrument:
     instrument = Instrument(
         symbol=data.symbol,
         name=data.name,
         asset_type=data.asset_type,
         description=data.description,
+        price_scale=data.price_scale,
     )
     db.add(instrument)
     await db.commit()
     await db.refresh(instrument)
+    _written()
+    instrument_cache.invalidate(_COUNT_KEY)
     return instrument
 
 
+@metrics.timed
 async def update_instrument(
     db: AsyncSession, instrument_id: int, data: InstrumentUpdate
 ) -> Optional[Instrument]:
-    instrument = await get_instrument_by_id(db, instrument_id)
+    instrument = await _load(db, instrument_id)
     if not instrument:
         return None
+    old_symbol = instrument.symbol
     update_data = data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(instrument, key, value)
     await db.commit()
     await db.refresh(instrument)
+    _written()
+    _invalidate(instrument.id, old_symbol, instrument.symbol)
     return instrument
 
 
+@metrics.timed
 async def delete_instrument(db: AsyncSession, instrument_id: int) -> bool:
-    instrument = await get_instrument_by_id(db, instrument_id)
+    instrument = await _load(db, instrument_id)
     if not instrument:
         return False
     await db.delete(instrument)
     await db.commit()
+    _written()
+    _invalidate(instrument_id, instrument.symbol)
+    instrument_cache.invalidate(_COUNT_KEY)
     return True
@@ -0,0 +1,296 @@
+"""
+Bulk ingest engine for the price tables.
+
+On PostgreSQL (asyncpg) rows are streamed with the binary COPY protocol, one
+transaction per chunk. Every other dialect (SQLite in the test suite) falls
+back to one executemany ``INSERT`` per chunk, which SQLAlchemy batches into
+multi-row ``VALUES`` where the dialect supports it.
+
+With ``ConflictMode.SKIP`` or ``UPDATE``, each chunk is first loaded (by COPY
+or INSERT) into a temporary staging table. Then one ``INSERT ... SELECT ...
+ON CONFLICT DO NOTHING/UPDATE`` on the natural key moves it into the target
+table. New rows are counted with a single grouped ``NOT EXISTS`` query before
+the move, so inserted and skipped/updated counts cost no per-row round trips.
+Callers must drop duplicate keys inside the batch first: PostgreSQL refuses to
+update the same row twice in one statement.
+
+With ``ConflictMode.ERROR`` a stored key fails its chunk, which is rolled back,
+and ``DuplicateKeyError`` reports what earlier chunks already committed.
+"""
+
+import logging
+import time
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Column, MetaData, Table, exists, func, insert, select, text, true
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.price import ConflictMode, IngestStats
+
+logger = logging.getLogger(__name__)
+
+_UNIQUE_VIOLATION = "23505"
+
+
+class DuplicateKeyError(Exception):
+    """A chunk was rejected because some of its natural keys are already stored."""
+
+    def __init__(
+        self, table: str, key_columns: Sequence[str], committed: int, inserted: Dict[int, int]
+    ) -> None:
+        self.table = table
+        self.key_columns = tuple(key_columns)
+        self.committed = committed
+        self.inserted_by_instrument = inserted
+        super().__init__(
+            f"Rows with an existing ({', '.join(self.key_columns)}) key in {table} were "
+            f"rejected ({committed} rows committed before the error)"
+        )
+
+
+def is_unique_violation(error: BaseException) -> bool:
+    """Whether ``error`` (SQLAlchemy, asyncpg or sqlite3) is a unique-index violation."""
+    for candidate in (error, getattr(error, "orig", None), error.__cause__):
+        if candidate is None:
+            continue
+        code = getattr(candidate, "sqlstate", None) or getattr(candidate, "pgcode", None)
+        if code:
+            return code == _UNIQUE_VIOLATION
+        if "UNIQUE constraint failed" in str(candidate):
+            return True
+    return False
+
+
+def frame_records(
+    frame: pd.DataFrame, columns: Sequence[str], batch_size: int = 10000
+) -> Iterator[Tuple]:
+    """
+    Turn a columnar frame into record tuples, mapping NaN/NaT to None per column.
+
+    Columns are converted ``batch_size`` rows at a time so the event loop is never
+    held for a whole-frame conversion.
+    """
+    for start in range(0, len(frame), batch_size):
+        batch = frame.iloc[start : start + batch_size]
+        arrays = []
+        for col in columns:
+            series = batch[col]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                values = np.asarray(series.dt.to_pydatetime(), dtype=object)
+            else:
+                values = series.to_numpy(dtype=object)
+            mask = series.isna().to_numpy()
+            if mask.any():
+                values = values.copy()
+                values[mask] = None
+            arrays.append(values)
+        yield from zip(*arrays)
+
+
+def _iter_chunks(records: Iterable[Tuple], size: int) -> Iterable[List[Tuple]]:
+    it = iter(records)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def dialect_insert(db: AsyncSession, table: Table):
+    """An ``INSERT`` construct supporting ``on_conflict_do_*`` for the session's dialect."""
+    name = db.get_bind().dialect.name
+    if name == "postgresql":
+        return postgresql.insert(table)
+    if name == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Upserts are not supported on dialect '{name}'")
+
+
+def _uses_copy(db: AsyncSession) -> bool:
+    dialect = db.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver == "asyncpg"
+
+
+async def _copy_records(
+    db: AsyncSession, table: Table, columns: Sequence[str], chunk: List[Tuple]
+) -> None:
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        table.name, records=chunk, columns=list(columns), schema_name=table.schema
+    )
+
+
+async def _copy_chunk(
+    db: AsyncSession, table: Table, columns: Sequence[str], chunk: List[Tuple]
+) -> None:
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    driver = raw.driver_connection
+    # SQLAlchemy's asyncpg adapter only sends BEGIN on its first statement, so the
+    # driver-level transaction below is a real top-level one committed per chunk.
+    async with driver.transaction():
+        await driver.copy_records_to_table(
+            table.name, records=chunk, columns=list(columns), schema_name=table.schema
+        )
+    await db.commit()
+
+
+async def _insert_records(
+    db: AsyncSession, table: Table, columns: Sequence[str], chunk: List[Tuple]
+) -> None:
+    # executemany form: compiling one literal multi-row VALUES per chunk costs far
+    # more than the insert itself on SQLite.
+    await db.execute(insert(table), [dict(zip(columns, record)) for record in chunk])
+
+
+async def _insert_chunk(
+    db: AsyncSession, table: Table, columns: Sequence[str], chunk: List[Tuple]
+) -> None:
+    await _insert_records(db, table, columns, chunk)
+    await db.commit()
+
+
+def _staging_table(table: Table, columns: Sequence[str]) -> Table:
+    return Table(
+        f"{table.name}_staging",
+        MetaData(),
+        *[Column(name, table.c[name].type) for name in columns],
+    )
+
+
+async def _upsert_chunk(
+    db: AsyncSession,
+    table: Table,
+    columns: Sequence[str],
+    chunk: List[Tuple],
+    key_columns: Sequence[str],
+    on_conflict: ConflictMode,
+    use_copy: bool,
+) -> Dict[int, int]:
+    """Merge ``chunk`` into ``table`` on ``key_columns``; returns new rows per instrument."""
+    staging = _staging_table(table, columns)
+    # A failed chunk is rolled back by the caller, which drops the staging table on
+    # PostgreSQL; SQLite runs DDL outside the transaction, so clear any leftover first.
+    await db.execute(text(f"DROP TABLE IF EXISTS {staging.name}"))
+    # CREATE TABLE AS copies the column types on both PostgreSQL and SQLite, and a
+    # TEMP table lives only on this connection for the chunk's single transaction.
+    await db.execute(
+        text(
+            f"CREATE TEMP TABLE {staging.name} AS "
+            f"SELECT {', '.join(columns)} FROM {table.name} LIMIT 0"
+        )
+    )
+    if use_copy:
+        await _copy_records(db, staging, columns, chunk)
+    else:
+        await _insert_records(db, staging, columns, chunk)
+
+    stored = exists().where(*[table.c[name] == staging.c[name] for name in key_columns])
+    result = await db.execute(
+        select(staging.c.instrument_id, func.count())
+        .where(~stored)
+        .group_by(staging.c.instrument_id)
+    )
+    new_rows = {int(instrument_id): count for instrument_id, count in result.all()}
+
+    # The WHERE clause keeps SQLite from parsing ON CONFLICT as a join constraint.
+    stmt = dialect_insert(db, table).from_select(
+        list(columns), select(*[staging.c[name] for name in columns]).where(true())
+    )
+    if on_conflict == ConflictMode.UPDATE:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={name: stmt.excluded[name] for name in columns if name not in key_columns},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=list(key_columns))
+    await db.execute(stmt)
+    await db.execute(text(f"DROP TABLE {staging.name}"))
+    await db.commit()
+    return new_rows
+
+
+async def bulk_ingest(
+    db: AsyncSession,
+    table: Table,
+    columns: Sequence[str],
+    records: Iterable[Tuple],
+    chunk_size: int,
+    key_columns: Sequence[str] = (),
+    on_conflict: ConflictMode = ConflictMode.ERROR,
+) -> IngestStats:
+    """
+    Insert ``records`` (tuples ordered like ``columns``) into ``table`` chunk by chunk.
+
+    ``on_conflict`` decides what happens to records whose ``key_columns`` are
+    already stored: ``ERROR`` inserts directly and lets the unique index reject
+    the chunk, ``SKIP`` keeps the stored row and ``UPDATE`` overwrites it.
+    """
+    use_copy = _uses_copy(db)
+    if use_copy:
+        # Close any transaction the session already holds so each COPY commits on its own.
+        await db.commit()
+    chunk_size = max(chunk_size, 1)
+    upsert = on_conflict != ConflictMode.ERROR and bool(key_columns)
+    instrument_index = list(columns).index("instrument_id")
+
+    rows = 0
+    chunks = 0
+    inserted: Counter = Counter()
+    started = time.perf_counter()
+    for chunk in _iter_chunks(records, chunk_size):
+        try:
+            if upsert:
+                inserted.update(
+                    await _upsert_chunk(
+                        db, table, columns, chunk, key_columns, on_conflict, use_copy
+                    )
+                )
+            else:
+                if use_copy:
+                    await _copy_chunk(db, table, columns, chunk)
+                else:
+                    await _insert_chunk(db, table, columns, chunk)
+                inserted.update(int(record[instrument_index]) for record in chunk)
+        except Exception as e:
+            await db.rollback()
+            if is_unique_violation(e):
+                raise DuplicateKeyError(table.name, key_columns, rows, dict(inserted)) from e
+            raise
+        rows += len(chunk)
+        chunks += 1
+    elapsed = time.perf_counter() - started
+
+    new_rows = sum(inserted.values())
+    stats = IngestStats(
+        rows=rows,
+        chunks=chunks,
+        elapsed=elapsed,
+        rows_per_sec=rows / elapsed if elapsed > 0 else 0.0,
+        method="copy" if use_copy else "insert",
+        inserted=new_rows,
+        skipped=rows - new_rows if on_conflict == ConflictMode.SKIP else 0,
+        updated=rows - new_rows if on_conflict == ConflictMode.UPDATE else 0,
+        inserted_by_instrument=dict(inserted),
+    )
+    logger.info(
+        "Bulk ingest into %s via %s (on conflict: %s): %d rows in %d chunks, "
+        "%d inserted, %d skipped, %d updated, %.3fs (%.0f rows/s)",
+        table.name,
+        stats.method,
+        on_conflict.value,
+        stats.rows,
+        stats.chunks,
+        stats.inserted,
+        stats.skipped,
+        stats.updated,
+        stats.elapsed,
+        stats.rows_per_sec,
+    )
+    return stats
@@ -0,0 +1,87 @@
+"""
+Columnar (Apache Arrow) encodings of price query results.
+
+Tables are built directly from result rows: rows are transposed with ``zip``
+and each column becomes one typed Arrow array, with no ORM instances or
+Pydantic models in between.
+"""
+
+import io
+from typing import Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+_MEDIA_TYPES = {
+    ARROW_STREAM_MEDIA_TYPE: ARROW_STREAM_MEDIA_TYPE,
+    "application/x-arrow-stream": ARROW_STREAM_MEDIA_TYPE,
+    PARQUET_MEDIA_TYPE: PARQUET_MEDIA_TYPE,
+    "application/x-parquet": PARQUET_MEDIA_TYPE,
+}
+
+_LABEL = pa.dictionary(pa.int8(), pa.string())
+
+TICK_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("instrument_id", pa.int32()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("bid", pa.float64()),
+        ("ask", pa.float64()),
+        ("volume", pa.float64()),
+    ]
+)
+
+OHLC_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("instrument_id", pa.int32()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("open", pa.float64()),
+        ("high", pa.float64()),
+        ("low", pa.float64()),
+        ("close", pa.float64()),
+        ("volume", pa.float64()),
+        ("timeframe", _LABEL),
+        ("price_type", _LABEL),
+    ]
+)
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """Return the columnar media type named in an ``Accept`` header, or None for JSON."""
+    if not accept:
+        return None
+    for part in accept.split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in _MEDIA_TYPES:
+            return _MEDIA_TYPES[media_type]
+    return None
+
+
+def rows_to_table(rows: Sequence[Sequence], schema: pa.Schema) -> pa.Table:
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    arrays = [pa.array(col, type=field.type) for col, field in zip(columns, schema)]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def to_arrow_ipc(table: pa.Table) -> bytes:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def to_parquet(table: pa.Table) -> bytes:
+    sink = io.BytesIO()
+    pq.write_table(table, sink, compression="zstd")
+    return sink.getvalue()
+
+
+def encode(table: pa.Table, media_type: str) -> bytes:
+    if media_type == PARQUET_MEDIA_TYPE:
+        return to_parquet(table)
+    return to_arrow_ipc(table)
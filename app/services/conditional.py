@@ -0,0 +1,77 @@
+"""
+Conditional GET support (RFC 9110 §13): ``ETag`` / ``If-None-Match`` and
+``Last-Modified`` / ``If-Modified-Since``.
+
+ETags are weak: they identify the same representation, not the same bytes.
+``If-None-Match`` takes precedence over ``If-Modified-Since``, as the RFC
+requires.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("\x1f".join(map(str, parts)).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def request_etag(request: Request, *parts) -> str:
+    """ETag of ``parts`` plus the request path, query parameters and ``Accept`` header."""
+    params = sorted(request.query_params.multi_items())
+    return make_etag(request.url.path, params, request.headers.get("accept", ""), *parts)
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _opaque(tag: str) -> str:
+    return tag.strip().removeprefix("W/")
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of ``etag`` against an ``If-None-Match`` list."""
+    if header.strip() == "*":
+        return True
+    return _opaque(etag) in {_opaque(tag) for tag in header.split(",")}
+
+
+def modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return True
+    return _utc(last_modified).replace(microsecond=0) > _utc(since)
+
+
+def validators(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified), usegmt=True)
+    return headers
+
+
+def not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """A ``304`` response if the request's validators still match, otherwise None."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = (
+            if_modified_since is not None
+            and last_modified is not None
+            and not modified_since(if_modified_since, last_modified)
+        )
+    if not fresh:
+        return None
+    return Response(status_code=304, headers=validators(etag, last_modified))
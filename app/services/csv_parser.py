@@ -0,0 +1,85 @@
+"""
+Column-wise conversion of uploaded price CSVs into insert-ready frames.
+
+Each function validates the required columns up front, parses the timestamp
+column in one pass and returns a DataFrame whose columns match the target
+table, ready for ``price_service.bulk_insert_*``. The ``read_*_csv`` entry
+points take raw bytes and are safe to run in the parse process pool.
+"""
+
+import io
+
+import pandas as pd
+
+from app.models.price import PriceType, TimeFrame
+
+TICK_REQUIRED_COLUMNS = ("timestamp", "bid", "ask")
+OHLC_REQUIRED_COLUMNS = ("timestamp", "open", "high", "low", "close")
+
+
+def _check_columns(df: pd.DataFrame, required: tuple) -> None:
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+
+def _timestamps(df: pd.DataFrame) -> pd.Series:
+    timestamps = pd.to_datetime(df["timestamp"])
+    if timestamps.isna().any():
+        raise ValueError("Column 'timestamp' contains empty or unparseable values")
+    return timestamps
+
+
+def _numeric(df: pd.DataFrame, col: str) -> pd.Series:
+    return pd.to_numeric(df[col]).astype("float64")
+
+
+def _volume(df: pd.DataFrame) -> pd.Series:
+    # NaN marks a missing volume; the bulk insert path turns it into NULL with a column mask.
+    if "volume" not in df.columns:
+        return pd.Series(float("nan"), index=df.index, dtype="float64")
+    return _numeric(df, "volume")
+
+
+def parse_tick_frame(df: pd.DataFrame, instrument_id: int) -> pd.DataFrame:
+    _check_columns(df, TICK_REQUIRED_COLUMNS)
+    return pd.DataFrame(
+        {
+            "instrument_id": instrument_id,
+            "timestamp": _timestamps(df),
+            "bid": _numeric(df, "bid"),
+            "ask": _numeric(df, "ask"),
+            "volume": _volume(df),
+        },
+        index=df.index,
+    )
+
+
+def parse_ohlc_frame(
+    df: pd.DataFrame, instrument_id: int, timeframe: TimeFrame, price_type: PriceType
+) -> pd.DataFrame:
+    _check_columns(df, OHLC_REQUIRED_COLUMNS)
+    return pd.DataFrame(
+        {
+            "instrument_id": instrument_id,
+            "timestamp": _timestamps(df),
+            "open": _numeric(df, "open"),
+            "high": _numeric(df, "high"),
+            "low": _numeric(df, "low"),
+            "close": _numeric(df, "close"),
+            "volume": _volume(df),
+            "timeframe": timeframe.value,
+            "price_type": price_type.value,
+        },
+        index=df.index,
+    )
+
+
+def read_tick_csv(content: bytes, instrument_id: int) -> pd.DataFrame:
+    return parse_tick_frame(pd.read_csv(io.BytesIO(content)), instrument_id)
+
+
+def read_ohlc_csv(
+    content: bytes, instrument_id: int, timeframe: TimeFrame, price_type: PriceType
+) -> pd.DataFrame:
+    return parse_ohlc_frame(pd.read_csv(io.BytesIO(content)), instrument_id, timeframe, price_type)
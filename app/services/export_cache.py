@@ -0,0 +1,159 @@
+"""
+Content-addressed cache of finished export files.
+
+Files live in ``<ASYNC_EXPORT_DIR>/cache`` and are named
+``<instrument_id>-<key>.<ext>``. The key hashes the export parameters
+together with the instrument's data version, which is the mtime of a
+marker file touched on every ingest. New data therefore changes the key
+for all later requests, and the stale files are removed right away.
+Because all state is on disk, every worker sharing the export directory
+sees the same cache.
+
+Entries expire ``EXPORT_CACHE_TTL_SECONDS`` after their last hit. The
+least recently used files are evicted while the cache exceeds
+``EXPORT_CACHE_MAX_BYTES``.
+
+Jobs never point at a cache entry. Each job has its own
+``<ASYNC_EXPORT_DIR>/<job_id>.<ext>``, hard-linked to the entry when the
+filesystem allows it and copied otherwise. Evicting or invalidating an
+entry therefore never breaks a download link that was already issued. Job
+files are removed ``EXPORT_JOB_TTL_SECONDS`` after their last write, when
+their job has expired too.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _cache_dir() -> str:
+    return os.path.join(settings.ASYNC_EXPORT_DIR, "cache")
+
+
+def _marker(instrument_id: int) -> str:
+    return os.path.join(_cache_dir(), f"{instrument_id}.version")
+
+
+def data_version(instrument_id: int) -> int:
+    try:
+        return os.stat(_marker(instrument_id)).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def export_key(kind: str, instrument_id: int, **params) -> str:
+    """Hash the export parameters and the instrument's current data version."""
+    payload = {
+        "kind": kind,
+        "instrument_id": instrument_id,
+        "version": data_version(instrument_id),
+        **params,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _path(instrument_id: int, key: str, ext: str) -> str:
+    return os.path.join(_cache_dir(), f"{instrument_id}-{key}.{ext}")
+
+
+def lookup(instrument_id: int, key: str, ext: str = "csv") -> Optional[str]:
+    """Return the cached file for ``key``, or None when missing or expired."""
+    path = _path(instrument_id, key, ext)
+    try:
+        age = time.time() - os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+    if age > settings.EXPORT_CACHE_TTL_SECONDS:
+        _remove(path)
+        return None
+    os.utime(path)
+    return path
+
+
+def _link(source: str, target: str) -> None:
+    partial = target + ".part"
+    try:
+        os.link(source, partial)
+    except OSError:
+        shutil.copyfile(source, partial)
+    os.replace(partial, target)
+
+
+def store(instrument_id: int, key: str, file_path: str, ext: str = "csv") -> str:
+    """Add a finished export to the cache (``file_path`` stays in place); return the entry."""
+    os.makedirs(_cache_dir(), exist_ok=True)
+    path = _path(instrument_id, key, ext)
+    _link(file_path, path)
+    evict(keep=path)
+    return path
+
+
+def job_file(cached_path: str, export_dir: str, job_id: str, ext: str) -> str:
+    """Give job ``job_id`` its own file with the contents of the cache entry."""
+    os.makedirs(export_dir, exist_ok=True)
+    path = os.path.join(export_dir, f"{job_id}.{ext}")
+    _link(cached_path, path)
+    remove_expired_job_files(export_dir)
+    return path
+
+
+def remove_expired_job_files(export_dir: str) -> None:
+    cutoff = time.time() - settings.EXPORT_JOB_TTL_SECONDS
+    for path in glob.glob(os.path.join(export_dir, "*.*")):
+        try:
+            if os.path.isfile(path) and os.stat(path).st_mtime < cutoff:
+                _remove(path)
+        except FileNotFoundError:
+            continue
+
+
+def evict(keep: Optional[str] = None) -> None:
+    entries = []
+    now = time.time()
+    for path in glob.glob(os.path.join(_cache_dir(), "*-*.*")):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        if now - stat.st_mtime > settings.EXPORT_CACHE_TTL_SECONDS and path != keep:
+            _remove(path)
+        else:
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= settings.EXPORT_CACHE_MAX_BYTES:
+            break
+        if path != keep:
+            _remove(path)
+            total -= size
+
+
+def invalidate_instrument(instrument_id: int) -> None:
+    """Bump the instrument's data version and drop its cached exports."""
+    os.makedirs(_cache_dir(), exist_ok=True)
+    marker = _marker(instrument_id)
+    with open(marker, "a"):
+        pass
+    # Force a new mtime even when two ingests land within the clock resolution.
+    stamp = max(time.time_ns(), data_version(instrument_id) + 1)
+    os.utime(marker, ns=(stamp, stamp))
+    for path in glob.glob(os.path.join(_cache_dir(), f"{instrument_id}-*")):
+        _remove(path)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    else:
+        logger.debug("Evicted cached export %s", path)
@@ -0,0 +1,101 @@
+"""
+File writers for async exports.
+
+Each batch of result rows is converted once into an Arrow table and handed
+to a pyarrow writer, so numbers and timestamps are encoded column by column
+in native code instead of one ``str()`` call per value. Compressed CSV
+streams through pyarrow's gzip/zstd codecs; Parquet batches are buffered
+until a full row group is available.
+"""
+
+from typing import List, Sequence
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from app.schemas.price import ExportFormat
+from app.services.columnar import ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE, rows_to_table
+
+EXTENSIONS = {
+    ExportFormat.CSV: "csv",
+    ExportFormat.CSV_GZIP: "csv.gz",
+    ExportFormat.CSV_ZSTD: "csv.zst",
+    ExportFormat.PARQUET: "parquet",
+    ExportFormat.ARROW: "arrow",
+}
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.CSV_GZIP: "application/gzip",
+    ExportFormat.CSV_ZSTD: "application/zstd",
+    ExportFormat.PARQUET: PARQUET_MEDIA_TYPE,
+    ExportFormat.ARROW: ARROW_STREAM_MEDIA_TYPE,
+}
+
+_CODECS = {ExportFormat.CSV_GZIP: "gzip", ExportFormat.CSV_ZSTD: "zstd"}
+
+# Values are numbers, timestamps and enum labels, none of which need quoting.
+_CSV_OPTIONS = pa_csv.WriteOptions(quoting_style="none", quoting_header="none")
+
+
+def format_for_path(path: str) -> ExportFormat:
+    # Longest extension first so "x.csv.gz" is not taken for plain CSV.
+    for fmt, ext in sorted(EXTENSIONS.items(), key=lambda item: -len(item[1])):
+        if path.endswith("." + ext):
+            return fmt
+    return ExportFormat.CSV
+
+
+class ExportWriter:
+    def __init__(
+        self, path: str, schema: pa.Schema, fmt: ExportFormat, row_group_size: int
+    ) -> None:
+        self.schema = schema
+        self.fmt = fmt
+        self.row_group_size = row_group_size
+        self._file = pa.OSFile(path, "wb")
+        self._pending: List[pa.Table] = []
+        self._pending_rows = 0
+        if fmt in _CODECS:
+            self._sink = pa.CompressedOutputStream(self._file, _CODECS[fmt])
+        else:
+            self._sink = self._file
+        if fmt == ExportFormat.PARQUET:
+            self._writer = pq.ParquetWriter(self._sink, schema, compression="zstd")
+        elif fmt == ExportFormat.ARROW:
+            self._writer = pa.ipc.new_stream(self._sink, schema)
+        else:
+            self._writer = pa_csv.CSVWriter(self._sink, schema, write_options=_CSV_OPTIONS)
+
+    @property
+    def bytes_written(self) -> int:
+        return self._file.tell()
+
+    def write(self, rows: Sequence[Sequence]) -> None:
+        table = rows_to_table(rows, self.schema)
+        if self.fmt != ExportFormat.PARQUET:
+            self._writer.write_table(table)
+            return
+        self._pending.append(table)
+        self._pending_rows += table.num_rows
+        if self._pending_rows >= self.row_group_size:
+            self._flush_row_groups()
+
+    def _flush_row_groups(self, final: bool = False) -> None:
+        table = pa.concat_tables(self._pending)
+        cut = len(table) if final else len(table) - len(table) % self.row_group_size
+        if cut:
+            self._writer.write_table(table.slice(0, cut), row_group_size=self.row_group_size)
+        rest = table.slice(cut)
+        self._pending = [rest] if len(rest) else []
+        self._pending_rows = len(rest)
+
+    def close(self) -> None:
+        if self._pending:
+            self._flush_row_groups(final=True)
+        self._writer.close()
+        if self._sink is not self._file:
+            self._sink.close()
+        if not self._file.closed:
+            self._file.close()
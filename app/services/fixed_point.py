@@ -0,0 +1,94 @@
+"""
+Vectorized conversion between price frames and fixed-point storage.
+
+With ``PRICE_STORAGE=fixed``, prices are stored as BIGINT scaled by the
+instrument's ``price_scale`` and timestamps as epoch microseconds. Whole
+columns are converted with numpy on the way in and on the way out, so rows
+never pass through ``Decimal`` and the database works on 8-byte integers
+instead of variable-length numerics.
+"""
+
+from collections import namedtuple
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.models.price import VOLUME_SCALE
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_epoch_us(value: datetime) -> int:
+    """Epoch microseconds for ``value``; naive datetimes are taken as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _scaled(values: np.ndarray, digits: int, column: str) -> np.ndarray:
+    scaled = np.rint(values * 10.0**digits)
+    # 2**63 is exact as a float; anything at or beyond it would wrap on the int64 cast.
+    if (np.abs(scaled) >= 2.0**63).any():
+        limit = 2.0**63 / 10.0**digits
+        raise ValueError(
+            f"{column} out of range for fixed-point storage with {digits} decimal places "
+            f"(absolute value must be below {limit:.6g})"
+        )
+    return scaled
+
+
+def encode_frame(frame: pd.DataFrame, price_columns: Sequence[str], scale: int) -> pd.DataFrame:
+    """
+    Copy of ``frame`` with integer timestamps and prices, ready for bulk ingest.
+
+    Raises ``ValueError`` when a price or volume does not fit in a BIGINT at its scale.
+    """
+    out = frame.copy(deep=False)
+    timestamps = pd.DatetimeIndex(frame["timestamp"])
+    timestamps = (
+        timestamps.tz_localize("UTC") if timestamps.tz is None else timestamps.tz_convert("UTC")
+    )
+    out["timestamp"] = timestamps.as_unit("us").asi8
+    for column in price_columns:
+        prices = _scaled(frame[column].to_numpy(dtype="float64"), scale, column)
+        out[column] = prices.astype("int64")
+    if "volume" in frame:
+        volume = _scaled(frame["volume"].to_numpy(dtype="float64"), VOLUME_SCALE, "volume")
+        out["volume"] = pd.array(volume, dtype="Int64")
+    return out
+
+
+def _unscaled(values: Sequence, digits: int) -> list:
+    array = np.array(values, dtype="float64") / 10.0**digits
+    missing = np.isnan(array)
+    if not missing.any():
+        return array.tolist()
+    result = array.astype(object)
+    result[missing] = None
+    return result.tolist()
+
+
+@lru_cache(maxsize=None)
+def _row_type(fields: tuple):
+    return namedtuple("PriceRow", fields)
+
+
+def decode_rows(
+    rows: Sequence[Sequence], fields: Sequence[str], price_columns: Sequence[str], scale: int
+) -> List[tuple]:
+    """Turn raw fixed-point rows into named tuples with float prices and UTC datetimes."""
+    if not rows:
+        return []
+    row_type = _row_type(tuple(fields))
+    columns = dict(zip(fields, (list(column) for column in zip(*rows))))
+    micros = np.array(columns["timestamp"], dtype="int64")
+    columns["timestamp"] = pd.to_datetime(micros, unit="us", utc=True).to_pydatetime()
+    for column in price_columns:
+        columns[column] = _unscaled(columns[column], scale)
+    if "volume" in columns:
+        columns["volume"] = _unscaled(columns["volume"], VOLUME_SCALE)
+    return list(map(row_type._make, zip(*(columns[field] for field in fields))))
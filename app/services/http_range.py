@@ -0,0 +1,48 @@
+"""
+Single-range ``Range: bytes=...`` support for file downloads (RFC 9110 §14).
+
+Multi-range requests are answered with the full file, which the RFC allows.
+"""
+
+from typing import AsyncIterator, Optional, Tuple
+
+import aiofiles
+
+READ_CHUNK_BYTES = 256 * 1024
+
+
+class RangeNotSatisfiableError(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Return the inclusive (start, end) byte span of a single range, or None for the full file."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if not start_text:
+            # Suffix range: the last N bytes.
+            length = int(end_text)
+            if length <= 0:
+                raise RangeNotSatisfiableError(header)
+            return max(size - length, 0), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise RangeNotSatisfiableError(header)
+    return start, min(end, size - 1)
+
+
+async def iter_file_range(path: str, start: int, end: int) -> AsyncIterator[bytes]:
+    remaining = end - start + 1
+    async with aiofiles.open(path, "rb") as f:
+        await f.seek(start)
+        while remaining > 0:
+            chunk = await f.read(min(READ_CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
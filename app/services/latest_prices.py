@@ -0,0 +1,172 @@
+"""
+Latest tick and bar per instrument, kept in the ``latest_prices`` snapshot.
+
+A series is an instrument's ticks, or its bars of one (price_type, timeframe).
+Every ingest that stores rows upserts the newest row of each series it
+touched. The upsert only moves a series forward in time (or rewrites the same
+timestamp when rows were updated), so backfilling older data leaves it alone.
+A series without a snapshot row is seeded from its price table on its next
+ingest, which covers rows stored before the snapshot existed.
+
+``snapshot`` mirrors the table in memory, so ``GET /prices/latest`` is a dict
+lookup. Ingest updates the mirror of the worker that handled it. Other workers
+and pods reload the table once their copy is older than
+``LATEST_PRICES_TTL_SECONDS``, and may serve the previous quote until then.
+"""
+
+import math
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.price import LatestPrice, PriceType
+from app.schemas.price import LatestPriceResponse
+from app.services.bulk_ingest import dialect_insert
+
+# (instrument_id, price_type, timeframe); the timeframe is "" for ticks.
+SeriesKey = Tuple[int, PriceType, str]
+FIELDS = ("timestamp", "bid", "ask", "open", "high", "low", "close", "volume")
+_COLUMNS = ("instrument_id", "price_type", "timeframe", *FIELDS)
+
+# Rows per upsert; 11 parameters each, well under SQLite's bound-parameter limit.
+_UPSERT_BATCH = 500
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _response(values: Mapping) -> LatestPriceResponse:
+    fields = {column: values[column] for column in _COLUMNS}
+    fields.update(timeframe=fields["timeframe"] or None, timestamp=_utc(fields["timestamp"]))
+    return LatestPriceResponse(**fields)
+
+
+# instrument id -> (price_type, timeframe) -> newest row
+_Mirror = Dict[int, Dict[Tuple[str, str], LatestPriceResponse]]
+
+
+class Snapshot:
+    """In-process mirror of ``latest_prices``."""
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.reloads = 0
+        self._by_instrument: Optional[_Mirror] = None
+        self._loaded_at = -math.inf
+
+    def apply(self, entries: Iterable[LatestPriceResponse]) -> None:
+        """Keep each entry unless the mirror already holds a newer row of its series."""
+        if self._by_instrument is None:
+            return
+        for entry in entries:
+            series = self._by_instrument.setdefault(entry.instrument_id, {})
+            key = (entry.price_type.value, entry.timeframe.value if entry.timeframe else "")
+            current = series.get(key)
+            if current is None or current.timestamp <= entry.timestamp:
+                series[key] = entry
+
+    async def _fresh(self, db: AsyncSession) -> _Mirror:
+        now = time.monotonic()
+        if self._by_instrument is not None and now - self._loaded_at < self.ttl:
+            return self._by_instrument
+        # Readers arriving during a reload keep using the current copy.
+        self._loaded_at = now
+        try:
+            result = await db.execute(select(LatestPrice))
+        except Exception:
+            self._loaded_at = -math.inf
+            raise
+        entries = [
+            _response({column: getattr(row, column) for column in _COLUMNS})
+            for row in result.scalars()
+        ]
+        if self._by_instrument is None:
+            self._by_instrument = {}
+        self.apply(entries)
+        self.reloads += 1
+        return self._by_instrument
+
+    async def for_instrument(
+        self, db: AsyncSession, instrument_id: int
+    ) -> List[LatestPriceResponse]:
+        series = (await self._fresh(db)).get(instrument_id, {})
+        return [series[key] for key in sorted(series)]
+
+    async def all(self, db: AsyncSession) -> List[LatestPriceResponse]:
+        by_instrument = await self._fresh(db)
+        entries = []
+        for instrument_id in sorted(by_instrument):
+            series = by_instrument[instrument_id]
+            entries.extend(series[key] for key in sorted(series))
+        return entries
+
+    def clear(self) -> None:
+        self._by_instrument = None
+        self._loaded_at = -math.inf
+
+    def stats(self) -> dict:
+        by_instrument = self._by_instrument or {}
+        return {
+            "instruments": len(by_instrument),
+            "series": sum(len(series) for series in by_instrument.values()),
+            "reloads": self.reloads,
+        }
+
+
+snapshot = Snapshot(ttl=settings.LATEST_PRICES_TTL_SECONDS)
+
+
+async def missing_series(db: AsyncSession, keys: Iterable[SeriesKey]) -> Set[SeriesKey]:
+    """The series among ``keys`` that have no snapshot row yet."""
+    keys = set(keys)
+    if not keys:
+        return set()
+    result = await db.execute(
+        select(LatestPrice.instrument_id, LatestPrice.price_type, LatestPrice.timeframe).where(
+            LatestPrice.instrument_id.in_({key[0] for key in keys})
+        )
+    )
+    return keys - {tuple(row) for row in result.all()}
+
+
+async def record(db: AsyncSession, rows: Sequence[dict], replace_equal: bool) -> None:
+    """
+    Upsert the newest row of each series in ``rows`` and update the mirror.
+
+    A stored row is replaced by a newer one, or by one with the same timestamp
+    if ``replace_equal`` (the ingest updated existing price rows). Commits.
+    """
+    written: List[LatestPriceResponse] = []
+    for start in range(0, len(rows), _UPSERT_BATCH):
+        values = [
+            {
+                **{column: row.get(column) for column in _COLUMNS},
+                "timestamp": _utc(row["timestamp"]),
+            }
+            for row in rows[start : start + _UPSERT_BATCH]
+        ]
+        stmt = dialect_insert(db, LatestPrice.__table__).values(values)
+        newer = (
+            LatestPrice.timestamp <= stmt.excluded.timestamp
+            if replace_equal
+            else LatestPrice.timestamp < stmt.excluded.timestamp
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["instrument_id", "price_type", "timeframe"],
+            set_={
+                **{field: stmt.excluded[field] for field in FIELDS},
+                "updated_at": func.now(),
+            },
+            where=newer,
+        ).returning(*[LatestPrice.__table__.c[column] for column in _COLUMNS])
+        result = await db.execute(stmt)
+        written.extend(_response(row._mapping) for row in result.all())
+    await db.commit()
+    snapshot.apply(written)
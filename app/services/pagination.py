@@ -0,0 +1,27 @@
+"""
+Opaque keyset cursors for the price range queries.
+
+A cursor encodes the ``(timestamp, id)`` of the last row of a page; the next page
+starts strictly after it, so fetching page N costs the same as page 1.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    payload = json.dumps({"t": timestamp.isoformat(), "i": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), int(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
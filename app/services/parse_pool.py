@@ -0,0 +1,51 @@
+"""
+Process pool for CPU-bound CSV parsing.
+
+The pool is started and stopped by ``app.main.lifespan``. Workers return parsed
+DataFrames, which are pickled back as their numpy column blocks, so the event
+loop only pays for unpickling. When the pool is not running (workers set to 0,
+or outside the app lifespan) parsing falls back to the default thread pool.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def start_parse_pool(workers: int) -> None:
+    global _executor
+    if workers <= 0 or _executor is not None:
+        return
+    # spawn avoids forking a process that already runs an event loop and threads.
+    _executor = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    logger.info("Started CSV parse pool with %d workers", workers)
+
+
+def shutdown_parse_pool() -> None:
+    global _executor
+    if _executor is None:
+        return
+    _executor.shutdown(wait=True, cancel_futures=True)
+    _executor = None
+
+
+async def run_parse(fn: Callable[..., T], *args) -> T:
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    try:
+        return await loop.run_in_executor(_executor, fn, *args)
+    finally:
+        metrics.PARSE_SECONDS.observe(time.perf_counter() - started, fn.__name__)
@@ -0,0 +1,149 @@
+"""
+Monthly range partitions for ``tick_data`` and ``ohlc_data`` on PostgreSQL.
+
+The partitioned parents are created by the ``partition_price_tables``
+migration. This module creates the child partitions: months ahead at
+startup, and any month an ingest touches just before its rows are
+written. With ``PARTITION_INSTRUMENT_HASH_MODULUS`` > 0, each month is
+further split by ``HASH (instrument_id)``.
+
+Every query in ``price_service`` filters on ``timestamp``, so PostgreSQL
+prunes partitions outside the range. Old months can be detached with a
+catalog-only ``ALTER TABLE ... DETACH PARTITION`` and archived or dropped
+separately.
+
+All functions are no-ops on other dialects and on unpartitioned tables.
+"""
+
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Set
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("tick_data", "ohlc_data")
+
+_NAME = re.compile(r"_y(\d{4})m(\d{2})$")
+
+_created: Set[str] = set()
+_partitioned: Dict[str, bool] = {}
+
+
+def month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(first: date, last: date) -> List[date]:
+    months, month = [], month_start(first)
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_ddl(table: str, month: date, hash_modulus: int = 0) -> List[str]:
+    """Statements creating the ``month`` partition of ``table`` (and its hash children)."""
+    name = partition_name(table, month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    create = (
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start} 00:00:00+00') TO ('{end} 00:00:00+00')"
+    )
+    if not hash_modulus:
+        return [create]
+    statements = [create + " PARTITION BY HASH (instrument_id)"]
+    for remainder in range(hash_modulus):
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {name}_h{remainder} PARTITION OF {name} "
+            f"FOR VALUES WITH (MODULUS {hash_modulus}, REMAINDER {remainder})"
+        )
+    return statements
+
+
+async def _is_partitioned(db: AsyncSession, table: str) -> bool:
+    if db.bind.dialect.name != "postgresql":
+        return False
+    if table not in _partitioned:
+        result = await db.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :table"
+            ),
+            {"table": table},
+        )
+        _partitioned[table] = result.scalar() is not None
+    return _partitioned[table]
+
+
+async def ensure_partitions(db: AsyncSession, table: str, months: Iterable[date]) -> None:
+    if not await _is_partitioned(db, table):
+        return
+    missing = sorted({m for m in months if partition_name(table, m) not in _created})
+    for month in missing:
+        for statement in partition_ddl(table, month, settings.PARTITION_INSTRUMENT_HASH_MODULUS):
+            await db.execute(text(statement))
+        _created.add(partition_name(table, month))
+    if missing:
+        await db.commit()
+        logger.info("Ensured %d %s partitions", len(missing), table)
+
+
+async def ensure_for_frame(db: AsyncSession, table: str, frame: pd.DataFrame) -> None:
+    """Create the partitions for every month in ``frame`` before its rows are written."""
+    if frame.empty or not await _is_partitioned(db, table):
+        return
+    timestamps = pd.DatetimeIndex(frame["timestamp"])
+    if timestamps.tz is not None:
+        timestamps = timestamps.tz_convert("UTC")
+    months = {date(year, month, 1) for year, month in zip(timestamps.year, timestamps.month)}
+    await ensure_partitions(db, table, months)
+
+
+async def ensure_ahead(db: AsyncSession, months_ahead: int) -> None:
+    current = month_start(datetime.now(timezone.utc))
+    months = month_range(current, add_months(current, months_ahead))
+    for table in PARTITIONED_TABLES:
+        await ensure_partitions(db, table, months)
+
+
+async def detach_partitions_before(db: AsyncSession, table: str, cutoff: date) -> List[str]:
+    """Detach every monthly partition of ``table`` that ends on or before ``cutoff``."""
+    if not await _is_partitioned(db, table):
+        return []
+    result = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ),
+        {"table": table},
+    )
+    detached = []
+    for (name,) in result.all():
+        match = _NAME.search(name)
+        if not match:
+            continue
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        if add_months(month, 1) <= cutoff:
+            await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            _created.discard(name)
+            detached.append(name)
+    await db.commit()
+    return sorted(detached)
@@ -1,26 +1,442 @@
-from typing import List, Optional, Tuple
-from datetime import datetime
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from app.models.price import TickData, OHLCData, TimeFrame, PriceType
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, timezone
+import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import Float, Row, Select, cast, select, func, tuple_, update
+from app.config import settings
+from app.models.asset import Instrument
+from app.models.price import (
+    OHLCData,
+    OHLCDataFixed,
+    PriceType,
+    TickData,
+    TickDataFixed,
+    TimeFrame,
+)
+from app.schemas.price import (
+    ConflictMode,
+    IngestStats,
+    LatestPriceResponse,
+    OHLCDataResponse,
+    QuoteSide,
+    TickDataResponse,
+    TotalMode,
+)
+from app.services import (
+    asset_service,
+    export_cache,
+    fixed_point,
+    latest_prices,
+    metrics,
+    partitions,
+    query_cache,
+    rollups,
+    row_counts,
+)
+from app.services.bulk_ingest import DuplicateKeyError, bulk_ingest, frame_records
+from app.services.pagination import Cursor
+from app.services.resample import bucket
 
+TICK_COLUMNS = ("instrument_id", "timestamp", "bid", "ask", "volume")
+OHLC_COLUMNS = (
+    "instrument_id",
+    "timestamp",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "timeframe",
+    "price_type",
+)
+# Natural keys, backed by the unique indexes on the price tables.
+TICK_KEY = ("instrument_id", "timestamp")
+OHLC_KEY = ("instrument_id", "timestamp", "timeframe", "price_type")
+TICK_PRICES = ("bid", "ask")
+OHLC_PRICES = ("open", "high", "low", "close")
 
-async def bulk_insert_tick_data(db: AsyncSession, rows: List[dict]) -> int:
-    if not rows:
-        return 0
-    db.add_all([TickData(**row) for row in rows])
+
+def _fixed() -> bool:
+    return settings.PRICE_STORAGE == "fixed"
+
+
+def _tick_model():
+    return TickDataFixed if _fixed() else TickData
+
+
+def _ohlc_model():
+    return OHLCDataFixed if _fixed() else OHLCData
+
+
+def _ts(value: Optional[datetime]):
+    """A timestamp bound in the representation of the active storage mode."""
+    if value is None or not _fixed():
+        return value
+    return fixed_point.to_epoch_us(value)
+
+
+async def _price_scale(db: AsyncSession, instrument_id: int) -> int:
+    instrument = await asset_service.get_instrument_by_id(db, instrument_id)
+    return 8 if instrument is None else instrument.price_scale
+
+
+async def _encode_fixed(
+    db: AsyncSession, frame: pd.DataFrame, price_columns: Sequence[str]
+) -> pd.DataFrame:
+    parts = [
+        fixed_point.encode_frame(part, price_columns, await _price_scale(db, int(instrument_id)))
+        for instrument_id, part in frame.groupby("instrument_id")
+    ]
+    return pd.concat(parts) if len(parts) > 1 else parts[0]
+
+
+def _invalidate_exports(frame: pd.DataFrame) -> None:
+    for instrument_id in frame["instrument_id"].unique():
+        export_cache.invalidate_instrument(int(instrument_id))
+
+
+@metrics.timed
+async def data_version(
+    db: AsyncSession, instrument_id: int
+) -> Optional[Tuple[int, Optional[datetime]]]:
+    """The instrument's (data_version, data_updated_at), or None if it does not exist."""
+    result = await db.execute(
+        select(Instrument.data_version, Instrument.data_updated_at).where(
+            Instrument.id == instrument_id
+        )
+    )
+    row = result.one_or_none()
+    return None if row is None else (row.data_version, row.data_updated_at)
+
+
+def recently_ingested(data_updated_at: Optional[datetime]) -> bool:
+    """
+    Whether reads of the instrument should stay on the primary (read-your-writes).
+
+    ``data_updated_at`` is the database clock; the app and database clocks are
+    assumed to agree to well within ``READ_YOUR_WRITES_SECONDS``.
+    """
+    if data_updated_at is None:
+        return False
+    if data_updated_at.tzinfo is None:
+        data_updated_at = data_updated_at.replace(tzinfo=timezone.utc)
+    age = datetime.now(timezone.utc) - data_updated_at
+    return age.total_seconds() < settings.READ_YOUR_WRITES_SECONDS
+
+
+async def any_recently_ingested(db: AsyncSession, instrument_ids: Sequence[int]) -> bool:
+    result = await db.execute(
+        select(Instrument.data_updated_at).where(Instrument.id.in_(instrument_ids))
+    )
+    return any(recently_ingested(updated_at) for updated_at in result.scalars())
+
+
+async def read_session_factory(
+    db: AsyncSession,
+    instrument_id: int,
+    primary: async_sessionmaker,
+    replica: async_sessionmaker,
+) -> async_sessionmaker:
+    """Session factory for streamed and exported reads of ``instrument_id``."""
+    version = await data_version(db, instrument_id)
+    if version is not None and recently_ingested(version[1]):
+        return primary
+    return replica
+
+
+async def _bump_data_version(db: AsyncSession, instrument_ids) -> None:
+    await db.execute(
+        update(Instrument)
+        .where(Instrument.id.in_([int(instrument_id) for instrument_id in instrument_ids]))
+        # Keep updated_at for metadata changes; its onupdate would fire here otherwise.
+        .values(
+            data_version=Instrument.data_version + 1,
+            data_updated_at=func.now(),
+            updated_at=Instrument.updated_at,
+        )
+    )
     await db.commit()
-    return len(rows)
 
 
-async def bulk_insert_ohlc_data(db: AsyncSession, rows: List[dict]) -> int:
+async def _invalidate_queries(table: str, frame: pd.DataFrame, rolled_up: bool = False) -> None:
+    """Drop cached pages overlapping the ingested range of each instrument in ``frame``."""
+    cache = query_cache.get_query_cache()
+    if cache is None:
+        return
+    for instrument_id, part in frame.groupby("instrument_id"):
+        first, last = part["timestamp"].min(), part["timestamp"].max()
+        if rolled_up:
+            # Rollup rows sit at bucket starts: up to a month, or a week, before the M1 bars.
+            first = min(
+                rollups.affected_ranges(part["timestamp"], timeframe)[0][0]
+                for timeframe in (TimeFrame.W1, TimeFrame.MN1)
+            )
+        await cache.invalidate(
+            table,
+            int(instrument_id),
+            pd.Timestamp(first).to_pydatetime(),
+            pd.Timestamp(last).to_pydatetime(),
+        )
+
+
+def _unique_keys(
+    frame: pd.DataFrame, key: Sequence[str], on_conflict: ConflictMode
+) -> Tuple[pd.DataFrame, int]:
+    """Drop repeated natural keys within ``frame``; the last one wins for ``UPDATE``."""
+    if on_conflict == ConflictMode.ERROR:
+        return frame, 0
+    keep = "last" if on_conflict == ConflictMode.UPDATE else "first"
+    unique = frame.drop_duplicates(subset=list(key), keep=keep)
+    return unique, len(frame) - len(unique)
+
+
+def _kind(key: Sequence[str]) -> str:
+    return "ohlc" if key == OHLC_KEY else "tick"
+
+
+def _newest_rows(frame: pd.DataFrame, key: Sequence[str]) -> List[dict]:
+    """The newest row of each series (instrument, or instrument/price_type/timeframe)."""
+    if key == OHLC_KEY:
+        series, columns = ["instrument_id", "price_type", "timeframe"], OHLC_COLUMNS
+    else:
+        series, columns = ["instrument_id"], TICK_COLUMNS
+    newest = frame.sort_values("timestamp", kind="stable").drop_duplicates(series, keep="last")
+    rows = [dict(zip(columns, values)) for values in frame_records(newest, columns)]
+    if key != OHLC_KEY:
+        for row in rows:
+            row.update(price_type=PriceType.TICK, timeframe="")
+    return rows
+
+
+async def _latest_stored(db: AsyncSession, series: latest_prices.SeriesKey) -> Optional[dict]:
+    """The newest stored row of ``series``, read from its price table."""
+    instrument_id, price_type, timeframe = series
+    if price_type == PriceType.TICK:
+        model, query, prices = _tick_model(), _tick_row_select(), TICK_PRICES
+        query = query.where(model.instrument_id == instrument_id)
+    else:
+        model, query, prices = _ohlc_model(), _ohlc_row_select(), OHLC_PRICES
+        query = query.where(
+            model.instrument_id == instrument_id,
+            model.timeframe == TimeFrame(timeframe),
+            model.price_type == price_type,
+        )
+    result = await db.execute(query.order_by(model.timestamp.desc()).limit(1))
+    rows = await _decode(db, instrument_id, result.all(), prices)
     if not rows:
-        return 0
-    db.add_all([OHLCData(**row) for row in rows])
-    await db.commit()
-    return len(rows)
+        return None
+    return {**rows[0]._asdict(), "price_type": price_type, "timeframe": timeframe}
+
+
+async def _record_latest(
+    db: AsyncSession, rows: Sequence[dict], replace_equal: bool, from_table: bool = False
+) -> None:
+    """
+    Move the ``latest_prices`` snapshot forward to ``rows``. Series without a
+    snapshot row yet, or all of them with ``from_table``, are read from the
+    price table instead, since older ingests may hold newer rows.
+    """
+    newest: Dict[latest_prices.SeriesKey, dict] = {}
+    for row in rows:
+        price_type = PriceType(row["price_type"])
+        timeframe = TimeFrame(row["timeframe"]).value if row["timeframe"] else ""
+        row = {**row, "price_type": price_type, "timeframe": timeframe}
+        newest[(int(row["instrument_id"]), price_type, timeframe)] = row
+    seed = set(newest) if from_table else await latest_prices.missing_series(db, newest)
+    for series in seed:
+        stored = await _latest_stored(db, series)
+        if stored is None:
+            newest.pop(series)
+        else:
+            newest[series] = stored
+    if newest:
+        await latest_prices.record(db, list(newest.values()), replace_equal)
+
+
+async def _record_rollups_latest(db: AsyncSession, frame: pd.DataFrame) -> None:
+    """Record the rollup bars of the newest M1 bar's buckets, which its ingest rewrote."""
+    source = frame[
+        (frame["timeframe"] == TimeFrame.M1.value) & (frame["price_type"] == PriceType.OHLC.value)
+    ]
+    rows: List[dict] = []
+    for instrument_id, part in source.groupby("instrument_id"):
+        newest = part["timestamp"].max()
+        buckets = [
+            (timeframe, rollups.affected_ranges(pd.Series([newest]), timeframe)[0][0])
+            for timeframe in rollups.ROLLUP_TIMEFRAMES
+        ]
+        result = await db.execute(
+            _ohlc_row_select().where(
+                OHLCData.instrument_id == int(instrument_id),
+                OHLCData.price_type == PriceType.OHLC,
+                tuple_(OHLCData.timeframe, OHLCData.timestamp).in_(buckets),
+            )
+        )
+        rows.extend(row._asdict() for row in result.all())
+    await _record_latest(db, rows, replace_equal=True)
 
 
+async def _ingest(
+    db: AsyncSession,
+    frame: pd.DataFrame,
+    model,
+    columns: Sequence[str],
+    key: Sequence[str],
+    prices: Sequence[str],
+    chunk_size: Optional[int],
+    on_conflict: Optional[ConflictMode],
+) -> Tuple[IngestStats, pd.DataFrame]:
+    on_conflict = ConflictMode(on_conflict or settings.INGEST_ON_CONFLICT)
+    frame, duplicates = _unique_keys(frame, key, on_conflict)
+    if _fixed():
+        rows = await _encode_fixed(db, frame, prices)
+    else:
+        await partitions.ensure_for_frame(db, model.__tablename__, frame)
+        rows = frame
+    try:
+        stats = await bulk_ingest(
+            db,
+            model.__table__,
+            columns,
+            frame_records(rows, columns),
+            chunk_size or settings.BULK_INSERT_CHUNK_SIZE,
+            key,
+            on_conflict,
+        )
+    except DuplicateKeyError as e:
+        metrics.ROWS.inc(e.committed, _kind(key), "inserted")
+        await row_counts.record_ingest(db, model.__table__, e.inserted_by_instrument)
+        if e.committed:
+            await _bump_data_version(db, e.inserted_by_instrument)
+            committed = frame[frame["instrument_id"].isin(list(e.inserted_by_instrument))]
+            await _record_latest(db, _newest_rows(committed, key), False, from_table=True)
+        raise
+    if stats.inserted or stats.updated:
+        # Until here skipped rows are the ones whose stored keys kept their stored values.
+        await _record_latest(db, _newest_rows(frame, key), replace_equal=not stats.skipped)
+    stats.rows += duplicates
+    stats.skipped += duplicates
+    for operation in ("inserted", "updated", "skipped"):
+        metrics.ROWS.inc(getattr(stats, operation), _kind(key), operation)
+    await row_counts.record_ingest(db, model.__table__, stats.inserted_by_instrument)
+    return stats, frame
+
+
+@metrics.timed
+async def bulk_insert_tick_data(
+    db: AsyncSession,
+    frame: pd.DataFrame,
+    chunk_size: Optional[int] = None,
+    on_conflict: Optional[ConflictMode] = None,
+) -> IngestStats:
+    """
+    Ingest ``frame`` into the tick table, handling stored (instrument_id, timestamp)
+    keys per ``on_conflict`` (``INGEST_ON_CONFLICT`` by default).
+    """
+    if frame.empty:
+        return IngestStats()
+    stats, frame = await _ingest(
+        db, frame, _tick_model(), TICK_COLUMNS, TICK_KEY, TICK_PRICES, chunk_size, on_conflict
+    )
+    if stats.inserted or stats.updated:
+        await _bump_data_version(db, frame["instrument_id"].unique())
+        _invalidate_exports(frame)
+        await _invalidate_queries(_tick_model().__tablename__, frame)
+    return stats
+
+
+@metrics.timed
+async def bulk_insert_ohlc_data(
+    db: AsyncSession,
+    frame: pd.DataFrame,
+    chunk_size: Optional[int] = None,
+    on_conflict: Optional[ConflictMode] = None,
+) -> IngestStats:
+    """
+    Ingest ``frame`` into the OHLC table, handling stored (instrument_id, timestamp,
+    timeframe, price_type) keys per ``on_conflict`` (``INGEST_ON_CONFLICT`` by default).
+    """
+    if frame.empty:
+        return IngestStats()
+    if not _fixed():
+        await rollups.release_derived(db, frame)
+    stats, frame = await _ingest(
+        db, frame, _ohlc_model(), OHLC_COLUMNS, OHLC_KEY, OHLC_PRICES, chunk_size, on_conflict
+    )
+    if not (stats.inserted or stats.updated):
+        return stats
+    # Rollups aggregate over datetime buckets, so they only run on Numeric storage.
+    rolled_up = settings.OHLC_ROLLUPS_ENABLED and not _fixed()
+    if rolled_up:
+        await rollups.refresh_rollups(db, frame)
+        await _record_rollups_latest(db, frame)
+    await _bump_data_version(db, frame["instrument_id"].unique())
+    _invalidate_exports(frame)
+    await _invalidate_queries(_ohlc_model().__tablename__, frame, rolled_up)
+    return stats
+
+
+def _range_conditions(
+    model, from_date: Optional[datetime], to_date: Optional[datetime]
+) -> list:
+    conditions = []
+    if from_date:
+        conditions.append(model.timestamp >= _ts(from_date))
+    if to_date:
+        conditions.append(model.timestamp <= _ts(to_date))
+    return conditions
+
+
+def _tick_conditions(
+    instrument_id: int, from_date: Optional[datetime], to_date: Optional[datetime]
+) -> list:
+    model = _tick_model()
+    return [model.instrument_id == instrument_id, *_range_conditions(model, from_date, to_date)]
+
+
+def _ohlc_filters(
+    from_date: Optional[datetime],
+    to_date: Optional[datetime],
+    timeframe: Optional[TimeFrame],
+    price_type: Optional[PriceType],
+) -> list:
+    model = _ohlc_model()
+    conditions = _range_conditions(model, from_date, to_date)
+    if timeframe:
+        conditions.append(model.timeframe == timeframe)
+    if price_type:
+        conditions.append(model.price_type == price_type)
+    return conditions
+
+
+def _ohlc_conditions(
+    instrument_id: int,
+    from_date: Optional[datetime],
+    to_date: Optional[datetime],
+    timeframe: Optional[TimeFrame],
+    price_type: Optional[PriceType],
+) -> list:
+    return [
+        _ohlc_model().instrument_id == instrument_id,
+        *_ohlc_filters(from_date, to_date, timeframe, price_type),
+    ]
+
+
+def _paginate(query: Select, model, limit: int, offset: int, cursor: Optional[Cursor]) -> Select:
+    if cursor is not None:
+        # Keyset page on the (instrument_id, timestamp, ...) index: the plain timestamp
+        # bound is the index seek, the (timestamp, id) row comparison breaks ties.
+        timestamp = _ts(cursor[0])
+        query = query.where(
+            model.timestamp >= timestamp,
+            tuple_(model.timestamp, model.id) > tuple_(timestamp, cursor[1]),
+        )
+    else:
+        query = query.offset(offset)
+    return query.order_by(model.timestamp, model.id).limit(limit)
+
+
+@metrics.timed
 async def get_tick_data(
     db: AsyncSession,
     instrument_id: int,
@@ -28,23 +444,61 @@ async def get_tick_data(
     to_date: Optional[datetime] = None,
     limit: int = 1000,
     offset: int = 0,
-) -> Tuple[List[TickData], int]:
-    query = select(TickData).where(TickData.instrument_id == instrument_id)
-    count_query = (
-        select(func.count()).select_from(TickData).where(TickData.instrument_id == instrument_id)
+    cursor: Optional[Cursor] = None,
+    include_total: bool = True,
+    total_mode: TotalMode = TotalMode.EXACT,
+) -> Tuple[List[TickData], Optional[int], Optional[TotalMode]]:
+    cache = query_cache.get_query_cache()
+    if cache is not None:
+        return await cache.read_through(
+            _tick_model().__tablename__,
+            instrument_id,
+            (from_date, to_date, limit, offset, cursor, include_total, total_mode, _fixed()),
+            (from_date, to_date),
+            TickDataResponse,
+            lambda: _tick_page(
+                db, instrument_id, from_date, to_date, limit, offset, cursor, include_total,
+                total_mode,
+            ),
+        )
+    return await _tick_page(
+        db, instrument_id, from_date, to_date, limit, offset, cursor, include_total, total_mode
     )
-    if from_date:
-        query = query.where(TickData.timestamp >= from_date)
-        count_query = count_query.where(TickData.timestamp >= from_date)
-    if to_date:
-        query = query.where(TickData.timestamp <= to_date)
-        count_query = count_query.where(TickData.timestamp <= to_date)
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one()
-    result = await db.execute(query.order_by(TickData.timestamp).offset(offset).limit(limit))
-    return result.scalars().all(), total
 
 
+async def _tick_page(
+    db: AsyncSession,
+    instrument_id: int,
+    from_date: Optional[datetime],
+    to_date: Optional[datetime],
+    limit: int,
+    offset: int,
+    cursor: Optional[Cursor],
+    include_total: bool,
+    total_mode: TotalMode,
+) -> Tuple[List[TickData], Optional[int], Optional[TotalMode]]:
+    model = _tick_model()
+    conditions = _tick_conditions(instrument_id, from_date, to_date)
+    query = select(model).where(*conditions)
+    total, mode = None, None
+    if include_total:
+        total, mode = await row_counts.count_rows(
+            db,
+            model.__table__,
+            instrument_id,
+            select(func.count()).select_from(model).where(*conditions),
+            query,
+            (from_date, to_date),
+            total_mode,
+        )
+    if _fixed():
+        items = await get_tick_rows(db, instrument_id, from_date, to_date, limit, offset, cursor)
+        return items, total, mode
+    result = await db.execute(_paginate(query, model, limit, offset, cursor))
+    return result.scalars().all(), total, mode
+
+
+@metrics.timed
 async def get_ohlc_data(
     db: AsyncSession,
     instrument_id: int,
@@ -54,24 +508,392 @@ async def get_ohlc_data(
     price_type: Optional[PriceType] = None,
     limit: int = 1000,
     offset: int = 0,
-) -> Tuple[List[OHLCData], int]:
-    query = select(OHLCData).where(OHLCData.instrument_id == instrument_id)
-    count_query = (
-        select(func.count()).select_from(OHLCData).where(OHLCData.instrument_id == instrument_id)
+    cursor: Optional[Cursor] = None,
+    include_total: bool = True,
+    total_mode: TotalMode = TotalMode.EXACT,
+) -> Tuple[List[OHLCData], Optional[int], Optional[TotalMode]]:
+    cache = query_cache.get_query_cache()
+    if cache is not None:
+        return await cache.read_through(
+            _ohlc_model().__tablename__,
+            instrument_id,
+            (
+                from_date,
+                to_date,
+                timeframe,
+                price_type,
+                limit,
+                offset,
+                cursor,
+                include_total,
+                total_mode,
+                _fixed(),
+            ),
+            (from_date, to_date),
+            OHLCDataResponse,
+            lambda: _ohlc_page(
+                db, instrument_id, from_date, to_date, timeframe, price_type, limit, offset,
+                cursor, include_total, total_mode,
+            ),
+        )
+    return await _ohlc_page(
+        db,
+        instrument_id,
+        from_date,
+        to_date,
+        timeframe,
+        price_type,
+        limit,
+        offset,
+        cursor,
+        include_total,
+        total_mode,
     )
-    if from_date:
-        query = query.where(OHLCData.timestamp >= from_date)
-        count_query = count_query.where(OHLCData.timestamp >= from_date)
-    if to_date:
-        query = query.where(OHLCData.timestamp <= to_date)
-        count_query = count_query.where(OHLCData.timestamp <= to_date)
-    if timeframe:
-        query = query.where(OHLCData.timeframe == timeframe)
-        count_query = count_query.where(OHLCData.timeframe == timeframe)
-    if price_type:
-        query = query.where(OHLCData.price_type == price_type)
-        count_query = count_query.where(OHLCData.price_type == price_type)
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one()
-    result = await db.execute(query.order_by(OHLCData.timestamp).offset(offset).limit(limit))
-    return result.scalars().all(), total
+
+
+async def _ohlc_page(
+    db: AsyncSession,
+    instrument_id: int,
+    from_date: Optional[datetime],
+    to_date: Optional[datetime],
+    timeframe: Optional[TimeFrame],
+    price_type: Optional[PriceType],
+    limit: int,
+    offset: int,
+    cursor: Optional[Cursor],
+    include_total: bool,
+    total_mode: TotalMode,
+) -> Tuple[List[OHLCData], Optional[int], Optional[TotalMode]]:
+    model = _ohlc_model()
+    conditions = _ohlc_conditions(instrument_id, from_date, to_date, timeframe, price_type)
+    query = select(model).where(*conditions)
+    total, mode = None, None
+    if include_total:
+        total, mode = await row_counts.count_rows(
+            db,
+            model.__table__,
+            instrument_id,
+            select(func.count()).select_from(model).where(*conditions),
+            query,
+            (from_date, to_date, timeframe, price_type),
+            total_mode,
+        )
+    if _fixed():
+        items = await get_ohlc_rows(
+            db, instrument_id, from_date, to_date, timeframe, price_type, limit, offset, cursor
+        )
+        return items, total, mode
+    result = await db.execute(_paginate(query, model, limit, offset, cursor))
+    return result.scalars().all(), total, mode
+
+
+def _tick_row_select() -> Select:
+    if _fixed():
+        model = TickDataFixed
+        return select(
+            model.id, model.instrument_id, model.timestamp, model.bid, model.ask, model.volume
+        )
+    return select(
+        TickData.id,
+        TickData.instrument_id,
+        TickData.timestamp,
+        cast(TickData.bid, Float).label("bid"),
+        cast(TickData.ask, Float).label("ask"),
+        cast(TickData.volume, Float).label("volume"),
+    )
+
+
+def _ohlc_row_select() -> Select:
+    if _fixed():
+        model = OHLCDataFixed
+        return select(
+            model.id,
+            model.instrument_id,
+            model.timestamp,
+            model.open,
+            model.high,
+            model.low,
+            model.close,
+            model.volume,
+            model.timeframe,
+            model.price_type,
+        )
+    return select(
+        OHLCData.id,
+        OHLCData.instrument_id,
+        OHLCData.timestamp,
+        cast(OHLCData.open, Float).label("open"),
+        cast(OHLCData.high, Float).label("high"),
+        cast(OHLCData.low, Float).label("low"),
+        cast(OHLCData.close, Float).label("close"),
+        cast(OHLCData.volume, Float).label("volume"),
+        OHLCData.timeframe,
+        OHLCData.price_type,
+    )
+
+
+TICK_ROW_FIELDS = ("id", "instrument_id", "timestamp", "bid", "ask", "volume")
+OHLC_ROW_FIELDS = (
+    "id",
+    "instrument_id",
+    "timestamp",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "timeframe",
+    "price_type",
+)
+
+
+async def _decode(
+    db: AsyncSession, instrument_id: int, rows: Sequence[Row], price_columns: Sequence[str]
+) -> Sequence[Row]:
+    if not _fixed() or not rows:
+        return rows
+    scale = await _price_scale(db, instrument_id)
+    return fixed_point.decode_rows(rows, rows[0]._fields, price_columns, scale)
+
+
+async def _stream_partitions(
+    db: AsyncSession,
+    query: Select,
+    batch_size: int,
+    instrument_id: int,
+    price_columns: Sequence[str],
+) -> AsyncIterator[Sequence[Row]]:
+    # yield_per makes the driver use a server-side cursor, fetching batch_size rows at a time.
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    async for partition in result.partitions(batch_size):
+        yield await _decode(db, instrument_id, partition, price_columns)
+
+
+@metrics.timed
+async def get_tick_rows(
+    db: AsyncSession,
+    instrument_id: int,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    limit: int = 1000,
+    offset: int = 0,
+    cursor: Optional[Cursor] = None,
+) -> Sequence[Row]:
+    """Plain result rows (no ORM instances) with float prices."""
+    query = _tick_row_select().where(*_tick_conditions(instrument_id, from_date, to_date))
+    result = await db.execute(_paginate(query, _tick_model(), limit, offset, cursor))
+    return await _decode(db, instrument_id, result.all(), TICK_PRICES)
+
+
+@metrics.timed
+async def get_ohlc_rows(
+    db: AsyncSession,
+    instrument_id: int,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    timeframe: Optional[TimeFrame] = None,
+    price_type: Optional[PriceType] = None,
+    limit: int = 1000,
+    offset: int = 0,
+    cursor: Optional[Cursor] = None,
+) -> Sequence[Row]:
+    """Plain result rows (no ORM instances) with float prices."""
+    query = _ohlc_row_select().where(
+        *_ohlc_conditions(instrument_id, from_date, to_date, timeframe, price_type)
+    )
+    result = await db.execute(_paginate(query, _ohlc_model(), limit, offset, cursor))
+    return await _decode(db, instrument_id, result.all(), OHLC_PRICES)
+
+
+async def _batch_rows(
+    db: AsyncSession,
+    row_select: Select,
+    model,
+    instrument_ids: Sequence[int],
+    conditions: list,
+    limit: int,
+    price_columns: Sequence[str],
+) -> Dict[int, Sequence[Row]]:
+    """
+    The first ``limit`` rows of each instrument in one set-based query.
+
+    ``row_number()`` over ``instrument_id`` ranks the rows in the requested
+    range, so the range bounds the work; the result is grouped per instrument.
+    """
+    rank = func.row_number().over(
+        partition_by=model.instrument_id, order_by=(model.timestamp, model.id)
+    )
+    ranked = (
+        row_select.add_columns(rank.label("row_rank"))
+        .where(model.instrument_id.in_(instrument_ids), *conditions)
+        .subquery()
+    )
+    fields = [column for column in ranked.c if column.name != "row_rank"]
+    query = (
+        select(*fields)
+        .where(ranked.c.row_rank <= limit)
+        .order_by(ranked.c.instrument_id, ranked.c.timestamp, ranked.c.id)
+    )
+    result = await db.execute(query)
+    grouped: Dict[int, list] = {instrument_id: [] for instrument_id in instrument_ids}
+    for row in result.all():
+        grouped[row.instrument_id].append(row)
+    return {
+        instrument_id: await _decode(db, instrument_id, rows, price_columns)
+        for instrument_id, rows in grouped.items()
+    }
+
+
+@metrics.timed
+async def get_tick_batch(
+    db: AsyncSession,
+    instrument_ids: Sequence[int],
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    limit: int = 1000,
+) -> Dict[int, Sequence[Row]]:
+    """Up to ``limit`` tick rows per instrument, oldest first, keyed by instrument id."""
+    model = _tick_model()
+    return await _batch_rows(
+        db,
+        _tick_row_select(),
+        model,
+        instrument_ids,
+        _range_conditions(model, from_date, to_date),
+        limit,
+        TICK_PRICES,
+    )
+
+
+@metrics.timed
+async def get_ohlc_batch(
+    db: AsyncSession,
+    instrument_ids: Sequence[int],
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    timeframe: Optional[TimeFrame] = None,
+    price_type: Optional[PriceType] = None,
+    limit: int = 1000,
+) -> Dict[int, Sequence[Row]]:
+    """Up to ``limit`` OHLC rows per instrument, oldest first, keyed by instrument id."""
+    return await _batch_rows(
+        db,
+        _ohlc_row_select(),
+        _ohlc_model(),
+        instrument_ids,
+        _ohlc_filters(from_date, to_date, timeframe, price_type),
+        limit,
+        OHLC_PRICES,
+    )
+
+
+@metrics.timed
+async def get_latest_prices(
+    db: AsyncSession,
+    instrument_id: Optional[int] = None,
+    price_type: Optional[PriceType] = None,
+    timeframe: Optional[TimeFrame] = None,
+) -> List[LatestPriceResponse]:
+    """Newest tick and bars of one instrument, or of all, from the in-memory snapshot."""
+    if instrument_id is None:
+        entries = await latest_prices.snapshot.all(db)
+    else:
+        entries = await latest_prices.snapshot.for_instrument(db, instrument_id)
+    return [
+        entry
+        for entry in entries
+        if (price_type is None or entry.price_type.value == price_type.value)
+        and (timeframe is None or entry.timeframe == timeframe)
+    ]
+
+
+def stream_tick_rows(
+    db: AsyncSession,
+    instrument_id: int,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    batch_size: int = 5000,
+) -> AsyncIterator[Sequence[Row]]:
+    """Batches of plain rows for the whole range, read through a server-side cursor."""
+    model = _tick_model()
+    query = (
+        _tick_row_select()
+        .where(*_tick_conditions(instrument_id, from_date, to_date))
+        .order_by(model.timestamp, model.id)
+    )
+    return _stream_partitions(db, query, batch_size, instrument_id, TICK_PRICES)
+
+
+def stream_ohlc_rows(
+    db: AsyncSession,
+    instrument_id: int,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    timeframe: Optional[TimeFrame] = None,
+    price_type: Optional[PriceType] = None,
+    batch_size: int = 5000,
+) -> AsyncIterator[Sequence[Row]]:
+    """Batches of plain rows for the whole range, read through a server-side cursor."""
+    model = _ohlc_model()
+    query = (
+        _ohlc_row_select()
+        .where(*_ohlc_conditions(instrument_id, from_date, to_date, timeframe, price_type))
+        .order_by(model.timestamp, model.id)
+    )
+    return _stream_partitions(db, query, batch_size, instrument_id, OHLC_PRICES)
+
+
+def _quote_price(side: QuoteSide):
+    if side == QuoteSide.BID:
+        return TickData.bid
+    if side == QuoteSide.ASK:
+        return TickData.ask
+    return (TickData.bid + TickData.ask) / 2
+
+
+@metrics.timed
+async def get_tick_bars(
+    db: AsyncSession,
+    instrument_id: int,
+    timeframe: TimeFrame,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    side: QuoteSide = QuoteSide.MID,
+    interval_seconds: Optional[int] = None,
+    limit: int = 1000,
+) -> Sequence[Row]:
+    """OHLC bars over one quote side, computed in a single grouped query."""
+    if _fixed():
+        raise ValueError("Bars are only available with Numeric price storage")
+    start = bucket(TickData.timestamp, timeframe, interval_seconds)
+    price = _quote_price(side)
+    order = (TickData.timestamp, TickData.id)
+    ticks = (
+        select(
+            start.label("bucket"),
+            price.label("price"),
+            TickData.volume,
+            func.first_value(price).over(partition_by=start, order_by=order).label("open"),
+            func.last_value(price)
+            .over(partition_by=start, order_by=order, rows=(None, None))
+            .label("close"),
+        )
+        .where(*_tick_conditions(instrument_id, from_date, to_date))
+        .subquery()
+    )
+    query = (
+        select(
+            ticks.c.bucket.label("timestamp"),
+            func.max(ticks.c.open).label("open"),
+            func.max(ticks.c.price).label("high"),
+            func.min(ticks.c.price).label("low"),
+            func.max(ticks.c.close).label("close"),
+            func.sum(ticks.c.volume).label("volume"),
+            func.count().label("tick_count"),
+        )
+        .group_by(ticks.c.bucket)
+        .order_by(ticks.c.bucket)
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return result.all()
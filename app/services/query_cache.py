@@ -0,0 +1,266 @@
+"""
+Shared read-through cache for price range pages (``PRICE_QUERY_CACHE=redis``).
+
+A page (items, total and total mode) is stored as JSON under a digest of the
+normalized query parameters, so every pod serves the same recent windows from
+Redis instead of re-running the count and range queries.
+
+Invalidation is per time range. Each (table, instrument) has a sorted set of
+its cached pages scored by the page's ``from_date``, with the ``to_date`` in
+the member. Ingest drops only the pages whose [from_date, to_date] overlaps
+the ingested range. A per-(table, instrument) version is bumped on every
+invalidation, and a page is only stored if the version is unchanged since the
+query started, so a page read before an ingest is never cached after it.
+
+Memory budget: pages over ``PRICE_QUERY_CACHE_MAX_ENTRY_BYTES`` are not cached,
+and the oldest pages are evicted once the stored pages would exceed
+``PRICE_QUERY_CACHE_MAX_BYTES``. The byte total is kept in Redis and is
+approximate under concurrent writers; set ``maxmemory`` on the Redis server
+as the hard limit.
+
+Hit/miss counters and the query time saved by hits are per process. Redis
+errors are logged and the query runs against the database.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Tuple
+
+import redis.asyncio as aioredis
+from pydantic import BaseModel
+from redis.exceptions import RedisError, WatchError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+Bounds = Tuple[Optional[datetime], Optional[datetime]]
+Page = Tuple[list, Optional[int], Any]
+
+
+def _score(value: Optional[datetime], default: float) -> float:
+    if value is None:
+        return default
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _param(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return _score(value, 0.0)
+    if isinstance(value, (tuple, list)):
+        return [_param(item) for item in value]
+    return getattr(value, "value", value)
+
+
+class QueryCache:
+    def __init__(
+        self,
+        client: aioredis.Redis,
+        ttl_seconds: int,
+        max_bytes: int,
+        max_entry_bytes: int,
+        prefix: str = "price_query:",
+    ) -> None:
+        self._r = client
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self.evictions = 0
+        self.too_large = 0
+
+    def _entry_key(self, digest: str) -> str:
+        return f"{self.prefix}e:{digest}"
+
+    def _index_key(self, table: str, instrument_id: int) -> str:
+        return f"{self.prefix}i:{table}:{instrument_id}"
+
+    def _version_key(self, table: str, instrument_id: int) -> str:
+        return f"{self.prefix}v:{table}:{instrument_id}"
+
+    @property
+    def _lru_key(self) -> str:
+        return f"{self.prefix}lru"
+
+    @property
+    def _meta_key(self) -> str:
+        return f"{self.prefix}meta"
+
+    @property
+    def _bytes_key(self) -> str:
+        return f"{self.prefix}bytes"
+
+    def digest(self, table: str, instrument_id: int, params: tuple) -> str:
+        normalized = json.dumps([table, instrument_id, _param(params)], separators=(",", ":"))
+        return hashlib.sha1(normalized.encode()).hexdigest()
+
+    async def _drop(self, digests: Iterable[str]) -> None:
+        """Delete pages and their index, LRU and size bookkeeping."""
+        digests = list(digests)
+        if not digests:
+            return
+        metas = await self._r.hmget(self._meta_key, digests)
+        async with self._r.pipeline(transaction=False) as pipe:
+            freed = 0
+            for digest, meta in zip(digests, metas):
+                pipe.delete(self._entry_key(digest))
+                pipe.zrem(self._lru_key, digest)
+                pipe.hdel(self._meta_key, digest)
+                if meta is None:
+                    continue
+                size, index_key, member = meta.decode().split("|", 2)
+                pipe.zrem(index_key, member)
+                freed += int(size)
+            if freed:
+                pipe.decrby(self._bytes_key, freed)
+            await pipe.execute()
+
+    async def _make_room(self, size: int) -> None:
+        expired = await self._r.zrangebyscore(
+            self._lru_key, "-inf", time.time() - self.ttl_seconds
+        )
+        await self._drop(item.decode() for item in expired)
+        while int(await self._r.get(self._bytes_key) or 0) + size > self.max_bytes:
+            oldest = await self._r.zrange(self._lru_key, 0, 15)
+            if not oldest:
+                break
+            await self._drop(item.decode() for item in oldest)
+            self.evictions += len(oldest)
+
+    async def _store(
+        self,
+        table: str,
+        instrument_id: int,
+        digest: str,
+        bounds: Bounds,
+        payload: bytes,
+        version: Optional[bytes],
+    ) -> None:
+        size = len(payload)
+        if size > self.max_entry_bytes:
+            self.too_large += 1
+            return
+        await self._make_room(size)
+        index_key = self._index_key(table, instrument_id)
+        version_key = self._version_key(table, instrument_id)
+        member = f"{_score(bounds[1], math.inf)!r}|{digest}"
+        async with self._r.pipeline() as pipe:
+            try:
+                await pipe.watch(version_key)
+                if await pipe.get(version_key) != version:
+                    return
+                pipe.multi()
+                pipe.set(self._entry_key(digest), payload, ex=self.ttl_seconds)
+                pipe.zadd(index_key, {member: _score(bounds[0], -math.inf)})
+                pipe.expire(index_key, self.ttl_seconds)
+                pipe.zadd(self._lru_key, {digest: time.time()})
+                pipe.hset(self._meta_key, digest, f"{size}|{index_key}|{member}")
+                pipe.incrby(self._bytes_key, size)
+                await pipe.execute()
+            except WatchError:
+                return
+
+    async def read_through(
+        self,
+        table: str,
+        instrument_id: int,
+        params: tuple,
+        bounds: Bounds,
+        schema: type[BaseModel],
+        load: Callable[[], Awaitable[Page]],
+    ) -> Page:
+        """Return the cached page for ``params`` or ``load()`` it and cache the result."""
+        started = time.perf_counter()
+        digest = self.digest(table, instrument_id, params)
+        try:
+            async with self._r.pipeline(transaction=False) as pipe:
+                pipe.get(self._entry_key(digest))
+                pipe.get(self._version_key(table, instrument_id))
+                raw, version = await pipe.execute()
+        except RedisError:
+            logger.warning("Price query cache unavailable", exc_info=True)
+            return await load()
+        if raw is not None:
+            cached = json.loads(raw)
+            items = [schema.model_validate(item) for item in cached["items"]]
+            self.hits += 1
+            self.saved_seconds += max(cached["cost"] - (time.perf_counter() - started), 0.0)
+            return items, cached["total"], cached["mode"]
+        self.misses += 1
+        load_started = time.perf_counter()
+        items, total, mode = await load()
+        payload = {
+            "items": [schema.model_validate(item).model_dump(mode="json") for item in items],
+            "total": total,
+            "mode": _param(mode),
+            "cost": time.perf_counter() - load_started,
+        }
+        try:
+            await self._store(
+                table,
+                instrument_id,
+                digest,
+                bounds,
+                json.dumps(payload, separators=(",", ":")).encode(),
+                version,
+            )
+        except RedisError:
+            logger.warning("Could not cache price query", exc_info=True)
+        return items, total, mode
+
+    async def invalidate(
+        self, table: str, instrument_id: int, first: datetime, last: datetime
+    ) -> None:
+        """Drop the pages of ``instrument_id`` whose range overlaps [first, last]."""
+        index_key = self._index_key(table, instrument_id)
+        try:
+            await self._r.incr(self._version_key(table, instrument_id))
+            await self._r.expire(self._version_key(table, instrument_id), self.ttl_seconds)
+            members = await self._r.zrangebyscore(index_key, "-inf", _score(last, math.inf))
+            low = _score(first, -math.inf)
+            digests: List[str] = []
+            for member in members:
+                to_score, digest = member.decode().split("|", 1)
+                if float(to_score) >= low:
+                    digests.append(digest)
+            await self._drop(digests)
+        except RedisError:
+            logger.warning("Could not invalidate cached price queries", exc_info=True)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 6),
+            "evictions": self.evictions,
+            "too_large": self.too_large,
+        }
+
+
+def create_query_cache(backend: str) -> Optional[QueryCache]:
+    if backend != "redis":
+        return None
+    return QueryCache(
+        aioredis.from_url(settings.REDIS_URL),
+        ttl_seconds=settings.PRICE_QUERY_CACHE_TTL_SECONDS,
+        max_bytes=settings.PRICE_QUERY_CACHE_MAX_BYTES,
+        max_entry_bytes=settings.PRICE_QUERY_CACHE_MAX_ENTRY_BYTES,
+    )
+
+
+query_cache = create_query_cache(settings.PRICE_QUERY_CACHE)
+
+
+def get_query_cache() -> Optional[QueryCache]:
+    return query_cache
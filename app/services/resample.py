@@ -0,0 +1,84 @@
+"""
+Bar bucketing for SQL-side resampling.
+
+``bucket`` maps a timestamp column to the start of its bar: ``date_bin`` or
+``date_trunc`` on PostgreSQL, and epoch arithmetic on SQLite. Buckets are
+aligned to UTC, and weeks start on Monday.
+"""
+
+from typing import Optional
+
+from sqlalchemy import DateTime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+
+from app.models.price import TimeFrame
+
+TIMEFRAME_SECONDS = {
+    TimeFrame.M1: 60,
+    TimeFrame.M5: 5 * 60,
+    TimeFrame.M15: 15 * 60,
+    TimeFrame.M30: 30 * 60,
+    TimeFrame.H1: 60 * 60,
+    TimeFrame.H4: 4 * 60 * 60,
+    TimeFrame.D1: 24 * 60 * 60,
+}
+
+# Weeks start on Monday; 1970-01-05 is the first Monday after the epoch.
+_WEEK_SECONDS = 7 * 24 * 60 * 60
+_WEEK_OFFSET = 4 * 24 * 60 * 60
+
+
+class _Bucket(ColumnElement):
+    """Start of the bar containing ``column``: a calendar unit or a fixed width in seconds."""
+
+    inherit_cache = False
+    type = DateTime(timezone=True)
+
+    def __init__(self, column, unit: Optional[str] = None, seconds: Optional[int] = None):
+        self.column = column
+        self.unit = unit
+        self.seconds = seconds
+
+    @property
+    def _from_objects(self):
+        return self.column._from_objects
+
+
+@compiles(_Bucket, "postgresql")
+def _compile_bucket_pg(element: _Bucket, compiler, **kw) -> str:
+    column = compiler.process(element.column, **kw)
+    if element.unit:
+        return f"date_trunc('{element.unit}', {column}, 'UTC')"
+    return (
+        f"date_bin(interval '{int(element.seconds)} seconds', {column}, "
+        "timestamptz '1970-01-01 00:00:00+00')"
+    )
+
+
+@compiles(_Bucket)
+def _compile_bucket_sqlite(element: _Bucket, compiler, **kw) -> str:
+    column = compiler.process(element.column, **kw)
+    # Same text layout SQLAlchemy stores DateTime values in, so buckets compare and
+    # round-trip like any other timestamp.
+    if element.unit == "month":
+        return f"strftime('%Y-%m-01 00:00:00.000000', {column})"
+    epoch = f"CAST(strftime('%s', {column}) AS INTEGER)"
+    if element.unit == "week":
+        start = f"(({epoch} - {_WEEK_OFFSET}) / {_WEEK_SECONDS}) * {_WEEK_SECONDS} + {_WEEK_OFFSET}"
+    else:
+        seconds = int(element.seconds)
+        start = f"({epoch} / {seconds}) * {seconds}"
+    return f"datetime({start}, 'unixepoch') || '.000000'"
+
+
+def bucket(column, timeframe: TimeFrame, interval_seconds: Optional[int] = None) -> _Bucket:
+    if timeframe == TimeFrame.MN1:
+        return _Bucket(column, unit="month")
+    if timeframe == TimeFrame.W1:
+        return _Bucket(column, unit="week")
+    if timeframe == TimeFrame.CUSTOM:
+        if not interval_seconds or interval_seconds <= 0:
+            raise ValueError("interval_seconds is required for the CUSTOM timeframe")
+        return _Bucket(column, seconds=interval_seconds)
+    return _Bucket(column, seconds=TIMEFRAME_SECONDS[timeframe])
@@ -0,0 +1,200 @@
+"""
+Incremental OHLC rollups derived from M1 bars.
+
+After M1 bars are ingested, only the higher-timeframe buckets they touch
+are recomputed. For each timeframe the affected buckets are merged into
+contiguous time ranges. Derived ``price_type=OHLC`` rows in those ranges are
+replaced by an ``INSERT ... SELECT`` that aggregates the M1 rows inside the
+database. Open and close are the first and last M1 bars of each bucket.
+
+Derived rows carry ``derived = true``, and only they are ever replaced.
+Uploaded bars always win: a refresh leaves a bucket alone when an uploaded
+bar already holds its key (``ON CONFLICT DO NOTHING``). Uploading a bar
+releases any derived row with the same key first (``release_derived``).
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Set, Tuple
+
+import pandas as pd
+from sqlalchemy import and_, delete, func, literal, or_, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.price import OHLCData, PriceType, TimeFrame
+from app.services import partitions, row_counts
+from app.services.bulk_ingest import dialect_insert
+from app.services.resample import TIMEFRAME_SECONDS, bucket
+
+ROLLUP_TIMEFRAMES = (
+    TimeFrame.M5,
+    TimeFrame.M15,
+    TimeFrame.M30,
+    TimeFrame.H1,
+    TimeFrame.H4,
+    TimeFrame.D1,
+    TimeFrame.W1,
+    TimeFrame.MN1,
+)
+
+TimeRange = Tuple[datetime, datetime]
+
+# Keys per DELETE when releasing derived rows; well under SQLite's bound-parameter limit.
+_RELEASE_BATCH = 500
+
+
+def affected_ranges(timestamps: pd.Series, timeframe: TimeFrame) -> List[TimeRange]:
+    """Merged [start, end) UTC ranges of the ``timeframe`` buckets containing ``timestamps``."""
+    ts = pd.DatetimeIndex(timestamps)
+    if ts.tz is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    if timeframe == TimeFrame.MN1:
+        starts = ts.to_period("M").to_timestamp()
+        ends = starts + pd.offsets.MonthBegin(1)
+    elif timeframe == TimeFrame.W1:
+        starts = ts.normalize() - pd.to_timedelta(ts.weekday, unit="D")
+        ends = starts + pd.Timedelta(days=7)
+    else:
+        width = pd.Timedelta(seconds=TIMEFRAME_SECONDS[timeframe])
+        starts = ts.floor(width)
+        ends = starts + width
+    buckets = sorted(set(zip(starts, ends)))
+    ranges: List[List[pd.Timestamp]] = []
+    for start, end in buckets:
+        if ranges and start <= ranges[-1][1]:
+            ranges[-1][1] = max(ranges[-1][1], end)
+        else:
+            ranges.append([start, end])
+    return [
+        (start.tz_localize("UTC").to_pydatetime(), end.tz_localize("UTC").to_pydatetime())
+        for start, end in ranges
+    ]
+
+
+def _within(ranges: List[TimeRange]):
+    return or_(
+        *[and_(OHLCData.timestamp >= start, OHLCData.timestamp < end) for start, end in ranges]
+    )
+
+
+async def _refresh(
+    db: AsyncSession, instrument_id: int, timeframe: TimeFrame, ranges: List[TimeRange]
+) -> int:
+    deleted = await db.execute(
+        delete(OHLCData).where(
+            OHLCData.instrument_id == instrument_id,
+            OHLCData.timeframe == timeframe,
+            OHLCData.price_type == PriceType.OHLC,
+            OHLCData.derived.is_(True),
+            _within(ranges),
+        )
+    )
+    start = bucket(OHLCData.timestamp, timeframe)
+    order = (OHLCData.timestamp, OHLCData.id)
+    minutes = (
+        select(
+            start.label("bucket"),
+            OHLCData.high,
+            OHLCData.low,
+            OHLCData.volume,
+            func.first_value(OHLCData.open).over(partition_by=start, order_by=order).label("open"),
+            func.last_value(OHLCData.close)
+            .over(partition_by=start, order_by=order, rows=(None, None))
+            .label("close"),
+        )
+        .where(
+            OHLCData.instrument_id == instrument_id,
+            OHLCData.timeframe == TimeFrame.M1,
+            OHLCData.price_type == PriceType.OHLC,
+            _within(ranges),
+        )
+        .subquery()
+    )
+    bars = select(
+        literal(instrument_id),
+        minutes.c.bucket,
+        func.max(minutes.c.open),
+        func.max(minutes.c.high),
+        func.min(minutes.c.low),
+        func.max(minutes.c.close),
+        func.sum(minutes.c.volume),
+        literal(timeframe, OHLCData.timeframe.type),
+        literal(PriceType.OHLC, OHLCData.price_type.type),
+        literal(True, OHLCData.derived.type),
+    ).group_by(minutes.c.bucket)
+    columns = [
+        "instrument_id",
+        "timestamp",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+        "timeframe",
+        "price_type",
+        "derived",
+    ]
+    # The WHERE clause keeps SQLite from parsing ON CONFLICT as a join constraint.
+    stmt = dialect_insert(db, OHLCData.__table__).from_select(columns, bars.where(true()))
+    inserted = await db.execute(stmt.on_conflict_do_nothing())
+    return inserted.rowcount - deleted.rowcount
+
+
+async def release_derived(db: AsyncSession, frame: pd.DataFrame) -> None:
+    """Delete derived bars whose keys the uploaded bars in ``frame`` are about to take."""
+    uploaded = frame[
+        frame["timeframe"].isin([timeframe.value for timeframe in ROLLUP_TIMEFRAMES])
+        & (frame["price_type"] == PriceType.OHLC.value)
+    ]
+    for (instrument_id, timeframe), rows in uploaded.groupby(["instrument_id", "timeframe"]):
+        instrument_id = int(instrument_id)
+        timestamps = list(pd.DatetimeIndex(rows["timestamp"]).to_pydatetime())
+        released = 0
+        for start in range(0, len(timestamps), _RELEASE_BATCH):
+            result = await db.execute(
+                delete(OHLCData).where(
+                    OHLCData.instrument_id == instrument_id,
+                    OHLCData.timeframe == TimeFrame(timeframe),
+                    OHLCData.price_type == PriceType.OHLC,
+                    OHLCData.derived.is_(True),
+                    OHLCData.timestamp.in_(timestamps[start : start + _RELEASE_BATCH]),
+                )
+            )
+            released += result.rowcount
+        if released:
+            await row_counts.add_rows(db, OHLCData.__table__, instrument_id, -released)
+    await db.commit()
+
+
+def rollup_months(ranges: Iterable[List[TimeRange]]) -> Set[date]:
+    """Months spanned by the rollup ``ranges``.
+
+    A W1 bucket starts on Monday and can fall in the month before the M1 bars
+    it aggregates, so the source frame's months are not enough for partitioning.
+    """
+    return {
+        month
+        for timeframe_ranges in ranges
+        for start, end in timeframe_ranges
+        for month in partitions.month_range(start, (end - timedelta(microseconds=1)).date())
+    }
+
+
+async def refresh_rollups(db: AsyncSession, frame: pd.DataFrame) -> None:
+    """Recompute the higher-timeframe buckets touched by the M1 rows in ``frame``."""
+    source = frame[
+        (frame["timeframe"] == TimeFrame.M1.value) & (frame["price_type"] == PriceType.OHLC.value)
+    ]
+    for instrument_id, rows in source.groupby("instrument_id"):
+        instrument_id = int(instrument_id)
+        ranges = {
+            timeframe: affected_ranges(rows["timestamp"], timeframe)
+            for timeframe in ROLLUP_TIMEFRAMES
+        }
+        await partitions.ensure_partitions(
+            db, OHLCData.__tablename__, rollup_months(ranges.values())
+        )
+        added = 0
+        for timeframe in ROLLUP_TIMEFRAMES:
+            added += await _refresh(db, instrument_id, timeframe, ranges[timeframe])
+        await row_counts.add_rows(db, OHLCData.__table__, instrument_id, added)
+    await db.commit()
@@ -0,0 +1,144 @@
+"""
+Row totals for the paginated price queries.
+
+Exact totals are ``SELECT count(*)`` results cached per (table, instrument,
+filters) and invalidated whenever that instrument is ingested. Estimated
+totals come from the ``price_row_counts`` summary table for unfiltered
+queries, or from the PostgreSQL planner's row estimate otherwise; on other
+dialects they fall back to the cached exact count.
+
+An instrument gets its summary row on its first ingest, seeded with one
+exact count so rows stored before the summary table existed are included.
+Until then, estimated totals use the planner (PostgreSQL) or an exact count.
+
+The exact-count cache is per process, and ingest only invalidates it in the
+worker that handled the upload. Other workers and pods may serve a stale
+exact total for up to ``COUNT_CACHE_TTL_SECONDS``. Keep that TTL short when
+several workers serve reads.
+"""
+
+import json
+from typing import Hashable, Mapping, Optional, Tuple
+
+from sqlalchemy import Select, Table, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.config import settings
+from app.models.price import PriceRowCount
+from app.schemas.price import TotalMode
+from app.services.bulk_ingest import dialect_insert
+from app.services.cache import TTLCache
+
+count_cache = TTLCache(
+    max_size=settings.COUNT_CACHE_MAX_ENTRIES, ttl=settings.COUNT_CACHE_TTL_SECONDS
+)
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, stmt: Select) -> None:
+        self.stmt = stmt
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.stmt, **kw)
+
+
+async def _planner_estimate(db: AsyncSession, query: Select) -> int:
+    result = await db.execute(_Explain(query))
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def _summary_count(db: AsyncSession, table: Table, instrument_id: int) -> Optional[int]:
+    result = await db.execute(
+        select(PriceRowCount.row_count).where(
+            PriceRowCount.instrument_id == instrument_id,
+            PriceRowCount.table_name == table.name,
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def exact_count(db: AsyncSession, count_query: Select, key: Hashable) -> int:
+    total = count_cache.get(key)
+    if total is None:
+        total = (await db.execute(count_query)).scalar_one()
+        count_cache.set(key, total)
+    return total
+
+
+async def count_rows(
+    db: AsyncSession,
+    table: Table,
+    instrument_id: int,
+    count_query: Select,
+    rows_query: Select,
+    filters: tuple,
+    mode: TotalMode,
+) -> Tuple[int, TotalMode]:
+    """Return ``(total, mode)``; ``mode`` is what was actually produced."""
+    if mode == TotalMode.ESTIMATED:
+        if not any(value is not None for value in filters):
+            total = await _summary_count(db, table, instrument_id)
+            if total is not None:
+                return total, TotalMode.ESTIMATED
+        if db.get_bind().dialect.name == "postgresql":
+            return await _planner_estimate(db, rows_query), TotalMode.ESTIMATED
+    key = (table.name, instrument_id, filters)
+    return await exact_count(db, count_query, key), TotalMode.EXACT
+
+
+def invalidate_instrument(table: Table, instrument_id: int) -> None:
+    count_cache.invalidate_where(lambda key: key[0] == table.name and key[1] == instrument_id)
+
+
+async def _seed(db: AsyncSession, table: Table, instrument_id: int) -> None:
+    # Runs after the caller's rows are written, so the count already includes them.
+    total = (
+        await db.execute(
+            select(func.count()).select_from(table).where(table.c.instrument_id == instrument_id)
+        )
+    ).scalar_one()
+    stmt = dialect_insert(db, PriceRowCount.__table__).values(
+        instrument_id=instrument_id, table_name=table.name, row_count=total
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["instrument_id", "table_name"],
+        set_={"row_count": stmt.excluded.row_count},
+    )
+    await db.execute(stmt)
+    invalidate_instrument(table, instrument_id)
+
+
+async def add_rows(db: AsyncSession, table: Table, instrument_id: int, rows: int) -> None:
+    """
+    Adjust the summary count by ``rows`` (may be negative) after they were written;
+    the caller commits. An instrument without a summary row is seeded by a count.
+    """
+    if await _summary_count(db, table, instrument_id) is None:
+        await _seed(db, table, instrument_id)
+        return
+    stmt = dialect_insert(db, PriceRowCount.__table__).values(
+        instrument_id=instrument_id, table_name=table.name, row_count=rows
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["instrument_id", "table_name"],
+        set_={"row_count": PriceRowCount.row_count + stmt.excluded.row_count},
+    )
+    await db.execute(stmt)
+    invalidate_instrument(table, instrument_id)
+
+
+async def record_ingest(db: AsyncSession, table: Table, inserted: Mapping[int, int]) -> None:
+    """Add new rows per instrument to the summary counts and drop their cached totals."""
+    for instrument_id, rows in inserted.items():
+        if rows:
+            await add_rows(db, table, instrument_id, rows)
+    await db.commit()
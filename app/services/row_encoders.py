@@ -0,0 +1,66 @@
+"""
+Text encoders for batches of plain result rows (NDJSON and CSV).
+
+Each call encodes one batch into bytes, so callers can stream or append
+batch by batch without holding the full result.
+"""
+
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Row
+
+from app.schemas.price import StreamFormat
+
+MEDIA_TYPES = {
+    StreamFormat.NDJSON: "application/x-ndjson",
+    StreamFormat.CSV: "text/csv",
+}
+
+
+def _text(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_ndjson(rows: Sequence[Row]) -> bytes:
+    if not rows:
+        return b""
+    fields = rows[0]._fields
+    lines = [
+        json.dumps({field: _text(value) for field, value in zip(fields, row)}) for row in rows
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def encode_csv(rows: Sequence[Row], header: bool = False) -> bytes:
+    if not rows:
+        return b""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if header:
+        writer.writerow(rows[0]._fields)
+    writer.writerows([_text(value) for value in row] for row in rows)
+    return buf.getvalue().encode()
+
+
+async def encode_batches(
+    batches: AsyncIterator[Sequence[Row]], fmt: StreamFormat
+) -> AsyncIterator[bytes]:
+    first = True
+    async for rows in batches:
+        if fmt == StreamFormat.CSV:
+            yield encode_csv(rows, header=first)
+        else:
+            yield encode_ndjson(rows)
+        first = False
@@ -0,0 +1,166 @@
+"""
+Incremental CSV extraction from an upload request body.
+
+The request body is read as it arrives and cut into CSV chunks of roughly
+``chunk_bytes`` on line boundaries, each prefixed with the header line, so peak
+memory is bounded by the chunk size rather than the file size. Both
+``multipart/form-data`` (the first file part is the CSV; plain form fields must
+precede it) and raw ``text/csv`` bodies are accepted.
+"""
+
+from typing import AsyncIterator, Dict, List, Optional
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+class CsvChunker:
+    """Accumulates CSV bytes and emits header-prefixed chunks cut at line boundaries."""
+
+    def __init__(self, chunk_bytes: int) -> None:
+        self.chunk_bytes = chunk_bytes
+        self._header: Optional[bytes] = None
+        self._buf = bytearray()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        self._buf += data
+        if self._header is None:
+            newline = self._buf.find(b"\n")
+            if newline == -1:
+                return []
+            self._header = bytes(self._buf[: newline + 1])
+            del self._buf[: newline + 1]
+        chunks = []
+        while len(self._buf) >= self.chunk_bytes:
+            cut = self._buf.find(b"\n", self.chunk_bytes - 1)
+            if cut == -1:
+                break
+            chunks.append(self._header + bytes(self._buf[: cut + 1]))
+            del self._buf[: cut + 1]
+        return chunks
+
+    def flush(self) -> Optional[bytes]:
+        if self._header is None or not self._buf.strip():
+            return None
+        chunk = self._header + bytes(self._buf)
+        self._buf.clear()
+        return chunk
+
+
+class CsvUploadStream:
+    def __init__(self, request: Request, chunk_bytes: int, max_bytes: int) -> None:
+        self.request = request
+        self.max_bytes = max_bytes
+        self.bytes_received = 0
+        self.fields: Dict[str, str] = {}
+        self._chunker = CsvChunker(chunk_bytes)
+
+    async def _body(self) -> AsyncIterator[bytes]:
+        async for data in self.request.stream():
+            self.bytes_received += len(data)
+            if self.bytes_received > self.max_bytes:
+                raise UploadTooLargeError(
+                    f"Upload exceeds the {self.max_bytes // (1024 * 1024)} MB limit"
+                )
+            yield data
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        content_type, params = parse_options_header(self.request.headers.get("content-type"))
+        if content_type == b"multipart/form-data":
+            iterator = self._multipart_chunks(params)
+        else:
+            iterator = self._raw_chunks()
+        async for chunk in iterator:
+            yield chunk
+
+    async def _raw_chunks(self) -> AsyncIterator[bytes]:
+        async for data in self._body():
+            for chunk in self._chunker.feed(data):
+                yield chunk
+        tail = self._chunker.flush()
+        if tail is not None:
+            yield tail
+
+    async def _multipart_chunks(self, params: dict) -> AsyncIterator[bytes]:
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise ValueError("Missing boundary in multipart body")
+
+        ready: List[bytes] = []
+        state = {
+            "headers": [],
+            "header": b"",
+            "value": b"",
+            "name": None,
+            "is_file_part": False,
+            "file": False,
+        }
+        field_value = bytearray()
+        seen_file = False
+
+        def on_part_begin():
+            state["headers"] = []
+            field_value.clear()
+
+        def on_header_field(data, start, end):
+            state["header"] += data[start:end]
+
+        def on_header_value(data, start, end):
+            state["value"] += data[start:end]
+
+        def on_header_end():
+            state["headers"].append((state["header"].lower(), state["value"]))
+            state["header"] = b""
+            state["value"] = b""
+
+        def on_headers_finished():
+            nonlocal seen_file
+            disposition = dict(state["headers"]).get(b"content-disposition")
+            _, options = parse_options_header(disposition)
+            state["name"] = options.get(b"name", b"").decode()
+            state["is_file_part"] = b"filename" in options
+            # Only the first file part is ingested; any later one is ignored.
+            state["file"] = state["is_file_part"] and not seen_file
+            if state["file"]:
+                seen_file = True
+
+        def on_part_data(data, start, end):
+            if state["file"]:
+                ready.extend(self._chunker.feed(data[start:end]))
+            elif not state["is_file_part"]:
+                field_value.extend(data[start:end])
+
+        def on_part_end():
+            if state["file"]:
+                tail = self._chunker.flush()
+                if tail is not None:
+                    ready.append(tail)
+                state["file"] = False
+            elif not state["is_file_part"] and state["name"]:
+                self.fields[state["name"]] = field_value.decode()
+
+        parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": on_part_begin,
+                "on_header_field": on_header_field,
+                "on_header_value": on_header_value,
+                "on_header_end": on_header_end,
+                "on_headers_finished": on_headers_finished,
+                "on_part_data": on_part_data,
+                "on_part_end": on_part_end,
+            },
+        )
+        async for data in self._body():
+            parser.write(data)
+            while ready:
+                yield ready.pop(0)
+        parser.finalize()
+        while ready:
+            yield ready.pop(0)
+        if not seen_file:
+            raise ValueError("No file part found in multipart body")
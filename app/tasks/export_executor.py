@@ -0,0 +1,75 @@
+"""
+Bounded FIFO executor for export jobs.
+
+Jobs are queued in submission order and run by a fixed number of worker
+tasks, so at most ``workers`` exports hold a database cursor at once no
+matter how many are requested.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExportQueueFullError(Exception):
+    pass
+
+
+class ExportExecutor:
+    def __init__(self, workers: int, max_queue_size: int) -> None:
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # (Re)bind to the running loop; queues and tasks cannot cross event loops.
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._tasks = [loop.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info("Started export executor with %d workers", self.workers)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._loop = None
+
+    def submit(self, fn: Callable[..., Awaitable], *args) -> None:
+        """Queue ``fn(*args)``; raises ExportQueueFullError when the queue is at capacity."""
+        self.start()
+        try:
+            self._queue.put_nowait((fn, args))
+        except asyncio.QueueFull:
+            raise ExportQueueFullError("Export queue is full")
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def join(self) -> None:
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            fn, args = await self._queue.get()
+            try:
+                await fn(*args)
+            except Exception:
+                logger.exception("Export worker %d: job failed", index)
+            finally:
+                self._queue.task_done()
+
+
+export_executor = ExportExecutor(settings.EXPORT_WORKERS, settings.EXPORT_QUEUE_MAX_SIZE)
@@ -1,18 +1,55 @@
-import csv
+import asyncio
 import os
 import logging
+import time
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional, Sequence
+
+import pyarrow as pa
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
-from app.services.price_service import get_tick_data, get_ohlc_data
+from app.config import settings
+from app.schemas.price import ExportFormat
+from app.services import export_cache, metrics
+from app.services.columnar import OHLC_SCHEMA, TICK_SCHEMA
+from app.services.export_formats import EXTENSIONS, ExportWriter
+from app.services.price_service import stream_ohlc_rows, stream_tick_rows
 from app.models.price import TimeFrame, PriceType
+from app.tasks.job_store import JobStore
 
 logger = logging.getLogger(__name__)
 
-# In-memory job store for single-process development use.
-# For production with multiple workers, replace with a persistent backend (e.g., Redis or a DB table).
-jobs = {}
+
+async def _write_export(
+    job_id: str,
+    batches: AsyncIterator[Sequence[Row]],
+    schema: pa.Schema,
+    fmt: ExportFormat,
+    export_dir: str,
+    store: JobStore,
+) -> str:
+    """Append each batch to the export file as it arrives, updating the job's progress."""
+    os.makedirs(export_dir, exist_ok=True)
+    file_path = os.path.join(export_dir, f"{job_id}.{EXTENSIONS[fmt]}")
+    partial_path = file_path + ".part"
+    rows_written = 0
+    writer = ExportWriter(partial_path, schema, fmt, settings.EXPORT_PARQUET_ROW_GROUP_SIZE)
+    try:
+        async for rows in batches:
+            # Encoding and compression release the GIL; keep them off the event loop.
+            await asyncio.to_thread(writer.write, rows)
+            rows_written += len(rows)
+            await store.update(
+                job_id, rows_written=rows_written, bytes_written=writer.bytes_written
+            )
+    finally:
+        await asyncio.to_thread(writer.close)
+    # Only completed exports appear under the final name.
+    os.replace(partial_path, file_path)
+    bytes_written = os.path.getsize(file_path)
+    await store.update(job_id, rows_written=rows_written, bytes_written=bytes_written)
+    return file_path
 
 
 async def export_tick_data(
@@ -20,28 +57,35 @@ async def export_tick_data(
     instrument_id: int,
     from_date: Optional[datetime],
     to_date: Optional[datetime],
+    fmt: ExportFormat,
     db_session_factory: async_sessionmaker,
     export_dir: str,
+    store: JobStore,
+    cache_key: Optional[str] = None,
 ):
-    jobs[job_id] = {"status": "processing", "file_path": None, "error": None}
+    await store.update(job_id, status="processing")
+    started, status = time.perf_counter(), "failed"
     try:
         async with db_session_factory() as db:
-            items, total = await get_tick_data(
-                db, instrument_id, from_date, to_date, limit=1000000, offset=0
+            batches = stream_tick_rows(
+                db, instrument_id, from_date, to_date, settings.STREAM_BATCH_SIZE
             )
-        file_path = os.path.join(export_dir, f"{job_id}.csv")
-        os.makedirs(export_dir, exist_ok=True)
-        with open(file_path, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["id", "instrument_id", "timestamp", "bid", "ask", "volume"])
-            for item in items:
-                writer.writerow(
-                    [item.id, item.instrument_id, item.timestamp, item.bid, item.ask, item.volume]
-                )
-        jobs[job_id] = {"status": "completed", "file_path": file_path, "error": None}
+            file_path = await _write_export(job_id, batches, TICK_SCHEMA, fmt, export_dir, store)
+        if cache_key is not None:
+            export_cache.store(instrument_id, cache_key, file_path, EXTENSIONS[fmt])
+        await store.update(job_id, status="completed", file_path=file_path)
+        status = "completed"
+    except asyncio.CancelledError:
+        # Executor shutdown: record it rather than leave the job "processing".
+        await store.update(job_id, status="failed", error="Export cancelled")
+        raise
     except Exception as e:
         logger.error(f"Export tick job {job_id} failed: {e}")
-        jobs[job_id] = {"status": "failed", "file_path": None, "error": str(e)}
+        await store.update(job_id, status="failed", error=str(e))
+    finally:
+        metrics.EXPORT_SECONDS.observe(
+            time.perf_counter() - started, "tick", fmt.value, status
+        )
 
 
 async def export_ohlc_data(
@@ -51,50 +95,38 @@ async def export_ohlc_data(
     to_date: Optional[datetime],
     timeframe: Optional[TimeFrame],
     price_type: Optional[PriceType],
+    fmt: ExportFormat,
     db_session_factory: async_sessionmaker,
     export_dir: str,
+    store: JobStore,
+    cache_key: Optional[str] = None,
 ):
-    jobs[job_id] = {"status": "processing", "file_path": None, "error": None}
+    await store.update(job_id, status="processing")
+    started, status = time.perf_counter(), "failed"
     try:
         async with db_session_factory() as db:
-            items, total = await get_ohlc_data(
-                db, instrument_id, from_date, to_date, timeframe, price_type,
-                limit=1000000, offset=0,
-            )
-        file_path = os.path.join(export_dir, f"{job_id}.csv")
-        os.makedirs(export_dir, exist_ok=True)
-        with open(file_path, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(
-                [
-                    "id",
-                    "instrument_id",
-                    "timestamp",
-                    "open",
-                    "high",
-                    "low",
-                    "close",
-                    "volume",
-                    "timeframe",
-                    "price_type",
-                ]
+            batches = stream_ohlc_rows(
+                db,
+                instrument_id,
+                from_date,
+                to_date,
+                timeframe,
+                price_type,
+                settings.STREAM_BATCH_SIZE,
             )
-            for item in items:
-                writer.writerow(
-                    [
-                        item.id,
-                        item.instrument_id,
-                        item.timestamp,
-                        item.open,
-                        item.high,
-                        item.low,
-                        item.close,
-                        item.volume,
-                        item.timeframe,
-                        item.price_type,
-                    ]
-                )
-        jobs[job_id] = {"status": "completed", "file_path": file_path, "error": None}
+            file_path = await _write_export(job_id, batches, OHLC_SCHEMA, fmt, export_dir, store)
+        if cache_key is not None:
+            export_cache.store(instrument_id, cache_key, file_path, EXTENSIONS[fmt])
+        await store.update(job_id, status="completed", file_path=file_path)
+        status = "completed"
+    except asyncio.CancelledError:
+        # Executor shutdown: record it rather than leave the job "processing".
+        await store.update(job_id, status="failed", error="Export cancelled")
+        raise
     except Exception as e:
         logger.error(f"Export OHLC job {job_id} failed: {e}")
-        jobs[job_id] = {"status": "failed", "file_path": None, "error": str(e)}
+        await store.update(job_id, status="failed", error=str(e))
+    finally:
+        metrics.EXPORT_SECONDS.observe(
+            time.perf_counter() - started, "ohlc", fmt.value, status
+        )
@@ -0,0 +1,269 @@
+"""
+Export job state backends.
+
+``memory`` keeps jobs in the process (single worker / development only);
+``database`` and ``redis`` share job state between all uvicorn workers and
+pods, so status and download calls can land on any of them.
+
+``claim`` atomically creates a job as the active one for a ``dedup_key``,
+or returns the job that already holds that key. Identical export requests
+therefore attach to the running job instead of starting another scan. The
+memory store runs the check in one event-loop step. The database store
+relies on a partial unique index over active jobs, and the redis store on
+``SET NX``.
+
+Every update refreshes a job's ``updated_at``, which acts as a heartbeat.
+An active job with no update for ``EXPORT_JOB_STALE_SECONDS`` is treated as
+lost, for example when its pod died with the in-memory queue. The next
+``claim`` marks it failed and takes the key over. Database rows older than
+``EXPORT_JOB_TTL_SECONDS`` are deleted, matching the redis key expiry.
+"""
+
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+import redis.asyncio as aioredis
+from redis.exceptions import WatchError
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.export_job import ExportJob
+
+JOB_FIELDS = ("status", "file_path", "error", "rows_written", "bytes_written")
+_INT_FIELDS = ("rows_written", "bytes_written")
+ACTIVE_STATUSES = ("pending", "processing")
+STALE_ERROR = "Export worker stopped responding"
+# Attempts at taking a dedup key over from a lost job before running unshared.
+_CLAIM_ATTEMPTS = 3
+
+
+def new_job(status: str) -> dict:
+    return {
+        "status": status,
+        "file_path": None,
+        "error": None,
+        "rows_written": 0,
+        "bytes_written": 0,
+    }
+
+
+def _is_live(job: Optional[dict]) -> bool:
+    """Whether ``job`` is active and was updated within ``EXPORT_JOB_STALE_SECONDS``."""
+    if job is None or job["status"] not in ACTIVE_STATUSES:
+        return False
+    return time.time() - float(job.get("updated_at") or 0) < settings.EXPORT_JOB_STALE_SECONDS
+
+
+class JobStore(ABC):
+    @abstractmethod
+    async def create(self, job_id: str, job: dict) -> None: ...
+
+    @abstractmethod
+    async def claim(self, dedup_key: str, job_id: str, job: dict) -> str:
+        """Create ``job`` as the active job for ``dedup_key`` unless a live one holds it.
+
+        Returns the id of the job now holding the key: ``job_id`` when it was created.
+        """
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def update(self, job_id: str, **fields) -> None: ...
+
+
+class MemoryJobStore(JobStore):
+    def __init__(self) -> None:
+        self.jobs: Dict[str, dict] = {}
+        self.active: Dict[str, str] = {}
+
+    async def create(self, job_id: str, job: dict) -> None:
+        self.jobs[job_id] = {**job, "updated_at": time.time()}
+
+    async def claim(self, dedup_key: str, job_id: str, job: dict) -> str:
+        # No awaits between the check and the insert, so this is atomic on the loop.
+        active_id = self.active.get(dedup_key)
+        if active_id is not None:
+            active = self.jobs.get(active_id)
+            if _is_live(active):
+                return active_id
+            if active is not None and active["status"] in ACTIVE_STATUSES:
+                active.update(status="failed", error=STALE_ERROR)
+        self.jobs[job_id] = {**job, "updated_at": time.time()}
+        self.active[dedup_key] = job_id
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        job = self.jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    async def update(self, job_id: str, **fields) -> None:
+        self.jobs.setdefault(job_id, new_job("pending")).update(fields, updated_at=time.time())
+
+
+class DatabaseJobStore(JobStore):
+    def __init__(self, session_factory: async_sessionmaker) -> None:
+        self.session_factory = session_factory
+
+    async def _insert(self, job_id: str, job: dict, dedup_key: Optional[str] = None) -> None:
+        async with self.session_factory() as db:
+            fields = {field: job[field] for field in JOB_FIELDS}
+            db.add(ExportJob(id=job_id, dedup_key=dedup_key, **fields))
+            await db.commit()
+
+    async def _expire(self) -> None:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.EXPORT_JOB_TTL_SECONDS)
+        async with self.session_factory() as db:
+            await db.execute(delete(ExportJob).where(ExportJob.created_at < cutoff))
+            await db.commit()
+
+    async def create(self, job_id: str, job: dict) -> None:
+        await self._expire()
+        await self._insert(job_id, job)
+
+    async def claim(self, dedup_key: str, job_id: str, job: dict) -> str:
+        await self._expire()
+        for _ in range(_CLAIM_ATTEMPTS):
+            try:
+                # uq_export_jobs_active_dedup_key admits one active job per key.
+                await self._insert(job_id, job, dedup_key)
+                return job_id
+            except IntegrityError:
+                pass
+            cutoff = datetime.now(timezone.utc) - timedelta(
+                seconds=settings.EXPORT_JOB_STALE_SECONDS
+            )
+            heartbeat = func.coalesce(ExportJob.updated_at, ExportJob.created_at)
+            async with self.session_factory() as db:
+                active = await db.execute(
+                    select(ExportJob.id, heartbeat < cutoff).where(
+                        ExportJob.dedup_key == dedup_key,
+                        ExportJob.status.in_(ACTIVE_STATUSES),
+                    )
+                )
+                row = active.first()
+                if row is None:
+                    continue  # Finished between the insert and this lookup.
+                active_id, stale = row
+                if not stale:
+                    return active_id
+                await db.execute(
+                    update(ExportJob)
+                    .where(ExportJob.id == active_id, ExportJob.status.in_(ACTIVE_STATUSES))
+                    .values(status="failed", error=STALE_ERROR)
+                )
+                await db.commit()
+        await self._insert(job_id, job)
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        async with self.session_factory() as db:
+            result = await db.execute(select(ExportJob).where(ExportJob.id == job_id))
+            row = result.scalar_one_or_none()
+        if row is None:
+            return None
+        return {field: getattr(row, field) for field in JOB_FIELDS}
+
+    async def update(self, job_id: str, **fields) -> None:
+        async with self.session_factory() as db:
+            await db.execute(update(ExportJob).where(ExportJob.id == job_id).values(**fields))
+            await db.commit()
+
+
+class RedisJobStore(JobStore):
+    def __init__(self, client: aioredis.Redis, ttl_seconds: int, prefix: str = "export_job:"):
+        self._r = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}{job_id}"
+
+    @staticmethod
+    def _encode(fields: dict) -> dict:
+        # Redis hashes cannot hold None; an empty string stands for "not set".
+        return {key: "" if value is None else value for key, value in fields.items()}
+
+    def _active_key(self, dedup_key: str) -> str:
+        return f"{self.prefix}active:{dedup_key}"
+
+    async def create(self, job_id: str, job: dict) -> None:
+        key = self._key(job_id)
+        await self._r.hset(key, mapping=self._encode({**job, "updated_at": time.time()}))
+        await self._r.expire(key, self.ttl_seconds)
+
+    async def _take_over(self, active_key: str, current: bytes, job_id: str) -> bool:
+        """Point ``active_key`` at ``job_id`` if it still holds ``current``."""
+        async with self._r.pipeline() as pipe:
+            try:
+                await pipe.watch(active_key)
+                if await pipe.get(active_key) != current:
+                    return False
+                pipe.multi()
+                pipe.set(active_key, job_id, ex=self.ttl_seconds)
+                await pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    async def claim(self, dedup_key: str, job_id: str, job: dict) -> str:
+        # Write the hash first: whoever wins the key must always resolve to a job.
+        await self.create(job_id, job)
+        active_key = self._active_key(dedup_key)
+        for _ in range(_CLAIM_ATTEMPTS):
+            if await self._r.set(active_key, job_id, nx=True, ex=self.ttl_seconds):
+                return job_id
+            current = await self._r.get(active_key)
+            if current is None:
+                continue
+            active_id = current.decode() if isinstance(current, bytes) else current
+            active = await self.get(active_id)
+            if _is_live(active):
+                await self._r.delete(self._key(job_id))
+                return active_id
+            if await self._take_over(active_key, current, job_id):
+                if active is not None and active["status"] in ACTIVE_STATUSES:
+                    await self.update(active_id, status="failed", error=STALE_ERROR)
+                return job_id
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        raw = await self._r.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        job = {
+            (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+            for k, v in raw.items()
+        }
+        for field in _INT_FIELDS:
+            job[field] = int(job.get(field) or 0)
+        for field in ("file_path", "error"):
+            job[field] = job.get(field) or None
+        job["updated_at"] = float(job.get("updated_at") or 0)
+        return job
+
+    async def update(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = time.time()
+        await self._r.hset(self._key(job_id), mapping=self._encode(fields))
+
+
+def create_job_store(backend: str) -> JobStore:
+    if backend == "database":
+        return DatabaseJobStore(async_session_maker)
+    if backend == "redis":
+        return RedisJobStore(
+            aioredis.from_url(settings.REDIS_URL), ttl_seconds=settings.EXPORT_JOB_TTL_SECONDS
+        )
+    return MemoryJobStore()
+
+
+job_store = create_job_store(settings.EXPORT_JOB_STORE)
+
+
+def get_job_store() -> JobStore:
+    return job_store
@@ -0,0 +1,50 @@
+"""
+Partition maintenance for the price tables; run from cron or a k8s CronJob.
+
+Usage:
+    python -m app.tasks.partition_maintenance --retain-months 24
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.config import settings
+from app.database import async_session_maker
+from app.services.partitions import (
+    PARTITIONED_TABLES,
+    add_months,
+    detach_partitions_before,
+    ensure_ahead,
+    month_start,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def run(months_ahead: int, retain_months: Optional[int]) -> None:
+    async with async_session_maker() as db:
+        await ensure_ahead(db, months_ahead)
+        if retain_months is None:
+            return
+        cutoff = add_months(month_start(datetime.now(timezone.utc)), -retain_months)
+        for table in PARTITIONED_TABLES:
+            detached = await detach_partitions_before(db, table, cutoff)
+            for name in detached:
+                logger.info("Detached %s from %s", name, table)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD)
+    parser.add_argument(
+        "--retain-months",
+        type=int,
+        default=None,
+        help="detach partitions older than this many months (default: keep all)",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.months_ahead, args.retain_months))
@@ -0,0 +1,108 @@
+"""
+Benchmark: N single-instrument GET /prices/ohlc/{instrument_id} calls vs one
+POST /prices/ohlc/batch for the same instruments.
+
+Runs the app in-process against an in-memory SQLite database, so wall time
+covers routing, queries and serialization but no network round trips; over a
+real network the gap grows by one round trip per instrument.
+
+Usage:
+    python -m benchmarks.bench_batch_queries --instruments 100 --bars 500
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import Base, get_db, get_read_db
+from app.main import app
+from app.models.asset import AssetType, Instrument
+from app.services import price_service
+
+
+async def run(instruments: int, bars: int, limit: int, repeat: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    rng = np.random.default_rng(0)
+    async with session_factory() as db:
+        rows = [
+            Instrument(symbol=f"SYM{i}", name=f"Symbol {i}", asset_type=AssetType.CRYPTO)
+            for i in range(instruments)
+        ]
+        db.add_all(rows)
+        await db.commit()
+        ids = [row.id for row in rows]
+        frames = []
+        for instrument_id in ids:
+            close = 100 + rng.normal(0, 0.5, bars).cumsum()
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "instrument_id": instrument_id,
+                        "timestamp": pd.date_range("2024-01-01", periods=bars, freq="h"),
+                        "open": close.round(4),
+                        "high": (close + 0.25).round(4),
+                        "low": (close - 0.25).round(4),
+                        "close": close.round(4),
+                        "volume": 1000.0,
+                        "timeframe": "H1",
+                        "price_type": "OHLC",
+                    }
+                )
+            )
+        await price_service.bulk_insert_ohlc_data(db, pd.concat(frames, ignore_index=True))
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    params = {"timeframe": "H1", "limit": limit, "include_total": False}
+    body = {"instrument_ids": ids, "timeframe": "H1", "limit": limit}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def singles() -> int:
+            count = 0
+            for instrument_id in ids:
+                resp = await client.get(f"/prices/ohlc/{instrument_id}", params=params)
+                count += len(resp.json()["items"])
+            return count
+
+        async def batch() -> int:
+            resp = await client.post("/prices/ohlc/batch", json=body)
+            return sum(len(result["items"]) for result in resp.json()["results"])
+
+        print(f"{'variant':<22}{'requests':>10}{'rows':>10}{'wall ms':>10}")
+        for name, call, requests in (
+            (f"{instruments} x GET", singles, instruments),
+            ("1 x POST batch", batch, 1),
+        ):
+            await call()
+            wall, count = [], 0
+            for _ in range(repeat):
+                started = time.perf_counter()
+                count = await call()
+                wall.append(time.perf_counter() - started)
+            print(f"{name:<22}{requests:>10}{count:>10}{min(wall) * 1000:>10.1f}")
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--instruments", type=int, default=100)
+    parser.add_argument("--bars", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.instruments, args.bars, args.limit, args.repeat))
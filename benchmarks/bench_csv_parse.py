@@ -0,0 +1,134 @@
+"""
+Benchmark: per-row ``iterrows`` CSV conversion vs. the column-wise parser.
+
+Usage:
+    python -m benchmarks.bench_csv_parse --rows 50000
+"""
+
+import argparse
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.models.price import PriceType, TimeFrame
+from app.services.bulk_ingest import frame_records
+from app.services.csv_parser import parse_ohlc_frame, parse_tick_frame
+from app.services.price_service import OHLC_COLUMNS, TICK_COLUMNS
+
+
+def _tick_csv(rows: int) -> bytes:
+    rng = np.random.default_rng(0)
+    mid = 1.1 + rng.normal(0, 1e-4, rows).cumsum()
+    volume = rng.integers(1, 1_000_000, rows).astype("float64")
+    volume[::10] = np.nan
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=rows, freq="100ms"),
+            "bid": mid.round(5),
+            "ask": (mid + 2e-5).round(5),
+            "volume": volume,
+        }
+    )
+    return df.to_csv(index=False).encode()
+
+
+def _ohlc_csv(rows: int) -> bytes:
+    rng = np.random.default_rng(1)
+    close = 42000 + rng.normal(0, 10, rows).cumsum()
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2020-01-01", periods=rows, freq="min"),
+            "open": close.round(2),
+            "high": (close + 5).round(2),
+            "low": (close - 5).round(2),
+            "close": close.round(2),
+            "volume": rng.integers(1, 1000, rows),
+        }
+    )
+    return df.to_csv(index=False).encode()
+
+
+def legacy_tick_rows(df: pd.DataFrame, instrument_id: int) -> list:
+    rows = []
+    for _, row in df.iterrows():
+        rows.append(
+            {
+                "instrument_id": instrument_id,
+                "timestamp": pd.to_datetime(row["timestamp"]),
+                "bid": row["bid"],
+                "ask": row["ask"],
+                "volume": (
+                    row.get("volume")
+                    if "volume" in row and not pd.isna(row.get("volume"))
+                    else None
+                ),
+            }
+        )
+    return rows
+
+
+def legacy_ohlc_rows(df: pd.DataFrame, instrument_id: int) -> list:
+    rows = []
+    for _, row in df.iterrows():
+        rows.append(
+            {
+                "instrument_id": instrument_id,
+                "timestamp": pd.to_datetime(row["timestamp"]),
+                "open": row["open"],
+                "high": row["high"],
+                "low": row["low"],
+                "close": row["close"],
+                "volume": (
+                    row.get("volume")
+                    if "volume" in row and not pd.isna(row.get("volume"))
+                    else None
+                ),
+                "timeframe": "M1",
+                "price_type": "OHLC",
+            }
+        )
+    return rows
+
+
+def _time(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def run(rows: int) -> None:
+    tick_df = pd.read_csv(io.BytesIO(_tick_csv(rows)))
+    ohlc_df = pd.read_csv(io.BytesIO(_ohlc_csv(rows)))
+
+    cases = [
+        (
+            "tick",
+            lambda: legacy_tick_rows(tick_df, 1),
+            lambda: list(frame_records(parse_tick_frame(tick_df, 1), TICK_COLUMNS)),
+        ),
+        (
+            "ohlc",
+            lambda: legacy_ohlc_rows(ohlc_df, 1),
+            lambda: list(
+                frame_records(
+                    parse_ohlc_frame(ohlc_df, 1, TimeFrame.M1, PriceType.OHLC), OHLC_COLUMNS
+                )
+            ),
+        ),
+    ]
+    print(f"{'kind':<6}{'rows':>10}{'iterrows s':>14}{'columnar s':>14}{'speedup':>10}")
+    for kind, legacy, columnar in cases:
+        legacy_s = _time(legacy)
+        columnar_s = _time(columnar)
+        print(
+            f"{kind:<6}{rows:>10}{legacy_s:>14.3f}{columnar_s:>14.3f}"
+            f"{legacy_s / columnar_s:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    run(parser.parse_args().rows)
@@ -0,0 +1,90 @@
+"""
+Benchmark: per-request overhead of the metrics instrumentation.
+
+Calls a minimal ASGI app directly (no HTTP client or server) with and without
+``MetricsMiddleware``. It also times a ``metrics.timed`` service call against
+the bare coroutine, and a single ``Histogram.observe``. The difference is the
+instrumentation cost, reported in microseconds.
+
+Usage:
+    python -m benchmarks.bench_metrics --requests 200000
+"""
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.services import metrics
+
+
+async def endpoint():
+    return None
+
+
+class _App:
+    """Stands in for the routed FastAPI app: sets the endpoint and sends a response."""
+
+    routes = [SimpleNamespace(endpoint=endpoint, path="/prices/ohlc/{instrument_id}")]
+
+    async def __call__(self, scope, receive, send) -> None:
+        scope["endpoint"] = endpoint
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def _send(message) -> None:
+    pass
+
+
+async def _per_call(call, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        await call()
+    return (time.perf_counter() - started) / count * 1e6
+
+
+async def run(requests: int) -> None:
+    app = _App()
+    wrapped = metrics.MetricsMiddleware(app)
+
+    def scope():
+        return {"type": "http", "method": "GET", "path": "/prices/ohlc/1", "app": app}
+
+    async def bare_request():
+        await app(scope(), _receive, _send)
+
+    async def metered_request():
+        await wrapped(scope(), _receive, _send)
+
+    timed_endpoint = metrics.timed(endpoint)
+    # Warm up label series and route lookups before timing.
+    await metered_request()
+    await timed_endpoint()
+
+    bare = await _per_call(bare_request, requests)
+    metered = await _per_call(metered_request, requests)
+    call = await _per_call(endpoint, requests)
+    timed_call = await _per_call(timed_endpoint, requests)
+    started = time.perf_counter()
+    for _ in range(requests):
+        metrics.REQUEST_SECONDS.observe(0.003, "GET", "/bench", "200")
+    observe = (time.perf_counter() - started) / requests * 1e6
+
+    print(f"{'measure':<28}{'us/call':>10}")
+    print(f"{'ASGI app, bare':<28}{bare:>10.2f}")
+    print(f"{'ASGI app, middleware':<28}{metered:>10.2f}")
+    print(f"{'middleware overhead':<28}{metered - bare:>10.2f}")
+    print(f"{'service call overhead':<28}{timed_call - call:>10.2f}")
+    print(f"{'Histogram.observe':<28}{observe:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
@@ -0,0 +1,86 @@
+"""
+Benchmark: bytes on the wire and server CPU for JSON vs Arrow IPC vs Parquet
+responses of GET /prices/tick/{instrument_id}.
+
+Runs the app in-process against an in-memory SQLite database, so CPU time
+covers query, serialization and the in-process client.
+
+Usage:
+    python -m benchmarks.bench_price_formats --rows 100000
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import Base, get_db
+from app.main import app
+from app.models.asset import AssetType, Instrument
+from app.services import columnar, price_service
+
+FORMATS = [
+    ("json", "application/json"),
+    ("arrow", columnar.ARROW_STREAM_MEDIA_TYPE),
+    ("parquet", columnar.PARQUET_MEDIA_TYPE),
+]
+
+
+async def run(rows: int, repeat: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with session_factory() as db:
+        instrument = Instrument(symbol="EURUSD", name="EUR/USD", asset_type=AssetType.CURRENCY)
+        db.add(instrument)
+        await db.commit()
+        mid = 1.1 + np.random.default_rng(0).normal(0, 1e-4, rows).cumsum()
+        frame = pd.DataFrame(
+            {
+                "instrument_id": instrument.id,
+                "timestamp": pd.date_range("2024-01-01", periods=rows, freq="100ms"),
+                "bid": mid.round(5),
+                "ask": (mid + 2e-5).round(5),
+                "volume": 100.0,
+            }
+        )
+        await price_service.bulk_insert_tick_data(db, frame)
+        instrument_id = instrument.id
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    path = f"/prices/tick/{instrument_id}"
+    params = {"limit": rows, "include_total": False}
+    print(f"{'format':<10}{'bytes':>14}{'bytes/row':>12}{'cpu ms':>10}{'wall ms':>10}")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for name, accept in FORMATS:
+            cpu, wall, size = [], [], 0
+            for _ in range(repeat):
+                cpu_start, wall_start = time.process_time(), time.perf_counter()
+                resp = await client.get(path, params=params, headers={"accept": accept})
+                cpu.append(time.process_time() - cpu_start)
+                wall.append(time.perf_counter() - wall_start)
+                size = len(resp.content)
+            print(
+                f"{name:<10}{size:>14}{size / rows:>12.1f}"
+                f"{min(cpu) * 1000:>10.0f}{min(wall) * 1000:>10.0f}"
+            )
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.repeat))
@@ -0,0 +1,121 @@
+"""
+Benchmark: table size, index size and range-query latency for Numeric(20, 8)
+vs fixed-point BIGINT price storage (PRICE_STORAGE=numeric|fixed).
+
+The same ticks are ingested in both modes through price_service, then a
+series of one-hour range reads is timed through get_tick_rows. Defaults to a
+temporary SQLite file; pass --url with a postgresql+asyncpg URL to measure
+PostgreSQL (the tick tables are dropped and recreated there).
+
+Usage:
+    python -m benchmarks.bench_price_storage --rows 200000
+    python -m benchmarks.bench_price_storage --url postgresql+asyncpg://.../bench
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.database import Base
+from app.main import app  # noqa: F401  (registers every model on Base.metadata)
+from app.models.asset import AssetType, Instrument
+from app.services import price_service
+
+TABLES = {"numeric": "tick_data", "fixed": "tick_data_fixed"}
+
+
+async def _sizes(db, table: str):
+    if db.bind.dialect.name == "postgresql":
+        result = await db.execute(
+            text("SELECT pg_table_size(:t), pg_indexes_size(:t)"), {"t": table}
+        )
+        return tuple(result.one())
+    result = await db.execute(
+        text(
+            "SELECT sum(CASE WHEN d.name = :t THEN d.pgsize ELSE 0 END), "
+            "sum(CASE WHEN m.type = 'index' THEN d.pgsize ELSE 0 END) "
+            "FROM dbstat d JOIN sqlite_master m ON m.name = d.name "
+            "WHERE m.tbl_name = :t"
+        ),
+        {"t": table},
+    )
+    return tuple(result.one())
+
+
+async def run(url: str, rows: int, queries: int) -> None:
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with session_factory() as db:
+        instrument = Instrument(
+            symbol="EURUSD", name="EUR/USD", asset_type=AssetType.CURRENCY, price_scale=5
+        )
+        db.add(instrument)
+        await db.commit()
+        instrument_id = instrument.id
+
+    rng = np.random.default_rng(0)
+    mid = 1.1 + rng.normal(0, 1e-4, rows).cumsum()
+    timestamps = pd.date_range("2024-01-01", periods=rows, freq="100ms")
+    frame = pd.DataFrame(
+        {
+            "instrument_id": instrument_id,
+            "timestamp": timestamps,
+            "bid": mid.round(5),
+            "ask": (mid + 2e-5).round(5),
+            "volume": rng.integers(1, 1000, rows).astype(float),
+        }
+    )
+    starts = pd.DatetimeIndex(rng.choice(timestamps[: max(rows - 36000, 1)], queries))
+
+    print(
+        f"{'storage':<10}{'table MB':>10}{'index MB':>10}{'ingest s':>10}"
+        f"{'p50 ms':>9}{'p95 ms':>9}"
+    )
+    for mode, table in TABLES.items():
+        settings.PRICE_STORAGE = mode
+        async with session_factory() as db:
+            started = time.perf_counter()
+            await price_service.bulk_insert_tick_data(db, frame)
+            ingest = time.perf_counter() - started
+            if db.bind.dialect.name == "postgresql":
+                await db.execute(text(f"ANALYZE {table}"))
+            table_bytes, index_bytes = await _sizes(db, table)
+            latencies = []
+            for start in starts:
+                start = start.to_pydatetime()
+                begin = time.perf_counter()
+                await price_service.get_tick_rows(
+                    db, instrument_id, start, start + pd.Timedelta(hours=1), limit=36000
+                )
+                latencies.append(time.perf_counter() - begin)
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(
+            f"{mode:<10}{table_bytes / 2**20:>10.1f}{index_bytes / 2**20:>10.1f}"
+            f"{ingest:>10.2f}{statistics.median(latencies) * 1000:>9.1f}{p95 * 1000:>9.1f}"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    if args.url is None:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        args.url = f"sqlite+aiosqlite:///{path}"
+    asyncio.run(run(args.url, args.rows, args.queries))
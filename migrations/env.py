@@ -5,7 +5,7 @@ from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 from app.database import Base
-from app.models import asset, price  # noqa: F401
+from app.models import asset, export_job, price  # noqa: F401
 
 config = context.config
 if config.config_file_name is not None:
@@ -0,0 +1,109 @@
+"""partition tick_data and ohlc_data by month
+
+Revision ID: 0001_partition_price_tables
+Revises:
+Create Date: 2026-10-18 00:00:00.000000
+
+Rebuilds tick_data and ohlc_data (as created by ``init_db``) as
+``PARTITION BY RANGE (timestamp)`` tables:
+
+- Monthly partitions cover the existing data plus PARTITION_MONTHS_AHEAD
+  months; app.services.partitions creates later months.
+- The primary key becomes (id, timestamp), since PostgreSQL requires the
+  partition key in every unique index. The redundant id index is dropped.
+- id becomes BIGINT and keeps its sequence.
+
+Existing rows are copied into the new table, which rewrites the data once.
+On large installations, run this during a maintenance window.
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+from app.services.partitions import add_months, month_range, month_start, partition_ddl
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_partition_price_tables"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = {
+    "tick_data": """
+        instrument_id INTEGER NOT NULL REFERENCES instruments (id),
+        timestamp TIMESTAMPTZ NOT NULL,
+        bid NUMERIC(20, 8) NOT NULL,
+        ask NUMERIC(20, 8) NOT NULL,
+        volume NUMERIC(20, 8)
+    """,
+    "ohlc_data": """
+        instrument_id INTEGER NOT NULL REFERENCES instruments (id),
+        timestamp TIMESTAMPTZ NOT NULL,
+        open NUMERIC(20, 8) NOT NULL,
+        high NUMERIC(20, 8) NOT NULL,
+        low NUMERIC(20, 8) NOT NULL,
+        close NUMERIC(20, 8) NOT NULL,
+        volume NUMERIC(20, 8),
+        timeframe timeframe NOT NULL,
+        price_type pricetype NOT NULL
+    """,
+}
+
+INDEXES = {
+    "tick_data": (
+        "CREATE INDEX ix_tick_instrument_timestamp ON tick_data (instrument_id, timestamp)"
+    ),
+    "ohlc_data": (
+        "CREATE INDEX ix_ohlc_instrument_timestamp_tf "
+        "ON ohlc_data (instrument_id, timestamp, timeframe)"
+    ),
+}
+
+
+def _months(table: str) -> list:
+    bounds = op.get_bind().execute(sa.text(f"SELECT min(timestamp) FROM {table}_old")).scalar()
+    now = datetime.now(timezone.utc)
+    first = month_start(bounds) if bounds else month_start(now)
+    return month_range(first, add_months(month_start(now), settings.PARTITION_MONTHS_AHEAD))
+
+
+def _rebuild(table: str, partitioned: bool) -> None:
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+    id_type = "BIGINT" if partitioned else "INTEGER"
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq AS {id_type}")
+    create = (
+        f"CREATE TABLE {table} ("
+        f"id {id_type} NOT NULL DEFAULT nextval('{table}_id_seq'), {COLUMNS[table]})"
+    )
+    if partitioned:
+        op.execute(create + " PARTITION BY RANGE (timestamp)")
+        for month in _months(table):
+            for statement in partition_ddl(
+                table, month, settings.PARTITION_INSTRUMENT_HASH_MODULUS
+            ):
+                op.execute(statement)
+    else:
+        op.execute(create)
+    op.execute(f"INSERT INTO {table} SELECT * FROM {table}_old")
+    op.execute(f"DROP TABLE {table}_old")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    if partitioned:
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, timestamp)")
+    else:
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+        op.execute(f"CREATE INDEX ix_{table}_id ON {table} (id)")
+    op.execute(INDEXES[table])
+
+
+def upgrade() -> None:
+    for table in ("tick_data", "ohlc_data"):
+        _rebuild(table, partitioned=True)
+
+
+def downgrade() -> None:
+    for table in ("tick_data", "ohlc_data"):
+        _rebuild(table, partitioned=False)
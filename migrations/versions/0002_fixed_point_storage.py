@@ -0,0 +1,73 @@
+"""fixed-point price storage
+
+Revision ID: 0002_fixed_point_storage
+Revises: 0001_partition_price_tables
+Create Date: 2026-10-18 00:00:00.000000
+
+Adds ``instruments.price_scale`` (server default 8) and the
+``tick_data_fixed`` / ``ohlc_data_fixed`` tables used with
+``PRICE_STORAGE=fixed``. ``init_db`` may already have created the tables
+on startup, so each step is skipped when its object exists. The fixed
+tables are not partitioned: their timestamps are epoch microseconds.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_fixed_point_storage"
+down_revision: Union[str, None] = "0001_partition_price_tables"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMEFRAME = postgresql.ENUM(name="timeframe", create_type=False)
+PRICE_TYPE = postgresql.ENUM(name="pricetype", create_type=False)
+
+
+def _price_columns(*names: str) -> list:
+    return [
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "instrument_id", sa.Integer(), sa.ForeignKey("instruments.id"), nullable=False
+        ),
+        sa.Column("timestamp", sa.BigInteger(), nullable=False),
+        *[sa.Column(name, sa.BigInteger(), nullable=False) for name in names],
+        sa.Column("volume", sa.BigInteger(), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("instruments")}
+    if "price_scale" not in columns:
+        op.add_column(
+            "instruments",
+            sa.Column("price_scale", sa.Integer(), nullable=False, server_default="8"),
+        )
+    if not inspector.has_table("tick_data_fixed"):
+        op.create_table("tick_data_fixed", *_price_columns("bid", "ask"))
+        op.create_index(
+            "ix_tick_fixed_instrument_timestamp",
+            "tick_data_fixed",
+            ["instrument_id", "timestamp"],
+        )
+    if not inspector.has_table("ohlc_data_fixed"):
+        op.create_table(
+            "ohlc_data_fixed",
+            *_price_columns("open", "high", "low", "close"),
+            sa.Column("timeframe", TIMEFRAME, nullable=False),
+            sa.Column("price_type", PRICE_TYPE, nullable=False),
+        )
+        op.create_index(
+            "ix_ohlc_fixed_instrument_timestamp_tf",
+            "ohlc_data_fixed",
+            ["instrument_id", "timestamp", "timeframe"],
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("ohlc_data_fixed")
+    op.drop_table("tick_data_fixed")
+    op.drop_column("instruments", "price_scale")
@@ -0,0 +1,90 @@
+"""unique natural keys on the price tables
+
+Revision ID: 0003_unique_price_keys
+Revises: 0002_fixed_point_storage
+Create Date: 2026-10-18 00:00:00.000000
+
+Idempotent ingest (``INGEST_ON_CONFLICT``) needs a unique index on each
+table's natural key for ``ON CONFLICT``:
+
+- tick tables: (instrument_id, timestamp)
+- OHLC tables: (instrument_id, timestamp, timeframe, price_type)
+
+Duplicate rows left by earlier repeated uploads are deleted first, keeping
+the oldest (lowest id) row of each key. The non-unique lookup indexes are
+then replaced by the unique ones, which serve the same range queries. On
+the partitioned ``tick_data``/``ohlc_data`` parents the index cascades to
+every partition; the key includes ``timestamp``, as PostgreSQL requires.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_unique_price_keys"
+down_revision: Union[str, None] = "0002_fixed_point_storage"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TICK_KEY = ("instrument_id", "timestamp")
+OHLC_KEY = ("instrument_id", "timestamp", "timeframe", "price_type")
+
+# table -> (natural key, old non-unique index and its columns, new unique index)
+TABLES = {
+    "tick_data": (
+        TICK_KEY,
+        "ix_tick_instrument_timestamp",
+        TICK_KEY,
+        "uq_tick_instrument_timestamp",
+    ),
+    "ohlc_data": (
+        OHLC_KEY,
+        "ix_ohlc_instrument_timestamp_tf",
+        OHLC_KEY[:3],
+        "uq_ohlc_instrument_timestamp_tf",
+    ),
+    "tick_data_fixed": (
+        TICK_KEY,
+        "ix_tick_fixed_instrument_timestamp",
+        TICK_KEY,
+        "uq_tick_fixed_instrument_timestamp",
+    ),
+    "ohlc_data_fixed": (
+        OHLC_KEY,
+        "ix_ohlc_fixed_instrument_timestamp_tf",
+        OHLC_KEY[:3],
+        "uq_ohlc_fixed_instrument_timestamp_tf",
+    ),
+}
+
+
+def _dedupe(table: str, key: Sequence[str]) -> None:
+    matches = " AND ".join(f"newer.{column} = older.{column}" for column in key)
+    op.execute(
+        f"DELETE FROM {table} AS newer USING {table} AS older "
+        f"WHERE {matches} AND newer.id > older.id"
+    )
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, (key, old_index, _, new_index) in TABLES.items():
+        if not inspector.has_table(table):
+            continue
+        _dedupe(table, key)
+        op.execute(f"DROP INDEX IF EXISTS {old_index}")
+        op.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {new_index} ON {table} ({', '.join(key)})"
+        )
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, (_, old_index, old_columns, new_index) in TABLES.items():
+        if not inspector.has_table(table):
+            continue
+        op.execute(f"DROP INDEX IF EXISTS {new_index}")
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {old_index} ON {table} ({', '.join(old_columns)})"
+        )
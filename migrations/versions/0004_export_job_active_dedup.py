@@ -0,0 +1,46 @@
+"""one active export job per dedup key
+
+Revision ID: 0004_export_job_active_dedup
+Revises: 0003_unique_price_keys
+Create Date: 2026-10-18 00:00:00.000000
+
+Replaces the plain ``export_jobs.dedup_key`` index with a partial unique
+index over pending/processing jobs. ``DatabaseJobStore.claim`` relies on it
+so that simultaneous identical exports create a single job. Active
+duplicates that already exist are failed first, keeping the newest.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_export_job_active_dedup"
+down_revision: Union[str, None] = "0003_unique_price_keys"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = "status IN ('pending', 'processing')"
+
+
+def upgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table("export_jobs"):
+        return
+    op.execute(
+        "UPDATE export_jobs AS older SET status = 'failed', error = 'Superseded' "
+        "FROM export_jobs AS newer "
+        f"WHERE older.dedup_key = newer.dedup_key AND older.{ACTIVE} AND newer.{ACTIVE} "
+        "AND older.created_at < newer.created_at"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_export_jobs_dedup_key")
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_export_jobs_active_dedup_key "
+        f"ON export_jobs (dedup_key) WHERE {ACTIVE}"
+    )
+
+
+def downgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table("export_jobs"):
+        return
+    op.execute("DROP INDEX IF EXISTS uq_export_jobs_active_dedup_key")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_export_jobs_dedup_key ON export_jobs (dedup_key)")
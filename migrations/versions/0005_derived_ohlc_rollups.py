@@ -0,0 +1,33 @@
+"""mark derived OHLC rollup bars
+
+Revision ID: 0005_derived_ohlc_rollups
+Revises: 0004_export_job_active_dedup
+Create Date: 2026-10-18 00:00:00.000000
+
+Adds ``ohlc_data.derived``. Rollup refreshes only replace derived rows, so
+bars uploaded at M5..MN1 are never overwritten by aggregates of partial M1
+data. Earlier rollups cannot be told apart from uploads, so they start out
+as uploaded (``derived = false``). To rebuild them, delete those rows and
+re-ingest the M1 source.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_derived_ohlc_rollups"
+down_revision: Union[str, None] = "0004_export_job_active_dedup"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "ohlc_data",
+        sa.Column("derived", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("ohlc_data", "derived")
@@ -0,0 +1,35 @@
+"""per-instrument price data version
+
+Revision ID: 0006_instrument_data_version
+Revises: 0005_derived_ohlc_rollups
+Create Date: 2026-10-18 00:00:00.000000
+
+Adds ``instruments.data_version`` and ``instruments.data_updated_at``. Every
+ingest that stores rows bumps them, and the price endpoints derive their
+``ETag`` / ``Last-Modified`` validators from them.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_instrument_data_version"
+down_revision: Union[str, None] = "0005_derived_ohlc_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "instruments",
+        sa.Column("data_version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "instruments", sa.Column("data_updated_at", sa.DateTime(timezone=True), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("instruments", "data_updated_at")
+    op.drop_column("instruments", "data_version")
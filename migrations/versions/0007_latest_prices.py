@@ -0,0 +1,55 @@
+"""latest price snapshot
+
+Revision ID: 0007_latest_prices
+Revises: 0006_instrument_data_version
+Create Date: 2026-10-18 00:00:00.000000
+
+Adds ``latest_prices``: the newest tick, and the newest bar per (price_type,
+timeframe), of each instrument. Ingest keeps it current, and a series with
+no row yet is seeded from the price table on its next ingest, so there is no
+backfill here. ``init_db`` may already have created the table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_latest_prices"
+down_revision: Union[str, None] = "0006_instrument_data_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRICE_TYPE = postgresql.ENUM(name="pricetype", create_type=False)
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("latest_prices"):
+        return
+    op.create_table(
+        "latest_prices",
+        sa.Column(
+            "instrument_id",
+            sa.Integer(),
+            sa.ForeignKey("instruments.id"),
+            primary_key=True,
+        ),
+        sa.Column("price_type", PRICE_TYPE, primary_key=True),
+        sa.Column("timeframe", sa.String(8), primary_key=True),
+        sa.Column("timestamp", sa.DateTime(timezone=True), nullable=False),
+        *[
+            sa.Column(name, sa.Numeric(20, 8), nullable=True)
+            for name in ("bid", "ask", "open", "high", "low", "close", "volume")
+        ],
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("latest_prices")
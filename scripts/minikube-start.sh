@@ -74,7 +74,7 @@ log "Docker now points to Minikube. Build images here to avoid a registry push."
 
 log "Applying Kubernetes manifests from: $K8S_DIR"
 
-for manifest in namespace.yaml configmap.yaml secret.yaml deployment.yaml service.yaml hpa.yaml; do
+for manifest in namespace.yaml configmap.yaml secret.yaml exports-pvc.yaml deployment.yaml service.yaml hpa.yaml; do
   FILE="$K8S_DIR/$manifest"
   if [ -f "$FILE" ]; then
     log "  kubectl apply -f $manifest"
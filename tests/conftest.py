@@ -6,8 +6,18 @@ import pytest_asyncio
 try:
     from httpx import AsyncClient, ASGITransport
     from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-    from app.database import Base, get_db
+    from app.config import settings
+    from app.database import (
+        Base,
+        get_db,
+        get_read_db,
+        get_read_session_factory,
+        get_session_factory,
+    )
     from app.main import app
+    from app.services import asset_service, latest_prices, row_counts
+    from app.tasks.export_executor import export_executor
+    from app.tasks.job_store import DatabaseJobStore, get_job_store
     _APP_AVAILABLE = True
 except ImportError:
     _APP_AVAILABLE = False
@@ -21,6 +31,15 @@ def anyio_backend():
 
 
 if _APP_AVAILABLE:
+    @pytest.fixture(autouse=True)
+    def clear_caches(tmp_path, monkeypatch):
+        # Each test gets a fresh database, so ids repeat; cached totals and exports must not leak.
+        row_counts.count_cache.clear()
+        asset_service.instrument_cache.clear()
+        latest_prices.snapshot.clear()
+        monkeypatch.setattr(settings, "ASYNC_EXPORT_DIR", str(tmp_path / "exports"))
+        yield
+
     @pytest_asyncio.fixture(scope="function")
     async def db_engine():
         engine = create_async_engine(DATABASE_URL, echo=False)
@@ -46,6 +65,14 @@ if _APP_AVAILABLE:
                 yield session
 
         app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_read_db] = override_get_db
+        app.dependency_overrides[get_session_factory] = lambda: session_factory
+        app.dependency_overrides[get_read_session_factory] = lambda: session_factory
+        job_store = DatabaseJobStore(session_factory)
+        app.dependency_overrides[get_job_store] = lambda: job_store
         async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
             yield ac
+        # Let queued exports finish before the engine is disposed.
+        await export_executor.join()
+        await export_executor.stop()
         app.dependency_overrides.clear()
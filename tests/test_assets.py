@@ -64,3 +64,56 @@ async def test_delete_asset(client):
     asset_id = create.json()["id"]
     resp = await client.delete(f"/assets/{asset_id}")
     assert resp.status_code == 204
+
+
+@pytest.mark.anyio
+async def test_instrument_lookups_are_cached_and_invalidated(client):
+    create = await client.post(
+        "/assets", json={"symbol": "XAGUSD", "name": "Silver", "asset_type": "COMMODITY"}
+    )
+    asset_id = create.json()["id"]
+
+    async def stats():
+        return (await client.get("/health/caches")).json()["instruments"]
+
+    await client.get(f"/assets/{asset_id}")
+    before = await stats()
+    resp = await client.get(f"/assets/{asset_id}")
+    after = await stats()
+    assert resp.json()["symbol"] == "XAGUSD"
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"]
+
+    await client.put(f"/assets/{asset_id}", json={"name": "Silver spot"})
+    assert (await client.get(f"/assets/{asset_id}")).json()["name"] == "Silver spot"
+
+    total = (await client.get("/assets")).json()["total"]
+    await client.post(
+        "/assets", json={"symbol": "XPTUSD", "name": "Platinum", "asset_type": "COMMODITY"}
+    )
+    assert (await client.get("/assets")).json()["total"] == total + 1
+
+    await client.delete(f"/assets/{asset_id}")
+    assert (await client.get(f"/assets/{asset_id}")).status_code == 404
+    assert (await client.get("/assets")).json()["total"] == total
+
+
+@pytest.mark.anyio
+async def test_conditional_asset_requests(client):
+    create = await client.post(
+        "/assets", json={"symbol": "NGUSD", "name": "Natural gas", "asset_type": "COMMODITY"}
+    )
+    asset_id = create.json()["id"]
+    first = await client.get(f"/assets/{asset_id}")
+    etag = first.headers["etag"]
+    resp = await client.get(f"/assets/{asset_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+    listing = await client.get("/assets")
+    resp = await client.get("/assets", headers={"If-None-Match": listing.headers["etag"]})
+    assert resp.status_code == 304
+
+    await client.put(f"/assets/{asset_id}", json={"name": "Henry Hub gas"})
+    resp = await client.get(f"/assets/{asset_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()["name"] == "Henry Hub gas"
@@ -39,3 +39,319 @@ async def test_export_status(client):
     resp = await client.get(f"/prices/export/{job_id}/status")
     assert resp.status_code == 200
     assert "status" in resp.json()
+
+
+@pytest.mark.anyio
+async def test_export_tick_streams_to_file(client, tmp_path, monkeypatch):
+    import io
+
+    from app.config import settings
+    from app.tasks.export_executor import export_executor
+
+    monkeypatch.setattr(settings, "ASYNC_EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "STREAM_BATCH_SIZE", 2)
+    create = await client.post(
+        "/assets", json={"symbol": "NZDJPY", "name": "NZD/JPY", "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+    lines = [f"2024-01-01 00:0{i}:00,90.0{i},90.1{i}" for i in range(5)]
+    csv_content = "timestamp,bid,ask\n" + "\n".join(lines) + "\n"
+    files = {"file": ("test.csv", io.BytesIO(csv_content.encode()), "text/csv")}
+    await client.post(
+        "/prices/tick/upload", files=files, data={"instrument_id": str(instrument_id)}
+    )
+
+    export = await client.post(f"/prices/tick/{instrument_id}/export")
+    job_id = export.json()["job_id"]
+    await export_executor.join()
+    status = (await client.get(f"/prices/export/{job_id}/status")).json()
+    assert status["status"] == "completed"
+    assert status["rows_written"] == 5
+
+    resp = await client.get(f"/prices/export/{job_id}/download")
+    assert resp.status_code == 200
+    assert len(resp.content) == status["bytes_written"]
+    assert resp.text.splitlines()[0] == "id,instrument_id,timestamp,bid,ask,volume"
+    assert len(resp.text.splitlines()) == 6
+
+
+@pytest.mark.anyio
+async def test_export_queue_full_returns_503(client, monkeypatch):
+    from app.tasks.export_executor import ExportQueueFullError, export_executor
+
+    def full(*args):
+        raise ExportQueueFullError("Export queue is full")
+
+    monkeypatch.setattr(export_executor, "submit", full)
+    create = await client.post(
+        "/assets", json={"symbol": "CADJPY", "name": "CAD/JPY", "asset_type": "CURRENCY"}
+    )
+    resp = await client.post(f"/prices/tick/{create.json()['id']}/export")
+    assert resp.status_code == 503
+
+
+@pytest.mark.anyio
+async def test_export_executor_bounds_concurrency():
+    import asyncio
+
+    from app.tasks.export_executor import ExportExecutor, ExportQueueFullError
+
+    executor = ExportExecutor(workers=2, max_queue_size=3)
+    running, peak = 0, 0
+    release = asyncio.Event()
+
+    async def job():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await release.wait()
+        running -= 1
+
+    for _ in range(3):
+        executor.submit(job)
+    await asyncio.sleep(0)
+    # Two jobs are running, one is queued; the queue has room for two more.
+    executor.submit(job)
+    executor.submit(job)
+    with pytest.raises(ExportQueueFullError):
+        executor.submit(job)
+    release.set()
+    await executor.join()
+    await executor.stop()
+    assert peak == 2
+
+
+@pytest.mark.anyio
+async def test_redis_job_store_round_trip():
+    import fakeredis.aioredis
+
+    from app.tasks.job_store import RedisJobStore, new_job
+
+    client = fakeredis.aioredis.FakeRedis()
+    store = RedisJobStore(client, ttl_seconds=60)
+    await store.create("abc", new_job("pending"))
+    await store.update("abc", status="completed", file_path="/tmp/abc.csv", rows_written=7)
+    job = await store.get("abc")
+    assert job["status"] == "completed"
+    assert job["file_path"] == "/tmp/abc.csv"
+    assert job["rows_written"] == 7
+    assert job["error"] is None
+    assert 0 < await client.ttl("export_job:abc") <= 60
+    assert await store.get("missing") is None
+
+
+async def _export_fixture(client, symbol):
+    import io
+
+    create = await client.post(
+        "/assets", json={"symbol": symbol, "name": symbol, "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+    lines = [f"2024-01-01 00:0{i}:00,1.0{i},1.1{i}" for i in range(3)]
+    files = {"file": ("t.csv", io.BytesIO(("timestamp,bid,ask\n" + "\n".join(lines)).encode()))}
+    await client.post(
+        "/prices/tick/upload", files=files, data={"instrument_id": str(instrument_id)}
+    )
+    return instrument_id
+
+
+@pytest.mark.anyio
+async def test_identical_exports_share_one_job(client):
+    from app.tasks.export_executor import export_executor
+
+    instrument_id = await _export_fixture(client, "EURNOK")
+    first = await client.post(f"/prices/tick/{instrument_id}/export")
+    second = await client.post(f"/prices/tick/{instrument_id}/export")
+    other = await client.post(
+        f"/prices/tick/{instrument_id}/export", params={"from_date": "2024-01-01T00:01:00"}
+    )
+    assert second.json()["job_id"] == first.json()["job_id"]
+    assert other.json()["job_id"] != first.json()["job_id"]
+    await export_executor.join()
+
+
+@pytest.mark.anyio
+async def test_completed_export_is_cached_until_ingest(client):
+    import io
+
+    from app.tasks.export_executor import export_executor
+
+    instrument_id = await _export_fixture(client, "EURSEK")
+    first = await client.post(f"/prices/tick/{instrument_id}/export")
+    await export_executor.join()
+
+    cached = await client.post(f"/prices/tick/{instrument_id}/export")
+    assert cached.json()["status"] == "completed"
+    assert cached.json()["message"] == "Export served from cache"
+    body = (await client.get(f"/prices/export/{cached.json()['job_id']}/download")).text
+    assert body == (await client.get(f"/prices/export/{first.json()['job_id']}/download")).text
+    assert len(body.splitlines()) == 4
+
+    files = {"file": ("t.csv", io.BytesIO(b"timestamp,bid,ask\n2024-01-02 00:00:00,1.2,1.3\n"))}
+    await client.post(
+        "/prices/tick/upload", files=files, data={"instrument_id": str(instrument_id)}
+    )
+    fresh = await client.post(f"/prices/tick/{instrument_id}/export")
+    assert fresh.json()["status"] == "pending"
+    await export_executor.join()
+    body = (await client.get(f"/prices/export/{fresh.json()['job_id']}/download")).text
+    assert len(body.splitlines()) == 5
+
+
+def test_export_cache_evicts_least_recently_used(monkeypatch, tmp_path):
+    import os
+
+    from app.config import settings
+    from app.services import export_cache
+
+    monkeypatch.setattr(settings, "EXPORT_CACHE_MAX_BYTES", 25)
+    monkeypatch.setattr(settings, "EXPORT_CACHE_TTL_SECONDS", 10**10)
+    paths = []
+    for i, key in enumerate(("a", "b", "c")):
+        src = tmp_path / f"{key}.csv"
+        src.write_bytes(b"x" * 10)
+        paths.append(export_cache.store(1, key, str(src)))
+        os.utime(paths[-1], (1_000_000 + i, 1_000_000 + i))
+    export_cache.evict()
+    assert [os.path.exists(p) for p in paths] == [False, True, True]
+    assert export_cache.lookup(1, "b") == paths[1]
+    export_cache.invalidate_instrument(1)
+    assert export_cache.lookup(1, "c") is None
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("fmt", ["csv.gz", "csv.zst", "parquet", "arrow"])
+async def test_export_formats_round_trip(client, fmt):
+    import io
+
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    from app.tasks.export_executor import export_executor
+
+    instrument_id = await _export_fixture(client, "EURPLN")
+    export = await client.post(f"/prices/tick/{instrument_id}/export", params={"format": fmt})
+    await export_executor.join()
+    resp = await client.get(f"/prices/export/{export.json()['job_id']}/download")
+    assert resp.status_code == 200
+    assert resp.headers["content-disposition"].endswith(f'.{fmt}"')
+
+    if fmt == "parquet":
+        assert resp.headers["content-type"] == "application/vnd.apache.parquet"
+        table = pq.read_table(io.BytesIO(resp.content))
+    elif fmt == "arrow":
+        table = pa.ipc.open_stream(resp.content).read_all()
+    else:
+        codec = "gzip" if fmt == "csv.gz" else "zstd"
+        stream = pa.CompressedInputStream(pa.BufferReader(resp.content), codec)
+        table = pa_csv.read_csv(stream)
+    assert table.num_rows == 3
+    assert table.column("bid").to_pylist() == [1.0, 1.01, 1.02]
+
+
+@pytest.mark.anyio
+async def test_download_supports_range_requests(client):
+    from app.tasks.export_executor import export_executor
+
+    instrument_id = await _export_fixture(client, "EURHUF")
+    export = await client.post(f"/prices/tick/{instrument_id}/export")
+    await export_executor.join()
+    url = f"/prices/export/{export.json()['job_id']}/download"
+    full = await client.get(url)
+    assert full.headers["accept-ranges"] == "bytes"
+    size = len(full.content)
+
+    head = await client.get(url, headers={"range": "bytes=0-9"})
+    assert head.status_code == 206
+    assert head.headers["content-range"] == f"bytes 0-9/{size}"
+    rest = await client.get(url, headers={"range": "bytes=10-"})
+    assert head.content + rest.content == full.content
+    tail = await client.get(url, headers={"range": "bytes=-5"})
+    assert tail.content == full.content[-5:]
+
+    beyond = await client.get(url, headers={"range": f"bytes={size}-"})
+    assert beyond.status_code == 416
+    assert beyond.headers["content-range"] == f"bytes */{size}"
+
+
+def test_parquet_writer_buffers_full_row_groups(tmp_path):
+    from datetime import datetime, timezone
+
+    import pyarrow.parquet as pq
+
+    from app.schemas.price import ExportFormat
+    from app.services.columnar import TICK_SCHEMA
+    from app.services.export_formats import ExportWriter
+
+    ts = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    path = str(tmp_path / "t.parquet")
+    writer = ExportWriter(path, TICK_SCHEMA, ExportFormat.PARQUET, row_group_size=4)
+    for batch in (3, 3, 1):
+        writer.write([(i, 1, ts, 1.0, 1.1, None) for i in range(batch)])
+    writer.close()
+    meta = pq.ParquetFile(path).metadata
+    assert [meta.row_group(i).num_rows for i in range(meta.num_row_groups)] == [4, 3]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("backend", ["memory", "database", "redis"])
+async def test_job_store_claim_is_atomic_and_replaces_stale_jobs(backend, tmp_path, monkeypatch):
+    import asyncio
+
+    import fakeredis.aioredis
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.config import settings
+    from app.database import Base
+    from app.tasks.job_store import (
+        DatabaseJobStore,
+        MemoryJobStore,
+        RedisJobStore,
+        STALE_ERROR,
+        new_job,
+    )
+
+    # A file database: the in-memory test engine shares one connection between sessions,
+    # so one session's rollback would undo another's insert.
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    store = {
+        "memory": lambda: MemoryJobStore(),
+        "database": lambda: DatabaseJobStore(async_sessionmaker(engine)),
+        "redis": lambda: RedisJobStore(fakeredis.aioredis.FakeRedis(), ttl_seconds=60),
+    }[backend]()
+    claims = await asyncio.gather(
+        *[store.claim("key", f"job-{i}", new_job("pending")) for i in range(20)]
+    )
+    assert len(set(claims)) == 1
+    winner = claims[0]
+
+    await store.update(winner, status="processing")
+    assert await store.claim("key", "late", new_job("pending")) == winner
+
+    # No heartbeat within the stale window: the next claim takes the key over.
+    monkeypatch.setattr(settings, "EXPORT_JOB_STALE_SECONDS", -1)
+    assert await store.claim("key", "fresh", new_job("pending")) == "fresh"
+    lost = await store.get(winner)
+    assert (lost["status"], lost["error"]) == ("failed", STALE_ERROR)
+    await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_issued_download_survives_cache_invalidation(client):
+    from app.services import export_cache
+    from app.tasks.export_executor import export_executor
+
+    instrument_id = await _export_fixture(client, "EURPLN")
+    first = await client.post(f"/prices/tick/{instrument_id}/export")
+    await export_executor.join()
+    cached = await client.post(f"/prices/tick/{instrument_id}/export")
+    assert cached.json()["message"] == "Export served from cache"
+
+    export_cache.invalidate_instrument(instrument_id)
+    for job_id in (first.json()["job_id"], cached.json()["job_id"]):
+        resp = await client.get(f"/prices/export/{job_id}/download")
+        assert resp.status_code == 200
+        assert len(resp.text.splitlines()) == 4
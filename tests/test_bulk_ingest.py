@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from sqlalchemy import func, select
+
+from app.models.asset import AssetType, Instrument
+from app.models.price import TickData
+from app.schemas.price import TotalMode
+from app.services import price_service, row_counts
+
+
+async def _instrument(db_session, symbol="EURUSD"):
+    instrument = Instrument(symbol=symbol, name=symbol, asset_type=AssetType.CURRENCY)
+    db_session.add(instrument)
+    await db_session.commit()
+    return instrument.id
+
+
+@pytest.mark.anyio
+async def test_bulk_insert_tick_data_chunks(db_session):
+    instrument_id = await _instrument(db_session)
+    frame = pd.DataFrame(
+        {
+            "instrument_id": instrument_id,
+            "timestamp": pd.date_range("2024-01-01", periods=25, freq="s"),
+            "bid": [1.1 + i * 1e-5 for i in range(25)],
+            "ask": [1.1002 + i * 1e-5 for i in range(25)],
+            "volume": float("nan"),
+        }
+    )
+    stats = await price_service.bulk_insert_tick_data(db_session, frame, chunk_size=10)
+    assert stats.rows == 25
+    assert stats.chunks == 3
+    assert stats.method == "insert"
+    count = await db_session.execute(select(func.count()).select_from(TickData))
+    assert count.scalar_one() == 25
+    volumes = await db_session.execute(select(TickData.volume).where(TickData.volume.is_(None)))
+    assert len(volumes.all()) == 25
+
+
+@pytest.mark.anyio
+async def test_bulk_insert_empty(db_session):
+    stats = await price_service.bulk_insert_tick_data(db_session, pd.DataFrame())
+    assert stats.rows == 0
+    assert stats.chunks == 0
+
+
+@pytest.mark.anyio
+async def test_summary_count_seeded_with_existing_rows(db_session):
+    instrument_id = await _instrument(db_session, "GBPUSD")
+    # Rows stored before the instrument had a summary row.
+    db_session.add_all(
+        TickData(instrument_id=instrument_id, timestamp=datetime(2023, 1, 1, 0, i), bid=1, ask=1)
+        for i in range(3)
+    )
+    await db_session.commit()
+    frame = pd.DataFrame(
+        {
+            "instrument_id": instrument_id,
+            "timestamp": pd.date_range("2024-01-01", periods=2, freq="s"),
+            "bid": [1.1, 1.2],
+            "ask": [1.3, 1.4],
+            "volume": float("nan"),
+        }
+    )
+    await price_service.bulk_insert_tick_data(db_session, frame)
+    later = frame.assign(timestamp=frame["timestamp"] + pd.Timedelta(hours=1))
+    await price_service.bulk_insert_tick_data(db_session, later)
+
+    total, mode = await row_counts.count_rows(
+        db_session,
+        TickData.__table__,
+        instrument_id,
+        select(func.count()).select_from(TickData),
+        select(TickData),
+        (None, None),
+        TotalMode.ESTIMATED,
+    )
+    assert (total, mode) == (7, TotalMode.ESTIMATED)
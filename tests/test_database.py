@@ -0,0 +1,104 @@
+import pytest
+
+
+def test_pgbouncer_mode_disables_prepared_statement_caches(monkeypatch):
+    from app import database
+    from app.config import settings
+
+    url = "postgresql+asyncpg://user:secret@db/priceserver"
+    direct = database._engine_options(url)
+    assert direct["pool_pre_ping"] is True
+    assert direct["connect_args"] == {"server_settings": {"statement_timeout": "30000"}}
+    replica = database._engine_options(url, read_only=True)["connect_args"]
+    assert replica["server_settings"]["default_transaction_read_only"] == "on"
+
+    monkeypatch.setattr(settings, "DB_POOLER", "pgbouncer")
+    pooled = database._engine_options(url)["connect_args"]
+    assert pooled["statement_cache_size"] == 0
+    assert pooled["prepared_statement_cache_size"] == 0
+    assert pooled["command_timeout"] == 30
+    assert "server_settings" not in pooled
+
+    assert database._engine_options("sqlite+aiosqlite:///:memory:") == {"echo": settings.DEBUG}
+
+
+@pytest.mark.anyio
+async def test_timed_pool_counts_checkouts_and_timeouts(tmp_path):
+    from sqlalchemy import text
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.database import TimedQueuePool, pool_stats
+
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    checkouts, timeouts = pool_stats.checkouts, pool_stats.timeouts
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        with pytest.raises(PoolTimeoutError):
+            async with engine.connect():
+                pass
+    await engine.dispose()
+    assert pool_stats.checkouts == checkouts + 1
+    assert pool_stats.timeouts == timeouts + 1
+    assert pool_stats.wait_seconds_max >= 0
+
+
+@pytest.mark.anyio
+async def test_db_pool_endpoint(client):
+    resp = await client.get("/health/db")
+    assert resp.status_code == 200
+    assert {"checkouts", "timeouts", "wait_seconds_total"} <= resp.json().keys()
+
+
+@pytest.mark.anyio
+async def test_reads_use_replica_outside_read_your_writes_window(client, monkeypatch):
+    import io
+
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.config import settings
+    from app.database import Base, get_read_db
+    from app.main import app
+    from app.services import asset_service
+
+    # An empty replica stands in for one that has not caught up yet.
+    replica = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with replica.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    replica_sessions = async_sessionmaker(replica, expire_on_commit=False)
+
+    async def replica_db():
+        async with replica_sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_read_db] = replica_db
+    try:
+        create = await client.post(
+            "/assets", json={"symbol": "ETCUSD", "name": "ETC/USD", "asset_type": "CRYPTO"}
+        )
+        instrument_id = create.json()["id"]
+        csv_content = "timestamp,bid,ask\n2024-01-01 00:00:00,20,21\n"
+        await client.post(
+            "/prices/tick/upload",
+            files={"file": ("t.csv", io.BytesIO(csv_content.encode()), "text/csv")},
+            data={"instrument_id": str(instrument_id)},
+        )
+
+        # Just written: reads stay on the primary.
+        assert (await client.get(f"/assets/{instrument_id}")).status_code == 200
+        ticks = await client.get(f"/prices/tick/{instrument_id}")
+        assert len(ticks.json()["items"]) == 1
+
+        monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", 0)
+        asset_service.instrument_cache.clear()
+        assert (await client.get(f"/assets/{instrument_id}")).status_code == 404
+        ticks = await client.get(f"/prices/tick/{instrument_id}")
+        assert ticks.json()["items"] == []
+    finally:
+        await replica.dispose()
@@ -0,0 +1,105 @@
+import io
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.config import settings
+from app.services import fixed_point
+
+
+def test_encode_decode_round_trip():
+    frame = pd.DataFrame(
+        {
+            "instrument_id": [1, 1],
+            "timestamp": pd.to_datetime(
+                ["2024-01-01 00:00:00.123456", "2024-06-30 23:59:59.000000"]
+            ),
+            "bid": [1.10001, 42000.12345678],
+            "ask": [1.10003, 42000.5],
+            "volume": [np.nan, 2.5],
+        }
+    )
+    encoded = fixed_point.encode_frame(frame, ("bid", "ask"), scale=8)
+    assert encoded["timestamp"].tolist() == [1704067200123456, 1719791999000000]
+    assert encoded["bid"].tolist() == [110001000, 4200012345678]
+    assert encoded["volume"].isna().tolist() == [True, False]
+
+    fields = ("timestamp", "bid", "ask", "volume")
+    rows = list(encoded[list(fields)].astype(object).itertuples(False))
+    rows = [tuple(None if pd.isna(v) else v for v in row) for row in rows]
+    decoded = fixed_point.decode_rows(rows, fields, ("bid", "ask"), 8)
+    assert decoded[0].timestamp == datetime(2024, 1, 1, 0, 0, 0, 123456, tzinfo=timezone.utc)
+    assert decoded[1].bid == pytest.approx(42000.12345678, abs=1e-9)
+    assert decoded[0].volume is None
+    assert decoded[1].volume == 2.5
+
+
+@pytest.mark.parametrize(
+    "column, values", [("bid", [2e11, 1.1]), ("volume", [1.0, 1.5e11])]
+)
+def test_encode_rejects_values_beyond_bigint(column, values):
+    frame = pd.DataFrame(
+        {
+            "instrument_id": [1, 1],
+            "timestamp": pd.to_datetime(["2024-01-01", "2024-01-02"]),
+            "bid": [1.1, 1.1],
+            "ask": [1.1, 1.1],
+            "volume": [1.0, 1.0],
+        }
+    )
+    frame[column] = values
+    with pytest.raises(ValueError, match=column):
+        fixed_point.encode_frame(frame, ("bid", "ask"), scale=8)
+
+
+def test_to_epoch_us_treats_naive_as_utc():
+    assert fixed_point.to_epoch_us(datetime(1970, 1, 1, 0, 0, 1)) == 1_000_000
+    assert fixed_point.to_epoch_us(datetime(2024, 1, 1, tzinfo=timezone.utc)) == 1704067200000000
+
+
+@pytest.mark.anyio
+async def test_fixed_storage_end_to_end(client, monkeypatch):
+    monkeypatch.setattr(settings, "PRICE_STORAGE", "fixed")
+    create = await client.post(
+        "/assets",
+        json={"symbol": "EURUSDF", "name": "EUR/USD", "asset_type": "CURRENCY", "price_scale": 5},
+    )
+    assert create.json()["price_scale"] == 5
+    instrument_id = create.json()["id"]
+    lines = [f"2024-01-01 00:0{i}:00,1.1000{i},1.1001{i},{i}" for i in range(4)]
+    csv_content = "timestamp,bid,ask,volume\n" + "\n".join(lines) + "\n"
+    files = {"file": ("t.csv", io.BytesIO(csv_content.encode()), "text/csv")}
+    resp = await client.post(
+        "/prices/tick/upload", files=files, data={"instrument_id": str(instrument_id)}
+    )
+    assert resp.json()["inserted"] == 4
+
+    page = await client.get(
+        f"/prices/tick/{instrument_id}", params={"limit": 2, "from_date": "2024-01-01T00:01:00"}
+    )
+    body = page.json()
+    assert body["total"] == 3
+    assert [float(item["bid"]) for item in body["items"]] == [1.10001, 1.10002]
+    assert body["items"][0]["timestamp"].startswith("2024-01-01T00:01:00")
+
+    following = await client.get(
+        f"/prices/tick/{instrument_id}", params={"limit": 2, "cursor": body["next_cursor"]}
+    )
+    assert [float(item["ask"]) for item in following.json()["items"]] == [1.10013]
+
+    stream = await client.get(f"/prices/tick/{instrument_id}/stream")
+    assert len(stream.text.splitlines()) == 4
+    assert '"volume": 3.0' in stream.text.splitlines()[-1]
+
+    bars = await client.get(f"/prices/tick/{instrument_id}/bars", params={"timeframe": "M5"})
+    assert bars.status_code == 400
+
+    huge = "timestamp,bid,ask\n2024-01-02 00:00:00,200000000000000,1.1\n"
+    files = {"file": ("t.csv", io.BytesIO(huge.encode()), "text/csv")}
+    resp = await client.post(
+        "/prices/tick/upload", files=files, data={"instrument_id": str(instrument_id)}
+    )
+    assert resp.status_code == 400
+    assert "bid out of range" in resp.json()["detail"]
@@ -0,0 +1,60 @@
+import pytest
+
+
+def test_histogram_renders_cumulative_buckets():
+    from app.services.metrics import Histogram, _registry
+
+    histogram = Histogram("test_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    _registry.remove(histogram)
+    for value in (0.05, 0.5, 0.5, 3):
+        histogram.observe(value, '/a"b')
+    assert histogram.render()[2:] == [
+        'test_seconds_bucket{route="/a\\"b",le="0.1"} 1',
+        'test_seconds_bucket{route="/a\\"b",le="1"} 3',
+        'test_seconds_bucket{route="/a\\"b",le="+Inf"} 4',
+        'test_seconds_sum{route="/a\\"b"} 4.05',
+        'test_seconds_count{route="/a\\"b"} 4',
+    ]
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint_reports_routes_and_services(client):
+    from app.services import metrics
+
+    create = await client.post(
+        "/assets", json={"symbol": "LTCUSD", "name": "LTC/USD", "asset_type": "CRYPTO"}
+    )
+    instrument_id = create.json()["id"]
+    before = metrics.REQUEST_SECONDS.count("GET", "/assets/{instrument_id}", "200")
+    await client.get(f"/assets/{instrument_id}")
+    await client.get("/does-not-exist")
+    assert metrics.REQUEST_SECONDS.count("GET", "/assets/{instrument_id}", "200") == before + 1
+
+    resp = await client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = resp.text
+    assert 'route="/assets/{instrument_id}",status="200"' in body
+    assert 'route="unmatched",status="404"' in body
+    assert 'function="asset_service.get_instrument_by_id"' in body
+
+
+@pytest.mark.anyio
+async def test_ingest_and_parse_metrics(client):
+    import io
+
+    from app.services import metrics
+
+    create = await client.post(
+        "/assets", json={"symbol": "XRPUSD", "name": "XRP/USD", "asset_type": "CRYPTO"}
+    )
+    inserted = metrics.ROWS.value("tick", "inserted")
+    parses = metrics.PARSE_SECONDS.count("read_tick_csv")
+    csv_content = "timestamp,bid,ask\n2024-01-01 00:00:00,0.5,0.6\n2024-01-01 00:00:01,0.5,0.6\n"
+    await client.post(
+        "/prices/tick/upload",
+        files={"file": ("t.csv", io.BytesIO(csv_content.encode()), "text/csv")},
+        data={"instrument_id": str(create.json()["id"])},
+    )
+    assert metrics.ROWS.value("tick", "inserted") == inserted + 2
+    assert metrics.PARSE_SECONDS.count("read_tick_csv") == parses + 1
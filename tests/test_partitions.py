@@ -0,0 +1,40 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from app.services import partitions
+
+
+def test_partition_ddl_monthly_bounds():
+    (ddl,) = partitions.partition_ddl("tick_data", date(2024, 12, 1))
+    assert ddl == (
+        "CREATE TABLE IF NOT EXISTS tick_data_y2024m12 PARTITION OF tick_data "
+        "FOR VALUES FROM ('2024-12-01 00:00:00+00') TO ('2025-01-01 00:00:00+00')"
+    )
+
+
+def test_partition_ddl_hash_subpartitions():
+    ddl = partitions.partition_ddl("ohlc_data", date(2024, 1, 1), hash_modulus=4)
+    assert ddl[0].endswith("PARTITION BY HASH (instrument_id)")
+    assert len(ddl) == 5
+    assert "ohlc_data_y2024m01_h3 PARTITION OF ohlc_data_y2024m01" in ddl[4]
+    assert ddl[4].endswith("FOR VALUES WITH (MODULUS 4, REMAINDER 3)")
+
+
+def test_month_helpers():
+    assert partitions.add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert partitions.add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert partitions.month_range(date(2024, 11, 15), date(2025, 1, 1)) == [
+        date(2024, 11, 1),
+        date(2024, 12, 1),
+        date(2025, 1, 1),
+    ]
+
+
+@pytest.mark.anyio
+async def test_partitioning_is_noop_on_sqlite(db_session):
+    frame = pd.DataFrame({"timestamp": pd.to_datetime(["2024-01-31 23:59", "2024-02-01 00:00"])})
+    await partitions.ensure_for_frame(db_session, "tick_data", frame)
+    detached = await partitions.detach_partitions_before(db_session, "tick_data", date(2030, 1, 1))
+    assert detached == []
@@ -74,3 +74,828 @@ async def test_get_ohlc_data(client):
     assert resp.status_code == 200
     data = resp.json()
     assert data["total"] >= 1
+
+
+@pytest.mark.anyio
+async def test_upload_tick_data_missing_column(client):
+    create = await client.post(
+        "/assets", json={"symbol": "AUDUSD", "name": "AUD/USD", "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+
+    csv_content = "timestamp,bid\n2024-01-01 00:00:00,0.68000\n"
+    files = {"file": ("test.csv", io.BytesIO(csv_content.encode()), "text/csv")}
+    resp = await client.post(
+        "/prices/tick/upload", files=files, data={"instrument_id": str(instrument_id)}
+    )
+    assert resp.status_code == 400
+    assert "ask" in resp.json()["detail"]
+
+
+@pytest.mark.anyio
+async def test_upload_tick_data_without_volume(client):
+    create = await client.post(
+        "/assets", json={"symbol": "NZDUSD", "name": "NZD/USD", "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+
+    csv_content = "timestamp,bid,ask\n2024-01-01 00:00:00,0.61000,0.61002\n"
+    files = {"file": ("test.csv", io.BytesIO(csv_content.encode()), "text/csv")}
+    resp = await client.post(
+        "/prices/tick/upload", files=files, data={"instrument_id": str(instrument_id)}
+    )
+    assert resp.status_code == 200
+
+    resp = await client.get(f"/prices/tick/{instrument_id}")
+    assert resp.json()["items"][0]["volume"] is None
+
+
+@pytest.mark.anyio
+async def test_upload_tick_data_stream_chunks(client, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "UPLOAD_STREAM_CHUNK_BYTES", 64)
+    create = await client.post(
+        "/assets", json={"symbol": "USDCAD", "name": "USD/CAD", "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+
+    lines = [f"2024-01-01 00:{i:02d}:00,1.3500{i % 10},1.3501{i % 10},100" for i in range(20)]
+    csv_content = "timestamp,bid,ask,volume\n" + "\n".join(lines) + "\n"
+    files = {"file": ("test.csv", io.BytesIO(csv_content.encode()), "text/csv")}
+    resp = await client.post(
+        "/prices/tick/upload/stream", files=files, data={"instrument_id": str(instrument_id)}
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["inserted"] == 20
+    assert len(body["chunks"]) > 1
+    assert sum(chunk["rows"] for chunk in body["chunks"]) == 20
+
+    resp = await client.get(f"/prices/tick/{instrument_id}")
+    assert resp.json()["total"] == 20
+
+
+@pytest.mark.anyio
+async def test_upload_ohlc_data_stream_raw_body(client):
+    create = await client.post(
+        "/assets", json={"symbol": "SOLUSD", "name": "SOL/USD", "asset_type": "CRYPTO"}
+    )
+    instrument_id = create.json()["id"]
+
+    csv_content = "timestamp,open,high,low,close\n2024-01-01 00:00:00,100,110,90,105\n"
+    resp = await client.post(
+        "/prices/ohlc/upload/stream",
+        content=csv_content.encode(),
+        headers={"content-type": "text/csv"},
+        params={"instrument_id": instrument_id, "timeframe": "H1"},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["inserted"] == 1
+
+
+@pytest.mark.anyio
+async def test_upload_stream_enforces_size_limit(client, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE_MB", 0)
+    csv_content = "timestamp,bid,ask\n2024-01-01 00:00:00,1.1,1.2\n"
+    resp = await client.post(
+        "/prices/tick/upload/stream",
+        content=csv_content.encode(),
+        headers={"content-type": "text/csv"},
+        params={"instrument_id": 1},
+    )
+    assert resp.status_code == 413
+
+
+@pytest.mark.anyio
+async def test_get_tick_data_cursor_pagination(client):
+    create = await client.post(
+        "/assets", json={"symbol": "EURJPY", "name": "EUR/JPY", "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+
+    lines = [f"2024-01-01 00:0{i}:00,160.0{i},160.1{i}" for i in range(5)]
+    csv_content = "timestamp,bid,ask\n" + "\n".join(lines) + "\n"
+    files = {"file": ("test.csv", io.BytesIO(csv_content.encode()), "text/csv")}
+    await client.post(
+        "/prices/tick/upload", files=files, data={"instrument_id": str(instrument_id)}
+    )
+
+    resp = await client.get(f"/prices/tick/{instrument_id}", params={"limit": 2})
+    pages = [resp.json()]
+    while pages[-1]["next_cursor"]:
+        resp = await client.get(
+            f"/prices/tick/{instrument_id}",
+            params={"limit": 2, "cursor": pages[-1]["next_cursor"]},
+        )
+        assert resp.status_code == 200
+        pages.append(resp.json())
+
+    timestamps = [item["timestamp"] for page in pages for item in page["items"]]
+    assert len(timestamps) == 5
+    assert timestamps == sorted(timestamps)
+    assert [len(page["items"]) for page in pages] == [2, 2, 1]
+
+
+@pytest.mark.anyio
+async def test_get_ohlc_data_invalid_cursor(client):
+    resp = await client.get("/prices/ohlc/1", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+
+async def _upload_ticks(client, instrument_id, rows, start=0):
+    lines = [f"2024-01-01 00:{i:02d}:00,1.1{i},1.2{i}" for i in range(start, start + rows)]
+    csv_content = "timestamp,bid,ask\n" + "\n".join(lines) + "\n"
+    files = {"file": ("test.csv", io.BytesIO(csv_content.encode()), "text/csv")}
+    await client.post(
+        "/prices/tick/upload", files=files, data={"instrument_id": str(instrument_id)}
+    )
+
+
+@pytest.mark.anyio
+async def test_get_tick_data_total_modes(client):
+    create = await client.post(
+        "/assets", json={"symbol": "CHFJPY", "name": "CHF/JPY", "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+    await _upload_ticks(client, instrument_id, 3)
+
+    resp = await client.get(f"/prices/tick/{instrument_id}", params={"include_total": False})
+    assert resp.json()["total"] is None
+    assert resp.json()["total_mode"] is None
+
+    resp = await client.get(f"/prices/tick/{instrument_id}", params={"total_mode": "estimated"})
+    assert resp.json()["total"] == 3
+    assert resp.json()["total_mode"] == "estimated"
+
+    resp = await client.get(f"/prices/tick/{instrument_id}")
+    assert resp.json()["total"] == 3
+    assert resp.json()["total_mode"] == "exact"
+
+
+@pytest.mark.anyio
+async def test_get_tick_data_cached_total_invalidated_on_ingest(client):
+    create = await client.post(
+        "/assets", json={"symbol": "GBPJPY", "name": "GBP/JPY", "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+    await _upload_ticks(client, instrument_id, 2)
+    resp = await client.get(f"/prices/tick/{instrument_id}")
+    assert resp.json()["total"] == 2
+
+    await _upload_ticks(client, instrument_id, 3, start=2)
+    resp = await client.get(f"/prices/tick/{instrument_id}")
+    assert resp.json()["total"] == 5
+
+
+@pytest.mark.anyio
+async def test_get_tick_data_arrow_and_parquet(client):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    create = await client.post(
+        "/assets", json={"symbol": "AUDJPY", "name": "AUD/JPY", "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+    await _upload_ticks(client, instrument_id, 3)
+
+    resp = await client.get(
+        f"/prices/tick/{instrument_id}",
+        params={"limit": 2},
+        headers={"accept": "application/vnd.apache.arrow.stream"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    assert "x-next-cursor" in resp.headers
+    table = pa.ipc.open_stream(resp.content).read_all()
+    assert table.num_rows == 2
+    assert table.column("bid").to_pylist() == [1.10, 1.11]
+
+    resp = await client.get(
+        f"/prices/tick/{instrument_id}", headers={"accept": "application/vnd.apache.parquet"}
+    )
+    assert resp.status_code == 200
+    table = pq.read_table(io.BytesIO(resp.content))
+    assert table.num_rows == 3
+
+
+@pytest.mark.anyio
+async def test_get_ohlc_data_arrow(client):
+    import pyarrow as pa
+
+    create = await client.post(
+        "/assets", json={"symbol": "ADAUSD", "name": "ADA/USD", "asset_type": "CRYPTO"}
+    )
+    instrument_id = create.json()["id"]
+    csv_content = "timestamp,open,high,low,close\n2024-01-01 00:00:00,0.5,0.6,0.4,0.55\n"
+    files = {"file": ("test.csv", io.BytesIO(csv_content.encode()), "text/csv")}
+    await client.post(
+        "/prices/ohlc/upload",
+        files=files,
+        data={"instrument_id": str(instrument_id), "timeframe": "H1"},
+    )
+
+    resp = await client.get(
+        f"/prices/ohlc/{instrument_id}", headers={"accept": "application/vnd.apache.arrow.stream"}
+    )
+    table = pa.ipc.open_stream(resp.content).read_all()
+    assert table.column("timeframe").to_pylist() == ["H1"]
+    assert table.column("volume").to_pylist() == [None]
+
+
+@pytest.mark.anyio
+async def test_stream_tick_data_ndjson_and_csv(client, monkeypatch):
+    import json
+
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "STREAM_BATCH_SIZE", 2)
+    create = await client.post(
+        "/assets", json={"symbol": "EURCHF", "name": "EUR/CHF", "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+    await _upload_ticks(client, instrument_id, 5)
+
+    resp = await client.get(f"/prices/tick/{instrument_id}/stream")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert len(rows) == 5
+    assert rows[0]["bid"] == 1.1
+
+    resp = await client.get(f"/prices/tick/{instrument_id}/stream", params={"format": "csv"})
+    lines = resp.text.splitlines()
+    assert lines[0] == "id,instrument_id,timestamp,bid,ask,volume"
+    assert len(lines) == 6
+
+
+async def _upload_tick_rows(client, instrument_id, rows):
+    csv_content = "timestamp,bid,ask,volume\n" + "\n".join(rows) + "\n"
+    files = {"file": ("test.csv", io.BytesIO(csv_content.encode()), "text/csv")}
+    await client.post(
+        "/prices/tick/upload", files=files, data={"instrument_id": str(instrument_id)}
+    )
+
+
+@pytest.mark.anyio
+async def test_tick_bars_resampled_in_database(client):
+    create = await client.post(
+        "/assets", json={"symbol": "EURCZK", "name": "EUR/CZK", "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+    await _upload_tick_rows(
+        client,
+        instrument_id,
+        [
+            "2024-01-01 00:00:10,1.0,1.2,1",
+            "2024-01-01 00:03:00,1.4,1.6,2",
+            "2024-01-01 00:04:59,0.8,1.0,3",
+            "2024-01-01 00:01:00,1.1,1.3,4",
+            "2024-01-01 00:07:00,2.0,2.2,5",
+        ],
+    )
+    resp = await client.get(
+        f"/prices/tick/{instrument_id}/bars", params={"timeframe": "M5", "side": "bid"}
+    )
+    assert resp.status_code == 200
+    bars = resp.json()["items"]
+    assert [bar["timestamp"][:19] for bar in bars] == ["2024-01-01T00:00:00", "2024-01-01T00:05:00"]
+    first = {k: float(v) for k, v in bars[0].items() if k not in ("timestamp", "tick_count")}
+    assert first == {"open": 1.0, "high": 1.4, "low": 0.8, "close": 0.8, "volume": 10.0}
+    assert bars[0]["tick_count"] == 4
+    assert float(bars[1]["open"]) == float(bars[1]["close"]) == 2.0
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "timeframe, params, expected",
+    [
+        ("M1", {}, 4),
+        ("M15", {}, 2),
+        ("M30", {}, 2),
+        ("H1", {}, 2),
+        ("H4", {}, 2),
+        ("D1", {}, 2),
+        ("W1", {}, 2),
+        ("MN1", {}, 2),
+        ("CUSTOM", {"interval_seconds": 120}, 3),
+    ],
+)
+async def test_tick_bars_every_timeframe(client, timeframe, params, expected):
+    create = await client.post(
+        "/assets", json={"symbol": "EURDKK", "name": "EUR/DKK", "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+    # 2024-01-07 is a Sunday and 2024-01-31 ends the month, so W1 and MN1 both split.
+    await _upload_tick_rows(
+        client,
+        instrument_id,
+        [
+            "2024-01-07 23:58:00,1.0,1.1,1",
+            "2024-01-07 23:59:30,1.0,1.1,1",
+            "2024-02-01 00:00:00,1.0,1.1,1",
+            "2024-02-01 00:02:00,1.0,1.1,1",
+        ],
+    )
+    resp = await client.get(
+        f"/prices/tick/{instrument_id}/bars", params={"timeframe": timeframe, **params}
+    )
+    assert resp.status_code == 200
+    bars = resp.json()["items"]
+    assert len(bars) == expected
+    assert sum(bar["tick_count"] for bar in bars) == 4
+    if timeframe == "W1":
+        assert bars[0]["timestamp"].startswith("2024-01-01")
+    if timeframe == "MN1":
+        assert bars[1]["timestamp"].startswith("2024-02-01")
+
+
+@pytest.mark.anyio
+async def test_tick_bars_custom_requires_interval(client):
+    resp = await client.get("/prices/tick/1/bars", params={"timeframe": "CUSTOM"})
+    assert resp.status_code == 400
+
+
+async def _upload_m1(client, instrument_id, rows):
+    csv_content = "timestamp,open,high,low,close,volume\n" + "\n".join(rows) + "\n"
+    files = {"file": ("m1.csv", io.BytesIO(csv_content.encode()), "text/csv")}
+    data = {"instrument_id": str(instrument_id), "timeframe": "M1", "price_type": "OHLC"}
+    resp = await client.post("/prices/ohlc/upload", files=files, data=data)
+    assert resp.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_m1_ingest_maintains_rollups(client):
+    create = await client.post(
+        "/assets", json={"symbol": "SOLUSD", "name": "SOL/USD", "asset_type": "CRYPTO"}
+    )
+    instrument_id = create.json()["id"]
+    await _upload_m1(
+        client,
+        instrument_id,
+        [
+            "2024-01-01 00:00:00,10,12,9,11,1",
+            "2024-01-01 00:59:00,11,13,10,12,2",
+            "2024-01-01 01:00:00,12,12,8,9,3",
+        ],
+    )
+
+    async def bars(timeframe):
+        resp = await client.get(
+            f"/prices/ohlc/{instrument_id}", params={"timeframe": timeframe}
+        )
+        return [
+            {k: item[k] for k in ("timestamp", "open", "high", "low", "close", "volume")}
+            for item in resp.json()["items"]
+        ]
+
+    h1 = await bars("H1")
+    assert len(h1) == 2
+    assert [float(h1[0][k]) for k in ("open", "high", "low", "close", "volume")] == [
+        10, 13, 9, 12, 3
+    ]
+    assert h1[0]["timestamp"].startswith("2024-01-01T00:00:00")
+    assert len(await bars("D1")) == 1
+    assert len(await bars("MN1")) == 1
+
+    # A late M1 bar only rewrites the buckets it falls into.
+    await _upload_m1(client, instrument_id, ["2024-01-01 00:30:00,11,20,5,11,4"])
+    h1 = await bars("H1")
+    assert len(h1) == 2
+    assert [float(h1[0][k]) for k in ("high", "low", "volume")] == [20, 5, 7]
+    assert float(h1[1]["high"]) == 12
+    d1 = await bars("D1")
+    assert [float(d1[0][k]) for k in ("open", "high", "low", "close", "volume")] == [
+        10, 20, 5, 9, 10
+    ]
+
+    total = await client.get(f"/prices/ohlc/{instrument_id}", params={"total_mode": "estimated"})
+    # M1 4, M5 4, M15 4, M30 3, H1 2, H4/D1/W1/MN1 1 each.
+    assert total.json()["total"] == 21
+
+
+@pytest.mark.anyio
+async def test_rollups_never_replace_uploaded_bars(client):
+    create = await client.post(
+        "/assets", json={"symbol": "ADAUSD", "name": "ADA/USD", "asset_type": "CRYPTO"}
+    )
+    instrument_id = create.json()["id"]
+    h1 = {"instrument_id": str(instrument_id), "timeframe": "H1", "price_type": "OHLC"}
+    header = "timestamp,open,high,low,close\n"
+    await _upload_csv(client, "/prices/ohlc/upload", header + "2024-01-01 00:00:00,1,5,1,4\n", h1)
+
+    await _upload_m1(
+        client,
+        instrument_id,
+        ["2024-01-01 00:10:00,2,3,2,3,1", "2024-01-01 01:10:00,2,3,2,3,1"],
+    )
+
+    async def h1_highs():
+        resp = await client.get(f"/prices/ohlc/{instrument_id}", params={"timeframe": "H1"})
+        return [float(item["high"]) for item in resp.json()["items"]]
+
+    # The uploaded 00:00 bar stays; 01:00 has no upload, so it is derived.
+    assert await h1_highs() == [5, 3]
+
+    # Uploading over a derived bar replaces it, even with on_conflict=skip.
+    resp = await _upload_csv(
+        client, "/prices/ohlc/upload", header + "2024-01-01 01:00:00,2,9,2,3\n", h1
+    )
+    assert resp.json()["inserted"] == 1
+    assert await h1_highs() == [5, 9]
+
+
+async def _upload_csv(client, path, csv_content, data):
+    files = {"file": ("test.csv", io.BytesIO(csv_content.encode()), "text/csv")}
+    return await client.post(path, files=files, data=data)
+
+
+@pytest.mark.anyio
+async def test_upload_tick_data_twice_skips_stored_keys(client):
+    create = await client.post(
+        "/assets", json={"symbol": "NZDUSD", "name": "NZD/USD", "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+    # The last line repeats a key from inside the same file.
+    csv_content = (
+        "timestamp,bid,ask\n2024-01-01 00:00:00,1.1,1.2\n2024-01-01 00:01:00,1.3,1.4\n"
+        "2024-01-01 00:01:00,1.5,1.6\n"
+    )
+    data = {"instrument_id": str(instrument_id)}
+
+    first = await _upload_csv(client, "/prices/tick/upload", csv_content, data)
+    assert first.status_code == 200
+    assert (first.json()["inserted"], first.json()["skipped"]) == (2, 1)
+
+    second = await _upload_csv(client, "/prices/tick/upload", csv_content, data)
+    assert second.status_code == 200
+    assert (second.json()["inserted"], second.json()["skipped"]) == (0, 3)
+
+    resp = await client.get(f"/prices/tick/{instrument_id}")
+    assert resp.json()["total"] == 2
+    assert [float(item["bid"]) for item in resp.json()["items"]] == [1.1, 1.3]
+
+
+@pytest.mark.anyio
+async def test_upload_tick_data_update_overwrites_prices(client):
+    create = await client.post(
+        "/assets", json={"symbol": "USDSEK", "name": "USD/SEK", "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+    data = {"instrument_id": str(instrument_id)}
+    await _upload_csv(
+        client, "/prices/tick/upload", "timestamp,bid,ask\n2024-01-01 00:00:00,1.1,1.2\n", data
+    )
+
+    resp = await _upload_csv(
+        client,
+        "/prices/tick/upload",
+        "timestamp,bid,ask\n2024-01-01 00:00:00,2.1,2.2\n2024-01-01 00:01:00,2.3,2.4\n",
+        {**data, "on_conflict": "update"},
+    )
+    assert resp.status_code == 200
+    assert (resp.json()["inserted"], resp.json()["updated"]) == (1, 1)
+
+    resp = await client.get(f"/prices/tick/{instrument_id}")
+    assert resp.json()["total"] == 2
+    assert [float(item["bid"]) for item in resp.json()["items"]] == [2.1, 2.3]
+
+
+@pytest.mark.anyio
+async def test_upload_error_mode_rejects_stored_keys(client):
+    create = await client.post(
+        "/assets", json={"symbol": "XAGUSD", "name": "XAG/USD", "asset_type": "COMMODITY"}
+    )
+    instrument_id = create.json()["id"]
+    csv_content = "timestamp,open,high,low,close\n2024-01-01 00:00:00,24,25,23,24.5\n"
+    data = {"instrument_id": str(instrument_id), "timeframe": "H1", "on_conflict": "error"}
+    first = await _upload_csv(client, "/prices/ohlc/upload", csv_content, data)
+    assert first.json()["inserted"] == 1
+
+    second = await _upload_csv(client, "/prices/ohlc/upload", csv_content, data)
+    assert second.status_code == 409
+    assert "instrument_id, timestamp, timeframe, price_type" in second.json()["detail"]
+
+    # Same timestamp under another timeframe is a different natural key.
+    other = await _upload_csv(
+        client, "/prices/ohlc/upload", csv_content, {**data, "timeframe": "D1"}
+    )
+    assert other.status_code == 200
+
+    resp = await client.get(f"/prices/ohlc/{instrument_id}")
+    assert resp.json()["total"] == 2
+
+
+@pytest.mark.anyio
+async def test_upload_stream_reports_conflicts_per_chunk(client, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "UPLOAD_STREAM_CHUNK_BYTES", 64)
+    create = await client.post(
+        "/assets", json={"symbol": "USDNOK", "name": "USD/NOK", "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+    lines = [f"2024-01-01 00:{i:02d}:00,10.{i:02d},10.{i + 1:02d}" for i in range(10)]
+    csv_content = "timestamp,bid,ask\n" + "\n".join(lines) + "\n"
+    data = {"instrument_id": str(instrument_id)}
+    await _upload_csv(client, "/prices/tick/upload", "\n".join(csv_content.splitlines()[:6]), data)
+
+    resp = await _upload_csv(client, "/prices/tick/upload/stream", csv_content, data)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert (body["inserted"], body["skipped"]) == (5, 5)
+    assert len(body["chunks"]) > 1
+    assert sum(chunk["skipped"] for chunk in body["chunks"]) == 5
+    assert all(chunk["rows"] == chunk["inserted"] + chunk["skipped"] for chunk in body["chunks"])
+
+    resp = await _upload_csv(
+        client, "/prices/tick/upload/stream", csv_content, {**data, "on_conflict": "error"}
+    )
+    assert resp.status_code == 409
+    assert "0 rows committed" in resp.json()["detail"]
+
+
+def test_rollup_months_include_week_starts_in_previous_month():
+    from datetime import date
+
+    import pandas as pd
+
+    from app.models.price import TimeFrame
+    from app.services.rollups import affected_ranges, rollup_months
+
+    # 2019-03-01 is a Friday, so its W1 bucket starts on 2019-02-25.
+    timestamps = pd.Series(pd.to_datetime(["2019-03-01 12:00:00"]))
+    ranges = [affected_ranges(timestamps, tf) for tf in (TimeFrame.H1, TimeFrame.W1)]
+    assert rollup_months(ranges) == {date(2019, 2, 1), date(2019, 3, 1)}
+
+
+@pytest.fixture
+def price_query_cache(monkeypatch):
+    import fakeredis.aioredis
+
+    from app.services import query_cache
+
+    cache = query_cache.QueryCache(
+        fakeredis.aioredis.FakeRedis(), ttl_seconds=60, max_bytes=1 << 20, max_entry_bytes=1 << 16
+    )
+    monkeypatch.setattr(query_cache, "query_cache", cache)
+    return cache
+
+
+@pytest.mark.anyio
+async def test_price_query_cache_invalidates_overlapping_ranges(client, price_query_cache):
+    create = await client.post(
+        "/assets", json={"symbol": "ADAUSD", "name": "ADA/USD", "asset_type": "CRYPTO"}
+    )
+    instrument_id = create.json()["id"]
+    await _upload_m1(client, instrument_id, ["2024-01-02 00:00:00,1,2,1,2,1"])
+
+    async def count(from_date, to_date):
+        resp = await client.get(
+            f"/prices/ohlc/{instrument_id}",
+            params={"timeframe": "M1", "from_date": from_date, "to_date": to_date},
+        )
+        assert resp.status_code == 200
+        return resp.json()["total"]
+
+    january = ("2024-01-01T00:00:00", "2024-01-31T00:00:00")
+    march = ("2024-03-01T00:00:00", "2024-03-31T00:00:00")
+    assert await count(*january) == 1
+    assert await count(*march) == 0
+    assert await count(*january) == 1
+    assert (price_query_cache.hits, price_query_cache.misses) == (1, 2)
+
+    # A March upload only drops the March page; the M1 rollups stay within March.
+    await _upload_m1(client, instrument_id, ["2024-03-05 00:00:00,1,2,1,2,1"])
+    assert await count(*january) == 1
+    assert await count(*march) == 1
+    assert (price_query_cache.hits, price_query_cache.misses) == (2, 3)
+
+    stats = (await client.get("/health/caches")).json()["price_queries"]
+    assert stats["hits"] == 2
+    assert stats["saved_seconds"] >= 0
+
+
+@pytest.mark.anyio
+async def test_price_query_cache_evicts_oldest_pages_over_budget():
+    from datetime import datetime
+
+    import fakeredis.aioredis
+
+    from app.schemas.price import BarResponse
+    from app.services.query_cache import QueryCache
+
+    cache = QueryCache(
+        fakeredis.aioredis.FakeRedis(), ttl_seconds=60, max_bytes=400, max_entry_bytes=300
+    )
+    bar = {"timestamp": datetime(2024, 1, 1), "open": 1, "high": 1, "low": 1, "close": 1}
+
+    async def load(rows):
+        return [BarResponse(**bar, tick_count=1)] * rows, rows, None
+
+    bounds = (datetime(2024, 1, 1), datetime(2024, 1, 2))
+    # A one-bar page is ~170 bytes: the third evicts the first; ten bars are too large.
+    for page in range(3):
+        await cache.read_through("t", 1, (page,), bounds, BarResponse, lambda: load(1))
+    await cache.read_through("t", 1, ("big",), bounds, BarResponse, lambda: load(10))
+    assert cache.evictions >= 1
+    assert cache.too_large == 1
+    assert int(await cache._r.get(cache._bytes_key)) <= 400
+
+    await cache.read_through("t", 1, (2,), bounds, BarResponse, lambda: load(1))
+    await cache.read_through("t", 1, (0,), bounds, BarResponse, lambda: load(1))
+    assert (cache.hits, cache.misses) == (1, 5)
+
+
+@pytest.mark.anyio
+async def test_conditional_price_requests(client, monkeypatch):
+    from app.services import price_service
+
+    create = await client.post(
+        "/assets", json={"symbol": "DOTUSD", "name": "DOT/USD", "asset_type": "CRYPTO"}
+    )
+    instrument_id = create.json()["id"]
+    await _upload_m1(client, instrument_id, ["2024-01-02 00:00:00,1,2,1,2,1"])
+    url = f"/prices/ohlc/{instrument_id}"
+
+    first = await client.get(url, params={"timeframe": "M1"})
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    assert "last-modified" in first.headers
+    other = await client.get(url, params={"timeframe": "H1"})
+    assert other.headers["etag"] != etag
+
+    async def unexpected(*args, **kwargs):
+        raise AssertionError("a 304 must not query the price tables")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(price_service, "get_ohlc_data", unexpected)
+        resp = await client.get(url, params={"timeframe": "M1"}, headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.headers["etag"] == etag
+        resp = await client.get(
+            url,
+            params={"timeframe": "M1"},
+            headers={"If-Modified-Since": first.headers["last-modified"]},
+        )
+        assert resp.status_code == 304
+
+    await _upload_m1(client, instrument_id, ["2024-01-02 00:01:00,1,2,1,2,1"])
+    resp = await client.get(url, params={"timeframe": "M1"}, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+    assert len(resp.json()["items"]) == 2
+
+
+@pytest.mark.anyio
+async def test_batch_queries_group_rows_per_instrument(client):
+    ids = []
+    for symbol in ("BATCH1", "BATCH2", "BATCH3"):
+        create = await client.post(
+            "/assets", json={"symbol": symbol, "name": symbol, "asset_type": "CRYPTO"}
+        )
+        ids.append(create.json()["id"])
+    await _upload_m1(
+        client,
+        ids[0],
+        [f"2024-01-01 00:0{i}:00,{i},{i + 1},{i},{i},1" for i in range(3)],
+    )
+    await _upload_m1(client, ids[1], ["2024-01-01 00:00:00,5,6,4,5,1"])
+
+    resp = await client.post(
+        "/prices/ohlc/batch",
+        json={"instrument_ids": [ids[2], ids[0], ids[1], ids[0]], "timeframe": "M1", "limit": 2},
+    )
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [result["instrument_id"] for result in results] == [ids[2], ids[0], ids[1]]
+    assert results[0]["items"] == []
+    assert [float(item["open"]) for item in results[1]["items"]] == [0, 1]
+    assert results[1]["next_cursor"] is not None
+    assert results[2]["next_cursor"] is None
+
+    # The cursor continues on the single-instrument endpoint.
+    rest = await client.get(
+        f"/prices/ohlc/{ids[0]}",
+        params={"timeframe": "M1", "cursor": results[1]["next_cursor"]},
+    )
+    assert [float(item["open"]) for item in rest.json()["items"]] == [2]
+
+    ticks = await client.post("/prices/tick/batch", json={"instrument_ids": ids})
+    assert [len(result["items"]) for result in ticks.json()["results"]] == [0, 0, 0]
+
+
+@pytest.mark.anyio
+async def test_batch_queries_are_bounded(client, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "BATCH_QUERY_MAX_INSTRUMENTS", 2)
+    resp = await client.post("/prices/tick/batch", json={"instrument_ids": [1, 2, 3]})
+    assert resp.status_code == 400
+    resp = await client.post("/prices/tick/batch", json={"instrument_ids": []})
+    assert resp.status_code == 422
+    resp = await client.post(
+        "/prices/ohlc/batch", json={"instrument_ids": [1, 2], "limit": 200000}
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_latest_prices_follow_ingest(client):
+    create = await client.post(
+        "/assets", json={"symbol": "LATEST", "name": "Latest", "asset_type": "CRYPTO"}
+    )
+    instrument_id = create.json()["id"]
+    other = await client.post(
+        "/assets", json={"symbol": "OTHER", "name": "Other", "asset_type": "CRYPTO"}
+    )
+    await _upload_tick_rows(
+        client,
+        instrument_id,
+        ["2024-01-01 00:00:02,1.2,1.3,1", "2024-01-01 00:00:01,1.1,1.2,1"],
+    )
+    await _upload_tick_rows(client, other.json()["id"], ["2024-01-01 00:00:00,5,6,1"])
+
+    resp = await client.get(f"/prices/latest/{instrument_id}")
+    assert resp.status_code == 200
+    [tick] = resp.json()
+    assert tick["price_type"] == "TICK" and tick["timeframe"] is None
+    assert tick["timestamp"].startswith("2024-01-01T00:00:02")
+    assert float(tick["bid"]) == 1.2 and tick["open"] is None
+
+    # A backfill leaves the snapshot alone; a skipped duplicate keeps the stored values.
+    await _upload_tick_rows(client, instrument_id, ["2023-12-31 00:00:00,9,9,1"])
+    await _upload_tick_rows(client, instrument_id, ["2024-01-01 00:00:02,7,8,1"])
+    [tick] = (await client.get(f"/prices/latest/{instrument_id}")).json()
+    assert float(tick["bid"]) == 1.2
+
+    csv_content = "timestamp,bid,ask,volume\n2024-01-01 00:00:02,7,8,1\n"
+    await client.post(
+        "/prices/tick/upload",
+        files={"file": ("test.csv", io.BytesIO(csv_content.encode()), "text/csv")},
+        data={"instrument_id": str(instrument_id), "on_conflict": "update"},
+    )
+    [tick] = (await client.get(f"/prices/latest/{instrument_id}")).json()
+    assert float(tick["bid"]) == 7
+
+    # M1 bars also move the rollup series to the bucket of the newest bar.
+    await _upload_m1(
+        client,
+        instrument_id,
+        ["2024-01-01 00:04:00,1,3,1,2,1", "2024-01-01 00:05:00,2,4,2,3,1"],
+    )
+    bars = {
+        item["timeframe"]: item
+        for item in (await client.get(f"/prices/latest/{instrument_id}")).json()
+        if item["price_type"] == "OHLC"
+    }
+    assert set(bars) == {"M1", "M5", "M15", "M30", "H1", "H4", "D1", "W1", "MN1"}
+    assert bars["M1"]["timestamp"].startswith("2024-01-01T00:05:00")
+    assert bars["M5"]["timestamp"].startswith("2024-01-01T00:05:00")
+    assert float(bars["H1"]["open"]) == 1 and float(bars["H1"]["close"]) == 3
+
+    ticks = (await client.get("/prices/latest", params={"price_type": "TICK"})).json()
+    assert [item["instrument_id"] for item in ticks] == [instrument_id, other.json()["id"]]
+    hourly = (await client.get("/prices/latest", params={"timeframe": "H1"})).json()
+    assert [item["instrument_id"] for item in hourly] == [instrument_id]
+    assert (await client.get("/prices/latest/999")).json() == []
+
+
+@pytest.mark.anyio
+async def test_latest_prices_seeded_from_price_table(db_session):
+    from datetime import datetime, timezone
+
+    import pandas as pd
+    from sqlalchemy import delete
+
+    from app.models.asset import AssetType, Instrument
+    from app.models.price import LatestPrice
+    from app.services import latest_prices, price_service
+
+    instrument = Instrument(symbol="SEED", name="Seed", asset_type=AssetType.CRYPTO)
+    db_session.add(instrument)
+    await db_session.commit()
+
+    def ticks(*rows):
+        return pd.DataFrame(
+            {
+                "instrument_id": instrument.id,
+                "timestamp": [pd.Timestamp(timestamp) for timestamp, _ in rows],
+                "bid": [bid for _, bid in rows],
+                "ask": [bid + 0.1 for _, bid in rows],
+                "volume": 1.0,
+            }
+        )
+
+    await price_service.bulk_insert_tick_data(db_session, ticks(("2024-01-02", 2.0)))
+    # As if the rows predated the snapshot table.
+    await db_session.execute(delete(LatestPrice))
+    await db_session.commit()
+    latest_prices.snapshot.clear()
+
+    await price_service.bulk_insert_tick_data(db_session, ticks(("2024-01-01", 1.0)))
+    [tick] = await price_service.get_latest_prices(db_session, instrument.id)
+    assert tick.timestamp == datetime(2024, 1, 2, tzinfo=timezone.utc)
+    assert float(tick.bid) == 2.0
@@ -0,0 +1,105 @@
+import asyncio
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import parse_pool, price_service
+
+UPLOAD_ROWS = 100_000
+
+
+@pytest.fixture
+def parse_workers():
+    parse_pool.start_parse_pool(1)
+    yield
+    parse_pool.shutdown_parse_pool()
+
+
+def _large_tick_csv(rows: int) -> bytes:
+    mid = 1.1 + np.random.default_rng(0).normal(0, 1e-4, rows).cumsum()
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=rows, freq="100ms"),
+            "bid": mid.round(5),
+            "ask": (mid + 2e-5).round(5),
+            "volume": 100,
+        }
+    )
+    return df.to_csv(index=False).encode()
+
+
+def _p99(samples):
+    return float(np.percentile(samples, 99))
+
+
+async def _sample(client, path, until):
+    latencies = []
+    while not until():
+        started = time.perf_counter()
+        resp = await client.get(path)
+        latencies.append(time.perf_counter() - started)
+        assert resp.status_code == 200
+        await asyncio.sleep(0.002)
+    return latencies
+
+
+@pytest.mark.latency
+@pytest.mark.anyio
+async def test_read_latency_flat_during_upload(client, parse_workers, monkeypatch):
+    # Sample while the upload is reading and parsing the CSV. The in-memory SQLite
+    # test database has a single shared connection, so reads queue behind the insert
+    # phase for reasons unrelated to the event loop.
+    parsed = asyncio.Event()
+    bulk_insert = price_service.bulk_insert_tick_data
+
+    async def signalling_insert(db, frame, chunk_size=None, on_conflict=None):
+        parsed.set()
+        return await bulk_insert(db, frame, chunk_size, on_conflict)
+
+    monkeypatch.setattr(price_service, "bulk_insert_tick_data", signalling_insert)
+    create = await client.post(
+        "/assets", json={"symbol": "EURGBP", "name": "EUR/GBP", "asset_type": "CURRENCY"}
+    )
+    instrument_id = create.json()["id"]
+    tick_path = f"/prices/tick/{instrument_id}?limit=10"
+    content = _large_tick_csv(UPLOAD_ROWS)
+
+    # Warm the pool so process spawn time is not counted against the upload.
+    await parse_pool.run_parse(len, b"")
+
+    baseline_end = time.perf_counter() + 0.5
+    baseline_health = await _sample(client, "/health", lambda: time.perf_counter() > baseline_end)
+    baseline_end = time.perf_counter() + 0.5
+    baseline_tick = await _sample(client, tick_path, lambda: time.perf_counter() > baseline_end)
+
+    upload = asyncio.create_task(
+        client.post(
+            "/prices/tick/upload",
+            files={"file": ("big.csv", io.BytesIO(content), "text/csv")},
+            data={"instrument_id": str(instrument_id)},
+        )
+    )
+
+    def done():
+        # Also stop once the upload finishes, so a failing upload cannot hang the samplers.
+        return parsed.is_set() or upload.done()
+
+    during_health, during_tick = await asyncio.gather(
+        _sample(client, "/health", done),
+        _sample(client, tick_path, done),
+    )
+    resp = await upload
+    assert resp.status_code == 200
+    assert resp.json()["inserted"] == UPLOAD_ROWS
+
+    assert len(during_health) > 10
+    # Flat: p99 during the upload stays within a small multiple of the idle p99, with
+    # an absolute floor so sub-millisecond baselines do not make it flaky. With fewer
+    # cores than the loop plus a parse worker, the two share a CPU and the floor grows.
+    floor = 0.1 * max(1, 2 // (os.cpu_count() or 1))
+    assert _p99(during_health) < max(5 * _p99(baseline_health), floor)
+    assert _p99(during_tick) < max(5 * _p99(baseline_tick), floor)